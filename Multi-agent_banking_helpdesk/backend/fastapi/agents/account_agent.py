@@ -1,28 +1,15 @@
 # --- File: account_agent.py ---
 
 from instructor import patch
-from langchain_groq import ChatGroq
 from langchain.agents import tool, initialize_agent
 from pydantic import BaseModel, Field
-import os
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
-lc_api_key = os.environ.get('LANGCHAIN_API_KEY')
-os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
-
-# LLaMA 3.1 via Groq
-llm = ChatGroq(
-    model="llama3-8b-8192",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
+from agents.account_store import get_account_store
+from agents.llm_client import get_llm
+from agents.tool_calling import AGENT_MAX_ITERATIONS, AGENT_MODE, ToolCallingAgent
 
 # Tool schema and function
+# Fallback data when no columnar store exists at ACCOUNT_STORE_PATH
 mock_accounts = {
     "user123": {"savings": 1500.50, "checking": 250.00},
     "user456": {"savings": 3000.00, "checking": 500.00}
@@ -51,16 +38,29 @@ def get_account_balance(user_id: str) -> AccountOutput:
         >>> get_account_balance("user123")
         AccountOutput(answer="Balances - checking: $1000, savings: $5000")
     """
-    accounts = mock_accounts.get(user_id, {})
+    accounts = get_account_store(mock_accounts).get(user_id)
     if not accounts:
         return AccountOutput(answer="No account found for the given user ID.")
     summary = ", ".join(f"{k}: ${v}" for k, v in accounts.items())
     return AccountOutput(answer=f"Balances - {summary}")
 
 # Account agent
-account_agent = initialize_agent(
-    tools=[get_account_balance],
-    llm=llm,
-    agent_type="structured-chat-zero-shot-react-description",
-    verbose=True
-)
+def build_account_agent():
+    """Build the account agent; called lazily by agents.registry on first use."""
+    # LLaMA 3.1 via Groq, shared client from llm_client
+    llm = get_llm("llama3-8b-8192")
+    if AGENT_MODE == "tools":
+        # One LLM call: the balance summary is the answer
+        return ToolCallingAgent(
+            llm,
+            [get_account_balance],
+            "You answer account balance questions. Call get_account_balance with the user's ID.",
+            return_direct={"get_account_balance"}
+        )
+    return initialize_agent(
+        tools=[get_account_balance],
+        llm=llm,
+        agent_type="structured-chat-zero-shot-react-description",
+        max_iterations=AGENT_MAX_ITERATIONS,
+        verbose=True
+    )
@@ -0,0 +1,251 @@
+# --- File: account_store.py ---
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+# Directory written by build_account_store; when missing, the in-code mock accounts are used
+ACCOUNT_STORE_PATH = os.getenv("ACCOUNT_STORE_PATH", "account_store")
+# Bytes reserved per user ID; longer IDs are rejected at build time
+ACCOUNT_ID_WIDTH = int(os.getenv("ACCOUNT_ID_WIDTH", "16"))
+
+META_FILE = "meta.json"
+IDS_FILE = "user_id.npy"
+INDEX_FILE = "index.npy"
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _hash_one(key):
+    # FNV-1a over the zero-padded ID bytes; stable across processes, unlike hash()
+    h = FNV_OFFSET
+    for byte in key:
+        h = ((h ^ byte) * FNV_PRIME) & MASK64
+    return h
+
+
+def _hash_many(ids):
+    """Vectorized ``_hash_one`` over an ``S<width>`` array."""
+    data = ids.view(np.uint8).reshape(len(ids), ids.dtype.itemsize)
+    h = np.full(len(ids), FNV_OFFSET, dtype=np.uint64)
+    prime = np.uint64(FNV_PRIME)
+    for column in range(data.shape[1]):
+        h ^= data[:, column]
+        h *= prime
+    return h
+
+
+def _table_size(rows):
+    # Power of two with a load factor of at most 0.5
+    return 1 << max(4, (2 * rows - 1).bit_length())
+
+
+def build_index(ids):
+    """
+    Open-addressing hash table over the user IDs.
+
+    Slot ``s`` holds ``row + 1`` (0 = empty); collisions probe linearly.
+    Built with vectorized rounds: every unplaced row tries its current slot,
+    one row wins each free slot, the rest move to the next slot.
+    """
+    size = _table_size(len(ids))
+    mask = np.uint64(size - 1)
+    table = np.zeros(size, dtype=np.int64)
+    rows = np.arange(len(ids), dtype=np.int64)
+    slots = (_hash_many(ids) & mask).astype(np.int64)
+    while len(rows):
+        free = table[slots] == 0
+        candidate_slots, first = np.unique(slots[free], return_index=True)
+        winners = rows[free][first]
+        table[candidate_slots] = winners + 1
+        placed = np.zeros(len(rows), dtype=bool)
+        placed[np.flatnonzero(free)[first]] = True
+        rows, slots = rows[~placed], (slots[~placed] + 1) & (size - 1)
+    return table
+
+
+def build_account_store(path, user_ids, balances, id_width=ACCOUNT_ID_WIDTH):
+    """
+    Write a columnar account store: one .npy file per column plus the hash index.
+
+    Args:
+        path (str): Output directory
+        user_ids (sequence of str): One ID per row, unique
+        balances (dict): Account type -> sequence of balances (NaN = no such account)
+        id_width (int): Bytes per user ID
+    """
+    ids = np.asarray([u.encode() for u in user_ids], dtype=f"S{id_width}")
+    if len(ids) and max(len(u.encode()) for u in user_ids) > id_width:
+        raise ValueError(f"User IDs longer than {id_width} bytes; raise ACCOUNT_ID_WIDTH")
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, IDS_FILE), ids)
+    for name, values in balances.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(values, dtype=np.float64))
+    np.save(os.path.join(path, INDEX_FILE), build_index(ids))
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump({"rows": len(ids), "columns": list(balances), "id_width": id_width}, f)
+
+
+def build_from_sqlite(db_path, path, id_width=ACCOUNT_ID_WIDTH):
+    """Convert the ``accounts(user_id, account_type, balance)`` table of bank.db into a store."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT user_id, account_type, balance FROM accounts").fetchall()
+    finally:
+        conn.close()
+    accounts = {}
+    for user_id, account_type, balance in rows:
+        accounts.setdefault(user_id, {})[account_type] = balance
+    types = list(dict.fromkeys(t for _, t, _ in rows))
+    build_account_store(path, list(accounts), {
+        t: [balances.get(t, np.nan) for balances in accounts.values()] for t in types
+    }, id_width)
+    return len(accounts)
+
+
+class AccountStore:
+    """
+    Read-only account balances in NumPy columns with a user-ID hash index.
+
+    User IDs are stored once as fixed-width bytes, balances as one float64
+    column per account type, and the index as an int64 slot array. Files
+    are memory-mapped, so opening is instant and worker processes share the
+    pages. ``get`` is an O(1) hash probe; ``get_many`` probes a whole batch
+    with vectorized NumPy operations.
+    """
+
+    def __init__(self, ids, columns, index):
+        self.ids = ids
+        self.columns = columns
+        self.index = index
+        self.id_width = ids.dtype.itemsize
+        self._mask = len(index) - 1
+
+    @classmethod
+    def open(cls, path=ACCOUNT_STORE_PATH):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in meta["columns"]
+        }
+        return cls(
+            np.load(os.path.join(path, IDS_FILE), mmap_mode="r"),
+            columns,
+            np.load(os.path.join(path, INDEX_FILE), mmap_mode="r"),
+        )
+
+    @classmethod
+    def from_dict(cls, accounts, id_width=ACCOUNT_ID_WIDTH):
+        """In-memory store from ``{user_id: {account_type: balance}}``."""
+        names = list(dict.fromkeys(t for balances in accounts.values() for t in balances))
+        ids = np.asarray([u.encode() for u in accounts], dtype=f"S{id_width}")
+        columns = {
+            name: np.asarray([balances.get(name, np.nan) for balances in accounts.values()], dtype=np.float64)
+            for name in names
+        }
+        return cls(ids, columns, build_index(ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, user_id):
+        """Row number of ``user_id``, or -1."""
+        key = user_id.encode()
+        if len(key) > self.id_width:
+            return -1
+        slot = _hash_one(key.ljust(self.id_width, b"\0")) & self._mask
+        while True:
+            row = int(self.index[slot]) - 1
+            if row < 0 or self.ids[row] == key:
+                return row
+            slot = (slot + 1) & self._mask
+
+    def get(self, user_id):
+        """
+        Balances for one user.
+
+        Returns:
+            dict: Account type -> balance, without accounts the user does not have;
+                  empty when the user is unknown
+        """
+        row = self.row(user_id)
+        if row < 0:
+            return {}
+        balances = {}
+        for name, column in self.columns.items():
+            value = float(column[row])
+            if value == value:
+                balances[name] = value
+        return balances
+
+    def rows(self, user_ids):
+        """Row numbers for a batch of user IDs (-1 where unknown), as an int64 array."""
+        keys = np.asarray([u.encode() for u in user_ids], dtype=f"S{self.id_width + 1}")
+        too_long = np.char.str_len(keys) > self.id_width
+        keys = keys.astype(f"S{self.id_width}")
+        mask = np.uint64(self._mask)
+        slots = (_hash_many(keys) & mask).astype(np.int64)
+        result = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.flatnonzero(~too_long)
+        slots = slots[pending]
+        while len(pending):
+            rows = np.asarray(self.index[slots]) - 1
+            empty = rows < 0
+            hit = ~empty
+            hit[hit] = self.ids[rows[hit]] == keys[pending[hit]]
+            result[pending[hit]] = rows[hit]
+            more = ~(empty | hit)
+            pending, slots = pending[more], (slots[more] + 1) & self._mask
+        return result
+
+    def get_many(self, user_ids):
+        """
+        Balances for a batch of users.
+
+        Returns:
+            dict: user_id -> the same dict ``get`` returns
+        """
+        user_ids = list(user_ids)
+        rows = self.rows(user_ids)
+        found = rows >= 0
+        values = {name: column[rows[found]] for name, column in self.columns.items()}
+        result = {user_id: {} for user_id in user_ids}
+        for i, user_id in enumerate(np.asarray(user_ids, dtype=object)[found]):
+            result[user_id] = {
+                name: float(v[i]) for name, v in values.items() if v[i] == v[i]
+            }
+        return result
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_account_store(fallback=None):
+    """
+    Process-wide store: memory-mapped from ACCOUNT_STORE_PATH when it exists,
+    otherwise built in memory from ``fallback`` (``{user_id: {type: balance}}``).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if os.path.exists(os.path.join(ACCOUNT_STORE_PATH, META_FILE)):
+                    _store = AccountStore.open(ACCOUNT_STORE_PATH)
+                else:
+                    _store = AccountStore.from_dict(fallback or {})
+    return _store
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the columnar account store from bank.db")
+    parser.add_argument("--db", default=os.getenv("BANK_DB_PATH", "bank.db"))
+    parser.add_argument("--out", default=ACCOUNT_STORE_PATH)
+    parser.add_argument("--id-width", type=int, default=ACCOUNT_ID_WIDTH)
+    args = parser.parse_args()
+    print(f"Wrote {build_from_sqlite(args.db, args.out, args.id_width)} users to {args.out}")
@@ -1,30 +1,22 @@
 # --- File: agents.py ---
 import os
 from langchain.agents import initialize_agent, Tool
-from langchain_groq import ChatGroq
 from langchain.tools import tool
-from langchain.vectorstores import FAISS
-from langchain.embeddings import OpenAIEmbeddings
 from langchain.chains import RetrievalQA
-import sqlite3
 
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-lc_api_key = os.environ.get('LANGCHAIN_API_KEY')
-os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
+from agents.bank_db import get_balance
+from agents.ledger import get_ledger, payment_key
+from agents.llm_client import get_llm
+from agents.vector_index import BankDocsRetriever, get_bank_docs
 
-groq_api_key = os.getenv("GROQ_API_KEY")
-llm = ChatGroq(model='llama-3.1-8b-instant', temperature=0)
+llm = get_llm('llama-3.1-8b-instant')
 # === RAG Agent ===
 def build_rag_agent():
-    vectorstore = FAISS.load_local("bank_docs", OpenAIEmbeddings())
+    # Read-only, memory-mapped index shared with other workers through the page cache
+    get_bank_docs()
     #from langchain.embeddings import HuggingFaceEmbeddings
-    retriever = vectorstore.as_retriever()
+    # Looks the store up per query, so a new bank_docs snapshot is picked up without a rebuild
+    retriever = BankDocsRetriever()
     rag_chain = RetrievalQA.from_chain_type(llm=llm, retriever=retriever)
 
     @tool
@@ -39,11 +31,7 @@ def build_db_agent():
     @tool
     def get_account_balance(user_id: str) -> str:
         """Looks up account balances for a user."""
-        conn = sqlite3.connect("bank.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT account_type, balance FROM accounts WHERE user_id=?", (user_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        rows = get_balance(user_id)
         return str(rows) if rows else "No accounts found."
 
     return initialize_agent([get_account_balance], llm, agent_type="structured-chat-zero-shot-react-description")
@@ -53,8 +41,10 @@ def build_billing_agent():
     @tool
     def pay_biller(user_id: str, biller_name: str, amount: float) -> str:
         """Pays a biller for the user."""
-        # Simulate action
-        return f"Paid {amount} to {biller_name} for user {user_id}."
+        payment = get_ledger().pay(user_id, biller_name, amount, payment_key(user_id, biller_name, amount))
+        if payment.duplicate:
+            return f"Already paid {payment.amount} to {biller_name} for user {user_id} (payment #{payment.id})."
+        return f"Paid {payment.amount} to {biller_name} for user {user_id} (payment #{payment.id})."
 
     return initialize_agent([pay_biller], llm, agent_type="structured-chat-zero-shot-react-description")
 
@@ -0,0 +1,143 @@
+# --- File: bank_db.py ---
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+BANK_DB_PATH = os.getenv("BANK_DB_PATH", "bank.db")
+BANK_DB_POOL_SIZE = int(os.getenv("BANK_DB_POOL_SIZE", "8"))
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache prepares each one once and reuses it.
+BALANCE_SQL = "SELECT account_type, balance FROM accounts WHERE user_id=?"
+BULK_BALANCE_SQL = (
+    "SELECT user_id, account_type, balance FROM accounts "
+    "WHERE user_id IN (SELECT value FROM json_each(?))"
+)
+USER_ID_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts(user_id)"
+
+
+def _has_user_id_index(conn):
+    for _, index_name, *_ in conn.execute("PRAGMA index_list(accounts)"):
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{index_name}')")]
+        if columns and columns[0] == "user_id":
+            return True
+    return False
+
+
+def prepare_database(path=BANK_DB_PATH):
+    """
+    One-off startup check: switch the database to WAL and make sure
+    ``accounts(user_id)`` is indexed, creating the index if it is missing.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        if not _has_user_id_index(conn):
+            logger.warning("accounts(user_id) is not indexed in %s; creating idx_accounts_user_id", path)
+            conn.execute(USER_ID_INDEX_SQL)
+            conn.commit()
+    finally:
+        conn.close()
+
+
+class SQLitePool:
+    """
+    Fixed-size pool of read-only SQLite connections.
+
+    Connections are opened with ``mode=ro`` and ``query_only`` and handed
+    out to one thread at a time, so they are safe to share across the
+    agent executor threads.
+    """
+
+    def __init__(self, path=BANK_DB_PATH, size=BANK_DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._pool = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = self._connect()
+            if conn is None:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool; the first call runs ``prepare_database``."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                prepare_database(BANK_DB_PATH)
+                _pool = SQLitePool(BANK_DB_PATH, BANK_DB_POOL_SIZE)
+    return _pool
+
+
+def get_balance(user_id):
+    """
+    Account balances for one user.
+
+    Returns:
+        list: ``(account_type, balance)`` rows, empty if the user is unknown
+    """
+    with get_pool().connection() as conn:
+        return conn.execute(BALANCE_SQL, (user_id,)).fetchall()
+
+
+def get_balances(user_ids):
+    """
+    Account balances for many users in a single query.
+
+    Args:
+        user_ids (iterable): User IDs to look up
+
+    Returns:
+        dict: user_id -> list of ``(account_type, balance)`` rows; users
+              without accounts map to an empty list
+    """
+    user_ids = list(user_ids)
+    balances = {user_id: [] for user_id in user_ids}
+    with get_pool().connection() as conn:
+        for user_id, account_type, balance in conn.execute(BULK_BALANCE_SQL, (json.dumps(user_ids),)):
+            balances[user_id].append((account_type, balance))
+    return balances
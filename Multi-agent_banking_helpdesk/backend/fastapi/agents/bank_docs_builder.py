@@ -0,0 +1,237 @@
+# --- File: bank_docs_builder.py ---
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from agents.vector_index import (
+    BANK_DOCS_PATH, BANK_EMBEDDINGS, CURRENT_FILE, SNAPSHOTS_DIR, current_snapshot, get_embeddings
+)
+
+# Directory of policy documents to ingest
+BANK_DOCS_SOURCE = os.getenv("BANK_DOCS_SOURCE", "bank_policies")
+BANK_DOCS_CHUNK_SIZE = int(os.getenv("BANK_DOCS_CHUNK_SIZE", "1000"))
+BANK_DOCS_CHUNK_OVERLAP = int(os.getenv("BANK_DOCS_CHUNK_OVERLAP", "150"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "4"))
+# Snapshots kept on disk besides the active one
+BANK_DOCS_KEEP = int(os.getenv("BANK_DOCS_KEEP", "3"))
+
+DOC_EXTENSIONS = (".md", ".txt", ".pdf")
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_sources(source):
+    """Relative path -> sha256 for every policy document under ``source``."""
+    files = {}
+    for root, _, names in os.walk(source):
+        for name in sorted(names):
+            if name.lower().endswith(DOC_EXTENSIONS):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, source)] = file_sha256(path)
+    return files
+
+
+def read_text(path):
+    if path.lower().endswith(".pdf"):
+        # Only needed when the corpus has PDFs (requires pypdf)
+        from langchain_community.document_loaders import PyPDFLoader
+        return "\n\n".join(page.page_content for page in PyPDFLoader(path).load())
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def read_snapshot(snapshot):
+    """
+    Manifest, vectors and documents of an existing snapshot, for reuse.
+
+    Returns:
+        tuple: (manifest dict, {doc_id: (vector, Document)}), or ({}, {})
+    """
+    manifest_path = os.path.join(snapshot, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}, {}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    index = faiss.read_index(os.path.join(snapshot, "index.faiss"))
+    # index.pkl is our own output, not untrusted input
+    with open(os.path.join(snapshot, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    vectors = index.reconstruct_n(0, index.ntotal)
+    return manifest, {
+        doc_id: (vectors[position], docstore.search(doc_id))
+        for position, doc_id in index_to_docstore_id.items()
+    }
+
+
+def embed_parallel(embeddings, texts, batch_size=EMBED_BATCH_SIZE, workers=EMBED_WORKERS):
+    """Embed ``texts`` in batches on a thread pool; returns a float32 array in input order."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="embed") as pool:
+        vectors = [v for batch in pool.map(embeddings.embed_documents, batches) for v in batch]
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def next_snapshot_name(path):
+    snapshots = os.path.join(path, SNAPSHOTS_DIR)
+    existing = [n for n in os.listdir(snapshots) if n.startswith("v")] if os.path.isdir(snapshots) else []
+    version = max((int(n[1:].split("-")[0]) for n in existing), default=0) + 1
+    return f"v{version:04d}-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}"
+
+
+def publish(path, name, staging):
+    """Move a finished staging directory into place, then repoint CURRENT atomically."""
+    final = os.path.join(path, SNAPSHOTS_DIR, name)
+    os.rename(staging, final)
+    pointer = os.path.join(path, CURRENT_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + ".tmp", pointer)
+    return final
+
+
+def prune(path, keep=BANK_DOCS_KEEP):
+    """Delete all but the ``keep`` newest inactive snapshots."""
+    snapshots = os.path.join(path, SNAPSHOTS_DIR)
+    active = os.path.basename(current_snapshot(path))
+    old = sorted((n for n in os.listdir(snapshots) if n.startswith("v") and n != active), reverse=True)
+    for name in old[keep:]:
+        shutil.rmtree(os.path.join(snapshots, name), ignore_errors=True)
+
+
+def build_bank_docs(source=BANK_DOCS_SOURCE, path=BANK_DOCS_PATH, backend=None, force=False,
+                    batch_size=EMBED_BATCH_SIZE, workers=EMBED_WORKERS, keep=BANK_DOCS_KEEP):
+    """
+    Ingest a policy directory into a new bank_docs snapshot.
+
+    Files whose sha256 matches the current snapshot keep their chunks and
+    vectors; only new or changed files are split and embedded. The snapshot
+    is written to a staging directory and published with a rename plus an
+    atomic CURRENT update, so readers never see a partial index.
+
+    Args:
+        source (str): Directory of .md/.txt/.pdf policy documents
+        path (str): bank_docs directory
+        backend (str): Embedding backend, default BANK_EMBEDDINGS
+        force (bool): Re-embed every file
+        batch_size (int): Chunks per embedding call
+        workers (int): Embedding calls in flight at once
+        keep (int): Inactive snapshots to keep
+
+    Returns:
+        dict: Ingest statistics; ``snapshot`` is None when nothing changed
+    """
+    start = time.perf_counter()
+    backend = backend or BANK_EMBEDDINGS
+    files = scan_sources(source)
+    manifest, previous = read_snapshot(current_snapshot(path))
+    if manifest.get("embeddings") != backend:
+        force = True
+    known = manifest.get("files", {})
+    splitter = RecursiveCharacterTextSplitter(chunk_size=BANK_DOCS_CHUNK_SIZE, chunk_overlap=BANK_DOCS_CHUNK_OVERLAP)
+
+    reused, to_embed, entries = {}, [], {}
+    unchanged = 0
+    for rel, sha in files.items():
+        if not force and known.get(rel, {}).get("sha256") == sha and all(i in previous for i in known[rel]["ids"]):
+            unchanged += 1
+            entries[rel] = known[rel]
+            reused.update({doc_id: previous[doc_id] for doc_id in known[rel]["ids"]})
+            continue
+        chunks = splitter.split_text(read_text(os.path.join(source, rel)))
+        ids = [f"{sha[:16]}-{i}" for i in range(len(chunks))]
+        entries[rel] = {"sha256": sha, "ids": ids}
+        to_embed.extend(
+            (doc_id, Document(page_content=chunk, metadata={"source": rel, "chunk": i}))
+            for i, (doc_id, chunk) in enumerate(zip(ids, chunks))
+        )
+    removed = sorted(set(known) - set(files))
+    stats = {
+        "files": len(files),
+        "changed": len(files) - unchanged,
+        "removed": len(removed),
+        "chunks_embedded": len(to_embed),
+        "chunks_reused": len(reused),
+    }
+    if not stats["changed"] and not removed and manifest:
+        return {**stats, "snapshot": None, "total_s": round(time.perf_counter() - start, 3)}
+
+    embeddings = get_embeddings(backend)
+    embed_start = time.perf_counter()
+    new_vectors = embed_parallel(embeddings, [doc.page_content for _, doc in to_embed], batch_size, workers)
+    embed_s = time.perf_counter() - embed_start
+
+    ids = list(reused) + [doc_id for doc_id, _ in to_embed]
+    documents = [doc for _, doc in reused.values()] + [doc for _, doc in to_embed]
+    parts = [np.asarray([v for v, _ in reused.values()], dtype=np.float32)] if reused else []
+    if len(new_vectors):
+        parts.append(new_vectors)
+    if not parts:
+        raise ValueError(f"No policy documents found in {source}")
+    vectors = np.vstack(parts)
+
+    # Same index type FAISS.from_embeddings builds; load_vectorstore maps its flat codes with IO_FLAG_MMAP_IFC
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    store = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, documents))),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+
+    name = next_snapshot_name(path)
+    os.makedirs(os.path.join(path, SNAPSHOTS_DIR), exist_ok=True)
+    staging = os.path.join(path, SNAPSHOTS_DIR, f".staging-{name}")
+    store.save_local(staging)
+    stats.update({
+        "embed_s": round(embed_s, 3),
+        "chunks_per_s": round(len(to_embed) / embed_s, 1) if embed_s else None,
+        "vectors": index.ntotal,
+    })
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump({"embeddings": backend, "dim": int(vectors.shape[1]), "files": entries, "stats": stats}, f)
+    snapshot = publish(path, name, staging)
+    prune(path, keep)
+    return {**stats, "snapshot": snapshot, "total_s": round(time.perf_counter() - start, 3)}
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Ingest policy documents into a new bank_docs snapshot")
+    parser.add_argument("--source", default=BANK_DOCS_SOURCE)
+    parser.add_argument("--out", default=BANK_DOCS_PATH)
+    parser.add_argument("--embeddings", default=BANK_EMBEDDINGS, help="'openai' or 'local'")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS)
+    parser.add_argument("--keep", type=int, default=BANK_DOCS_KEEP)
+    parser.add_argument("--force", action="store_true", help="Re-embed unchanged files too")
+    parser.add_argument("--reload-url", help="POST here afterwards, e.g. http://localhost:8000/bank_docs/reload")
+    args = parser.parse_args()
+
+    result = build_bank_docs(args.source, args.out, args.embeddings, args.force,
+                             args.batch_size, args.workers, args.keep)
+    print(json.dumps(result, indent=2))
+    if args.reload_url and result["snapshot"]:
+        import httpx
+        print(json.dumps(httpx.post(args.reload_url, timeout=300).json(), indent=2))
@@ -1,32 +1,23 @@
 from instructor import patch
-from langchain_groq import ChatGroq
 from langchain.agents import tool, initialize_agent
 from pydantic import BaseModel, Field
-import os
 import json
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
-lc_api_key = os.environ.get('LANGCHAIN_API_KEY')
-os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
-
-# LLaMA 3.1 via Groq
-llm = ChatGroq(
-    model="llama3-8b-8192",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
+from agents.ledger import get_ledger, payment_key
+from agents.llm_client import get_llm
+from agents.tool_calling import AGENT_MAX_ITERATIONS, AGENT_MODE, ToolCallingAgent
 
 class BillingInput(BaseModel):
-    input_str: str = Field(..., description="JSON string containing user_id, biller_name, and amount")
+    input_str: str = Field(..., description="JSON string containing user_id, biller_name and amount")
 
 class BillingOutput(BaseModel):
     message: str
 
+class BillPaymentInput(BaseModel):
+    user_id: str = Field(..., description="The unique identifier of the user")
+    biller_name: str = Field(..., description="The name of the biller/company")
+    amount: float = Field(..., gt=0, description="The payment amount in dollars")
+
 @tool(args_schema=BillingInput)
 def pay_bill(input_str: str) -> BillingOutput:
     """Process a bill payment for a user from a JSON string input.
@@ -45,19 +36,64 @@ def pay_bill(input_str: str) -> BillingOutput:
     """
     try:
         data = json.loads(input_str)
-        user_id = data['user_id']
-        biller_name = data['biller_name']
-        amount = float(data['amount'])
-        return BillingOutput(
-            message=f"Biller '{biller_name}' added and ${amount:.2f} paid from user {user_id}'s account."
-        )
-    except (json.JSONDecodeError, KeyError) as e:
+        # Scoped to the API request; a key written by the model is never trusted
+        key = payment_key(data['user_id'], data['biller_name'], data['amount'])
+        payment = get_ledger().pay(data['user_id'], data['biller_name'], data['amount'], key)
+        return BillingOutput(message=confirmation(payment))
+    except (json.JSONDecodeError, KeyError, ValueError) as e:
         return BillingOutput(message=f"Error processing payment: {str(e)}")
 
+@tool("pay_bill", args_schema=BillPaymentInput)
+def pay_bill_typed(user_id: str, biller_name: str, amount: float) -> BillingOutput:
+    """Process a bill payment for a user. Used by the native tool-calling agent,
+    which passes typed arguments instead of a JSON string.
+
+    Args:
+        user_id: The unique identifier of the user
+        biller_name: The name of the biller/company
+        amount: The payment amount in dollars
+
+    Returns:
+        BillingOutput: Confirmation message of the transaction
+    """
+    try:
+        # Scoped to the API request; the model never sees or sets the key
+        payment = get_ledger().pay(user_id, biller_name, amount, payment_key(user_id, biller_name, amount))
+    except ValueError as e:
+        return BillingOutput(message=f"Error processing payment: {str(e)}")
+    return BillingOutput(message=confirmation(payment))
+
+def confirmation(payment) -> str:
+    """User-facing message for a stored (or already stored) payment"""
+    if payment.duplicate:
+        return (f"Payment #{payment.id} of ${payment.amount:.2f} to '{payment.biller_name}' "
+                f"was already made for user {payment.user_id}; it was not charged again.")
+    return (f"Biller '{payment.biller_name}' added and ${payment.amount:.2f} paid from user "
+            f"{payment.user_id}'s account (payment #{payment.id}).")
+
+async def apay_bill(user_id: str, biller_name: str, amount: float, idempotency_key: str = None) -> BillingOutput:
+    """Async bill payment for callers on the event loop; same ledger and idempotency as pay_bill."""
+    key = idempotency_key or payment_key(user_id, biller_name, amount)
+    payment = await get_ledger().apay(user_id, biller_name, amount, key)
+    return BillingOutput(message=confirmation(payment))
+
 # Billing agent
-billing_agent = initialize_agent(
-    tools=[pay_bill],
-    llm=llm,
-    agent_type="zero-shot-react-description",
-    verbose=True
-)
\ No newline at end of file
+def build_billing_agent():
+    """Build the billing agent; called lazily by agents.registry on first use."""
+    # LLaMA 3.1 via Groq, shared client from llm_client
+    llm = get_llm("llama3-8b-8192")
+    if AGENT_MODE == "tools":
+        # One LLM call: the confirmation is the answer
+        return ToolCallingAgent(
+            llm,
+            [pay_bill_typed],
+            "You pay bills for banking customers. Call pay_bill with the user's ID, the biller and the amount.",
+            return_direct={"pay_bill"}
+        )
+    return initialize_agent(
+        tools=[pay_bill],
+        llm=llm,
+        agent_type="zero-shot-react-description",
+        max_iterations=AGENT_MAX_ITERATIONS,
+        verbose=True
+    )
@@ -1,32 +1,14 @@
 from instructor import patch
-from langchain_groq import ChatGroq
 from langchain.agents import tool, initialize_agent
 from pydantic import BaseModel, Field
-import os
 
-from dotenv import load_dotenv
-load_dotenv()
-
-lc_api_key = os.environ.get('LANGCHAIN_API_KEY')
-os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
-
-# LLaMA 3.1 via Groq with Instructor
-llm = ChatGroq(
-    model="llama3-8b-8192",
-    temperature=0,
-    groq_api_key=os.getenv("GROQ_API_KEY")
-)
-
-# Tool schema and function
-topics = {
-    "KYC": "Know Your Customer (KYC) is a standard banking process...",
-    "LoanPolicy": "Bank offers personal loans at 12% interest with flexible tenure..."
-}
+# Topics and store live in guideline_topics, which loads without this agent; re-exported here
+from agents.guideline_topics import guideline_answer, on_topics_changed, store, topics, update_topics  # noqa: F401
+from agents.llm_client import get_llm
+from agents.tool_calling import AGENT_MAX_ITERATIONS, AGENT_MODE, ToolCallingAgent
 
 class GuidelineInput(BaseModel):
-    topic: str = Field(..., description="The policy topic to search, like 'KYC', 'LoanPolicy'")
+    topic: str = Field(..., description="The policy topic or question to search, like 'KYC', 'LoanPolicy'")
 
 class GuidelineOutput(BaseModel):
     answer: str
@@ -36,17 +18,30 @@ def fetch_guideline(topic: str) -> GuidelineOutput:
     """
     Fetch banking guidelines and policies for a specific topic.
     Args:
-        topic: The banking policy topic to look up (e.g., 'KYC', 'LoanPolicy')
+        topic: The banking policy topic to look up (e.g., 'KYC', 'LoanPolicy'); close
+               spellings, aliases and free-text questions also match
     Returns:
         GuidelineOutput: Contains the guideline information for the requested topic
     """
-    content = topics.get(topic, "No information available on this topic.")
-    return GuidelineOutput(answer=content)
+    return GuidelineOutput(answer=guideline_answer(topic))
 
 # Guideline agent
-guideline_agent = initialize_agent(
-    tools=[fetch_guideline],
-    llm=llm,
-    agent_type="structured-chat-zero-shot-react-description",
-    verbose=True
-)
\ No newline at end of file
+def build_guideline_agent():
+    """Build the guideline agent; called lazily by agents.registry on first use."""
+    # LLaMA 3.1 via Groq, shared client from llm_client
+    llm = get_llm("llama3-8b-8192")
+    if AGENT_MODE == "tools":
+        # One LLM call: the guideline text is the answer
+        return ToolCallingAgent(
+            llm,
+            [fetch_guideline],
+            "You answer banking policy questions. Call fetch_guideline with the policy topic, like 'KYC' or 'LoanPolicy'.",
+            return_direct={"fetch_guideline"}
+        )
+    return initialize_agent(
+        tools=[fetch_guideline],
+        llm=llm,
+        agent_type="structured-chat-zero-shot-react-description",
+        max_iterations=AGENT_MAX_ITERATIONS,
+        verbose=True
+    )
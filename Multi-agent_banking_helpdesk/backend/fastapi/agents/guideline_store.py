@@ -0,0 +1,336 @@
+# --- File: guideline_store.py ---
+import difflib
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+# Directory of policy files: one topic per .md/.txt file, named after the file
+GUIDELINES_DIR = os.getenv("GUIDELINES_DIR", "guidelines")
+# Seconds between directory scans for changed files; 0 disables auto reload
+GUIDELINES_RELOAD_INTERVAL = float(os.getenv("GUIDELINES_RELOAD_INTERVAL", "5"))
+GUIDELINE_TOP_K = int(os.getenv("GUIDELINE_TOP_K", "3"))
+# Minimum difflib ratio for a misspelled topic name to count as a match
+GUIDELINE_FUZZY_CUTOFF = float(os.getenv("GUIDELINE_FUZZY_CUTOFF", "0.8"))
+
+POLICY_EXTENSIONS = (".md", ".txt")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Optional first line of a policy file: "Aliases: know your customer, customer identification"
+ALIASES_PATTERN = re.compile(r"^\s*aliases\s*:(.*)$", re.IGNORECASE)
+# Names with the most shared trigrams that are checked with difflib
+FUZZY_CANDIDATES = 8
+# Longer queries are questions, not topic names, and skip fuzzy matching
+FUZZY_MAX_WORDS = 6
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+CAMEL_CASE_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it my of on or the
+to what when which who why with you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def topic_words(name):
+    """'LoanPolicy' -> 'Loan Policy', so topic names are searchable word by word."""
+    return CAMEL_CASE_BOUNDARY.sub(" ", name)
+
+
+def topic_key(name):
+    """'LoanPolicy', 'loan policy' and 'Loan-Policy' all map to 'loanpolicy'."""
+    return "".join(TOKEN_PATTERN.findall(name.lower()))
+
+
+@dataclass(frozen=True)
+class Passage:
+    topic: str
+    text: str
+    score: float = 0.0
+
+
+def parse_policy(text):
+    """
+    Split a policy file into (aliases, paragraphs).
+
+    Returns:
+        tuple: (list of alias strings, list of non-empty paragraphs)
+    """
+    aliases = []
+    lines = text.strip().splitlines()
+    if lines:
+        match = ALIASES_PATTERN.match(lines[0])
+        if match:
+            aliases = [a.strip() for a in match.group(1).split(",") if a.strip()]
+            lines = lines[1:]
+    paragraphs = [p.strip() for p in PARAGRAPH_SPLIT.split("\n".join(lines)) if p.strip()]
+    return aliases, paragraphs
+
+
+class GuidelineStore:
+    """
+    Guideline topics with an inverted index over their paragraphs.
+
+    A lookup first resolves the query as a topic name (exact, alias, then
+    fuzzy), and otherwise ranks paragraphs with BM25. Topics come from the
+    policy directory and from ``add_topic``; ``reload`` only re-reads files
+    whose mtime or size changed and only re-indexes those topics.
+    """
+
+    def __init__(self, directory=None, k1=1.5, b=0.75, fuzzy_cutoff=GUIDELINE_FUZZY_CUTOFF,
+                 reload_interval=GUIDELINES_RELOAD_INTERVAL, on_change=None):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.reload_interval = reload_interval
+        self.on_change = on_change
+        self._lock = threading.RLock()
+        # term -> {passage id: term frequency}
+        self._postings = {}
+        # passage id -> (topic, text, length in tokens, term counts)
+        self._passages = {}
+        self._total_length = 0
+        # passage id -> BM25 length normalization, rebuilt after the index changes
+        self._norms = None
+        self._next_id = 0
+        # topic -> {"pids": [...], "aliases": [...], "source": path or None}
+        self._topics = {}
+        # topic_key of a topic name or alias -> topic
+        self._names = {}
+        # trigram -> topic_keys containing it, for fuzzy matching
+        self._grams = {}
+        # path -> (mtime_ns, size, topic)
+        self._files = {}
+        self._last_scan = 0.0
+        self.reloads = 0
+        if directory:
+            self.reload()
+
+    # --- indexing ---
+
+    def add_topic(self, topic, text, aliases=(), source=None):
+        """Add or replace one topic."""
+        _, paragraphs = parse_policy(text)
+        with self._lock:
+            self._remove(topic)
+            pids = []
+            for paragraph in paragraphs or [text]:
+                pids.append(self._index_passage(topic, paragraph))
+            self._topics[topic] = {"pids": pids, "aliases": list(aliases), "source": source}
+            for name in (topic, *aliases):
+                self._add_name(topic_key(name), topic)
+
+    def remove_topic(self, topic):
+        with self._lock:
+            self._remove(topic)
+
+    def _index_passage(self, topic, text):
+        pid = self._next_id
+        self._next_id += 1
+        tokens = tokenize(f"{topic_words(topic)} {text}")
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})[pid] = tf
+        self._passages[pid] = (topic, text, len(tokens), counts)
+        self._total_length += len(tokens)
+        self._norms = None
+        return pid
+
+    def _remove(self, topic):
+        entry = self._topics.pop(topic, None)
+        if entry is None:
+            return
+        for pid in entry["pids"]:
+            _, _, length, counts = self._passages.pop(pid)
+            self._total_length -= length
+            self._norms = None
+            for token in counts:
+                postings = self._postings[token]
+                del postings[pid]
+                if not postings:
+                    del self._postings[token]
+        for name in (topic, *entry["aliases"]):
+            key = topic_key(name)
+            if self._names.get(key) == topic:
+                del self._names[key]
+                for gram in trigrams(key):
+                    names = self._grams[gram]
+                    names.discard(key)
+                    if not names:
+                        del self._grams[gram]
+
+    def _add_name(self, key, topic):
+        self._names[key] = topic
+        for gram in trigrams(key):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def reload(self):
+        """
+        Re-read policy files that were added, changed or deleted since the last scan.
+
+        Returns:
+            list: Names of the topics that changed
+        """
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        changed = []
+        with self._lock:
+            seen = set()
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.lower().endswith(POLICY_EXTENSIONS):
+                        continue
+                    seen.add(entry.path)
+                    stat = entry.stat()
+                    known = self._files.get(entry.path)
+                    if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    topic = os.path.splitext(entry.name)[0]
+                    with open(entry.path, encoding="utf-8") as f:
+                        text = f.read()
+                    aliases, _ = parse_policy(text)
+                    self.add_topic(topic, text, aliases, source=entry.path)
+                    self._files[entry.path] = (stat.st_mtime_ns, stat.st_size, topic)
+                    changed.append(topic)
+            for path in set(self._files) - seen:
+                topic = self._files.pop(path)[2]
+                self._remove(topic)
+                changed.append(topic)
+            self._last_scan = time.monotonic()
+            self.reloads += 1
+        if changed and self.on_change is not None:
+            self.on_change(changed)
+        return changed
+
+    def _maybe_reload(self):
+        if self.directory and self.reload_interval and time.monotonic() - self._last_scan >= self.reload_interval:
+            self.reload()
+
+    # --- lookup ---
+
+    def resolve_topic(self, name):
+        """
+        Map a topic name as the LLM wrote it to a known topic.
+
+        Tries the normalized name, then aliases, then the closest fuzzy match.
+
+        Returns:
+            str or None: The topic, or None when nothing is close enough
+        """
+        key = topic_key(name)
+        with self._lock:
+            topic = self._names.get(key)
+            if topic is not None or not key or len(name.split()) > FUZZY_MAX_WORDS:
+                return topic
+            return self._fuzzy_match(key)
+
+    def _fuzzy_match(self, key):
+        # Shortlist names sharing the most trigrams with the key, then verify with difflib
+        # Only the rarer half of the key's trigrams: common ones ("pol", "icy") match everything
+        grams = sorted((self._grams[g] for g in trigrams(key) if g in self._grams), key=len)
+        shared = {}
+        for names in grams[:max(3, len(grams) // 2)]:
+            for name in names:
+                shared[name] = shared.get(name, 0) + 1
+        if not shared:
+            return None
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.get)
+        matcher = difflib.SequenceMatcher(b=key)
+        best, best_ratio = None, self.fuzzy_cutoff
+        for name in candidates:
+            matcher.set_seq1(name)
+            if matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = name, ratio
+        return self._names[best] if best is not None else None
+
+    def search(self, query, k=GUIDELINE_TOP_K):
+        """
+        Rank paragraphs for a free-text query with BM25.
+
+        Returns:
+            list: Up to ``k`` Passage objects, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._passages)
+            if not n or not terms:
+                return []
+            if self._norms is None:
+                avg_length = self._total_length / n
+                self._norms = {
+                    pid: self.k1 * (1 - self.b + self.b * length / avg_length)
+                    for pid, (_, _, length, _) in self._passages.items()
+                }
+            norms = self._norms
+            weighted = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings:
+                    idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                    weighted.append((idf * (self.k1 + 1), postings))
+            # MaxScore: rarest terms first. A term adds at most idf * (k1 + 1), so once the
+            # k-th best score beats everything the remaining terms could add, passages not
+            # seen yet cannot make the top k and long posting lists are only probed.
+            weighted.sort(key=lambda item: item[0], reverse=True)
+            remaining = sum(weight for weight, _ in weighted)
+            scores = {}
+            for weight, postings in weighted:
+                threshold = heapq.nlargest(k, scores.values())[-1] if len(scores) >= k else 0.0
+                if threshold > remaining:
+                    items = [(pid, postings[pid]) for pid in scores if pid in postings]
+                else:
+                    items = postings.items()
+                get = scores.get
+                for pid, tf in items:
+                    scores[pid] = get(pid, 0.0) + weight * tf / (tf + norms[pid])
+                remaining -= weight
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [Passage(self._passages[pid][0], self._passages[pid][1], round(score, 4))
+                    for pid, score in best]
+
+    def lookup(self, query, k=GUIDELINE_TOP_K):
+        """
+        Best passages for a topic name or a question.
+
+        A query that resolves to a topic returns that topic's paragraphs in
+        order (score 1.0); anything else goes through BM25.
+        """
+        self._maybe_reload()
+        topic = self.resolve_topic(query)
+        if topic is not None:
+            with self._lock:
+                pids = self._topics[topic]["pids"]
+                return [Passage(topic, self._passages[pid][1], 1.0) for pid in pids]
+        return self.search(query, k)
+
+    def topics(self):
+        with self._lock:
+            return list(self._topics)
+
+    def __contains__(self, topic):
+        return topic in self._topics
+
+    def stats(self):
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "passages": len(self._passages),
+                "terms": len(self._postings),
+                "files": len(self._files),
+                "reloads": self.reloads,
+            }
@@ -0,0 +1,58 @@
+# --- File: guideline_topics.py ---
+# Guideline topics and the shared store, kept apart from guideline_agent so that the API
+# and the fast path can use them without importing the agent, its LLM client or langchain
+from agents.guideline_store import GUIDELINES_DIR, GuidelineStore
+
+# Built-in topics, used unless a file in GUIDELINES_DIR replaces them
+topics = {
+    "KYC": "Know Your Customer (KYC) is a standard banking process...",
+    "LoanPolicy": "Bank offers personal loans at 12% interest with flexible tenure..."
+}
+
+# Callbacks run after the topics change, e.g. to invalidate cached answers
+_topic_listeners = []
+
+
+def on_topics_changed(callback):
+    """Register ``callback(changed_topics)`` to run whenever the guideline topics change."""
+    _topic_listeners.append(callback)
+
+
+def _notify(changed):
+    for callback in _topic_listeners:
+        callback(list(changed))
+
+
+# Indexed store: files in GUIDELINES_DIR, plus the built-in topics above unless a file replaces them
+store = GuidelineStore(GUIDELINES_DIR, on_change=_notify)
+for _name, _text in topics.items():
+    if _name not in store:
+        store.add_topic(_name, _text)
+
+
+def update_topics(new_topics, replace=False):
+    """
+    Add or replace guideline topics and notify listeners.
+
+    Args:
+        new_topics (dict): Topic name -> guideline text
+        replace (bool): Replace the whole topic set instead of merging
+    """
+    if replace:
+        for name in topics:
+            store.remove_topic(name)
+        topics.clear()
+    topics.update(new_topics)
+    for name, text in new_topics.items():
+        store.add_topic(name, text)
+    _notify(new_topics)
+
+
+def guideline_answer(topic):
+    """Answer text for a topic name or question: the matching passages, labelled by topic when several match."""
+    passages = store.lookup(topic)
+    if not passages:
+        return "No information available on this topic."
+    if len({p.topic for p in passages}) == 1:
+        return "\n\n".join(p.text for p in passages)
+    return "\n\n".join(f"[{p.topic}] {p.text}" for p in passages)
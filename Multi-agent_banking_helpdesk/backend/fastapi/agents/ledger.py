@@ -0,0 +1,270 @@
+# --- File: ledger.py ---
+import asyncio
+import contextvars
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+LEDGER_DB_PATH = os.getenv("LEDGER_DB_PATH", "ledger.db")
+# Largest group commit, and how long the writer waits to fill one (seconds)
+LEDGER_BATCH_SIZE = int(os.getenv("LEDGER_BATCH_SIZE", "512"))
+LEDGER_BATCH_WAIT = float(os.getenv("LEDGER_BATCH_WAIT", "0.002"))
+# NORMAL survives a process crash in WAL mode; FULL also survives power loss
+LEDGER_SYNCHRONOUS = os.getenv("LEDGER_SYNCHRONOUS", "NORMAL")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    id INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    biller_name TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+INSERT_SQL = (
+    "INSERT OR IGNORE INTO payments (idempotency_key, user_id, biller_name, amount_cents, created_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_BY_KEY_SQL = (
+    "SELECT id, idempotency_key, user_id, biller_name, amount_cents, created_at "
+    "FROM payments WHERE idempotency_key=?"
+)
+
+
+class IdempotencyKeyReused(ValueError):
+    """An idempotency key already belongs to a payment with a different user, biller or amount."""
+
+
+@dataclass(frozen=True)
+class Payment:
+    id: int
+    idempotency_key: str
+    user_id: str
+    biller_name: str
+    amount_cents: int
+    created_at: float
+    duplicate: bool = False
+
+    @property
+    def amount(self):
+        return self.amount_cents / 100
+
+
+# Idempotency key of the API request being served, set by begin_request
+_request_key = contextvars.ContextVar("payment_request_key", default=None)
+
+
+def begin_request(key=None):
+    """
+    Start the idempotency scope of one API request in the current context.
+
+    Args:
+        key (str): The client's key for the request; a retry sends the same one.
+                   Default: a new UUID, so the request is never taken for a retry
+
+    Returns:
+        str: The request key
+    """
+    key = key or uuid.uuid4().hex
+    _request_key.set(key)
+    return key
+
+
+def payment_key(user_id, biller_name, amount):
+    """
+    Idempotency key for a payment made while serving the current request.
+
+    A retried request repays nothing, while separate requests always pay,
+    even for the same user, biller and amount.
+
+    Returns:
+        str or None: None outside a request, so the payment is always inserted
+    """
+    request_key = _request_key.get()
+    if request_key is None:
+        return None
+    raw = f"{request_key}|{user_id}|{biller_name.strip().lower()}|{round(float(amount) * 100)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class PaymentLedger:
+    """
+    Idempotent payment store on SQLite in WAL mode.
+
+    Callers enqueue payments; one writer thread drains the queue and
+    commits up to ``batch_size`` inserts per transaction (group commit).
+    A payment whose idempotency key already exists is not inserted again;
+    the original row comes back with ``duplicate=True``. A key that is
+    reused for a different user, biller or amount fails with
+    IdempotencyKeyReused rather than passing the other payment off as a
+    duplicate. A payment without a key gets a fresh one and is always
+    inserted.
+    """
+
+    def __init__(self, path=LEDGER_DB_PATH, batch_size=LEDGER_BATCH_SIZE, batch_wait=LEDGER_BATCH_WAIT,
+                 synchronous=LEDGER_SYNCHRONOUS):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.synchronous = synchronous
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self.commits = 0
+        self.written = 0
+        self._writer = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._ready = threading.Event()
+        self._start_error = None
+        self._writer.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(SCHEMA)
+        return conn
+
+    def submit(self, user_id, biller_name, amount, idempotency_key=None):
+        """
+        Queue a payment for the writer thread.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the stored ``Payment``
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("Ledger is closed")
+        amount_cents = round(float(amount) * 100)
+        if amount_cents <= 0:
+            raise ValueError("Payment amount must be positive")
+        key = idempotency_key or uuid.uuid4().hex
+        future = Future()
+        self._queue.put(((key, user_id, biller_name, amount_cents, time.time()), future))
+        return future
+
+    def pay(self, user_id, biller_name, amount, idempotency_key=None, timeout=10):
+        """Blocking payment; safe to call from any thread."""
+        return self.submit(user_id, biller_name, amount, idempotency_key).result(timeout)
+
+    async def apay(self, user_id, biller_name, amount, idempotency_key=None):
+        """Async payment; awaits the group commit without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(user_id, biller_name, amount, idempotency_key))
+
+    def get(self, idempotency_key):
+        conn = sqlite3.connect(self.path)
+        try:
+            row = conn.execute(SELECT_BY_KEY_SQL, (idempotency_key,)).fetchone()
+        finally:
+            conn.close()
+        return Payment(*row) if row else None
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Payments whose caller was cancelled while queued (e.g. an apay caller whose client
+        # disconnected) are not made; the rest can no longer be cancelled, so their results
+        # can always be set
+        return [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+
+    def _write(self, conn, batch):
+        """
+        Insert a batch in one transaction.
+
+        Returns:
+            list: A Payment, or the IdempotencyKeyReused error, per batch item
+        """
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row, _ in batch:
+                inserted = conn.execute(INSERT_SQL, row).rowcount == 1
+                if inserted:
+                    results.append(Payment(conn.execute("SELECT last_insert_rowid()").fetchone()[0], *row))
+                    continue
+                existing = Payment(*conn.execute(SELECT_BY_KEY_SQL, (row[0],)).fetchone(), duplicate=True)
+                # Biller names compare as payment_key normalizes them
+                same = (existing.user_id == row[1] and existing.amount_cents == row[3]
+                        and existing.biller_name.strip().lower() == row[2].strip().lower())
+                if not same:
+                    results.append(IdempotencyKeyReused(
+                        f"Idempotency key {row[0]!r} was already used for payment #{existing.id}"
+                    ))
+                else:
+                    results.append(existing)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            while not (self._stopped.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    results = self._write(conn, batch)
+                except Exception as e:
+                    logger.exception("Ledger group commit failed")
+                    for _, future in batch:
+                        future.set_exception(e)
+                    continue
+                self.commits += 1
+                self.written += sum(1 for p in results if isinstance(p, Payment) and not p.duplicate)
+                for (_, future), payment in zip(batch, results):
+                    if isinstance(payment, Exception):
+                        future.set_exception(payment)
+                    else:
+                        future.set_result(payment)
+        finally:
+            conn.close()
+
+    def close(self):
+        """Flush queued payments and stop the writer thread."""
+        self._stopped.set()
+        self._writer.join()
+
+    def stats(self):
+        return {"commits": self.commits, "written": self.written, "queued": self._queue.qsize()}
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Process-wide ledger, opened on first use."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = PaymentLedger()
+    return _ledger
@@ -0,0 +1,127 @@
+# --- File: llm_client.py ---
+import os
+import threading
+
+import httpx
+from dotenv import load_dotenv
+from langchain_groq import ChatGroq
+
+DEFAULT_MODEL = "llama3-8b-8192"
+
+# Keep-alive pool shared by every ChatGroq instance in this worker
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+# Timeouts (seconds) and retries for each LLM request
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+_lock = threading.Lock()
+_environment_configured = False
+_http_client = None
+_http_async_client = None
+_llm_cache = {}
+
+
+def configure_environment():
+    """Load .env and set the LangChain tracing variables, once per process."""
+    global _environment_configured
+    if _environment_configured:
+        return
+    load_dotenv()
+    os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
+    os.environ["LANGCHAIN_TRACING_V2"] = "true"
+    os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
+    _environment_configured = True
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout():
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def get_http_client():
+    """Process-wide sync HTTP client; TLS and connection setup are paid once and reused."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(limits=_limits(), timeout=_timeout())
+    return _http_client
+
+
+def get_async_http_client():
+    """Process-wide async HTTP client for ``ainvoke``/``astream`` calls."""
+    global _http_async_client
+    if _http_async_client is None:
+        with _lock:
+            if _http_async_client is None:
+                _http_async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+    return _http_async_client
+
+
+def get_llm(model=DEFAULT_MODEL, temperature=0):
+    """
+    Return the shared chat model for ``(model, temperature)``.
+
+    All instances use the same pooled HTTP clients. Setting
+    ``BANKING_LLM_STUB=true`` returns a local stub instead of ChatGroq, for
+    benchmarks that must not reach the network.
+
+    Args:
+        model (str): Groq model name
+        temperature (float): Sampling temperature
+
+    Returns:
+        BaseChatModel: Cached chat model instance
+    """
+    configure_environment()
+    key = (model, temperature)
+    llm = _llm_cache.get(key)
+    if llm is not None:
+        return llm
+    with _lock:
+        llm = _llm_cache.get(key)
+        if llm is None:
+            llm = _llm_cache[key] = _build_llm(model, temperature)
+    return llm
+
+
+def _build_llm(model, temperature):
+    if os.getenv("BANKING_LLM_STUB", "false").lower() == "true":
+        from agents.stub_llm import StubChatModel
+        return StubChatModel(
+            latency=float(os.getenv("BANKING_LLM_STUB_LATENCY", "0.2")),
+            token_delay=float(os.getenv("BANKING_LLM_STUB_TOKEN_DELAY", "0")),
+        )
+    return ChatGroq(
+        model=model,
+        temperature=temperature,
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        timeout=_timeout(),
+        max_retries=LLM_MAX_RETRIES,
+    )
+
+
+async def aclose_clients():
+    """Close the pooled HTTP clients, e.g. on worker shutdown."""
+    global _http_client, _http_async_client
+    with _lock:
+        _llm_cache.clear()
+        client, async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
@@ -0,0 +1,98 @@
+# --- File: registry.py ---
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Routing name -> (module, builder function). Modules are only imported on first use.
+AGENT_BUILDERS = {
+    "guidelines": ("agents.guideline_agent", "build_guideline_agent"),
+    "accounts": ("agents.account_agent", "build_account_agent"),
+    "billing": ("agents.billing_agent", "build_billing_agent"),
+}
+
+
+class AgentRegistry:
+    """
+    Builds each agent on first use and caches it for the life of the process.
+
+    Import and build time are recorded per agent so the cold-start cost of a
+    new worker can be seen in /health and /warmup.
+    """
+
+    def __init__(self, builders):
+        self.builders = dict(builders)
+        self._agents = {}
+        self._timings = {}
+        self._locks = {name: threading.Lock() for name in self.builders}
+
+    def __contains__(self, name):
+        return name in self.builders
+
+    def get(self, name):
+        """
+        Return the agent for a routing name, building it if needed.
+
+        Args:
+            name (str): Routing name, e.g. 'accounts'
+
+        Returns:
+            AgentExecutor: The cached agent
+
+        Raises:
+            ValueError: If no builder is registered for ``name``
+        """
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self.builders:
+            raise ValueError(f"Unknown agent: {name}")
+        with self._locks[name]:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._agents[name] = self._build(name)
+        return agent
+
+    def _build(self, name):
+        module_name, builder_name = self.builders[name]
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        imported = time.perf_counter()
+        agent = getattr(module, builder_name)()
+        built = time.perf_counter()
+        self._timings[name] = {
+            "import_ms": round((imported - start) * 1000, 2),
+            "build_ms": round((built - imported) * 1000, 2),
+        }
+        return agent
+
+    def run(self, name, query, config=None):
+        """
+        Blocking agent run; meant to be called from the agent executor.
+
+        ``config`` carries the caller's callbacks, so agent, tool and LLM
+        events reach the graph's event stream from the executor thread.
+        """
+        return self.get(name).invoke({"input": query}, config=config)["output"]
+
+    def warmup(self, names=None):
+        """
+        Build the given agents (default: all) concurrently.
+
+        Returns:
+            dict: Import/build timings per agent
+        """
+        names = [name for name in (names or self.builders) if name in self.builders]
+        if names:
+            with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="warmup") as pool:
+                list(pool.map(self.get, names))
+        return self.stats()
+
+    def stats(self):
+        return {
+            name: {"built": name in self._agents, **self._timings.get(name, {})}
+            for name in self.builders
+        }
+
+
+registry = AgentRegistry(AGENT_BUILDERS)
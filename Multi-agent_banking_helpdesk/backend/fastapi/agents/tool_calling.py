@@ -0,0 +1,78 @@
+# --- File: tool_calling.py ---
+import json
+import os
+
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import ToolException
+from pydantic import BaseModel, ValidationError
+
+# "react" parses free-text Action blocks; "tools" uses the model's native tool calling
+AGENT_MODE = os.getenv("AGENT_MODE", "react").lower()
+# Hard cap on LLM round trips per query, in both modes
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "3"))
+
+ITERATION_LIMIT_MESSAGE = "Agent stopped due to iteration limit."
+
+
+def tool_text(result):
+    """Plain text for a tool result; single-field output models are unwrapped."""
+    if isinstance(result, BaseModel):
+        fields = result.model_dump()
+        if len(fields) == 1:
+            return str(next(iter(fields.values())))
+        return json.dumps(fields, default=str)
+    return str(result)
+
+
+class ToolCallingAgent:
+    """
+    Agent loop on the model's native tool calling.
+
+    Arguments arrive as typed JSON validated against each tool's
+    ``args_schema``, so there is no "Action:" text to parse. The loop ends
+    when the model answers without a tool call, when a ``return_direct``
+    tool runs (its output is the answer, no summarizing LLM call), or after
+    ``max_iterations`` LLM calls. Arguments that fail validation, or a
+    ToolException, go back to the model as the tool's output so it can
+    retry, as ``handle_parsing_errors`` does for the ReAct executor.
+
+    ``invoke`` takes and returns the same dicts as ``AgentExecutor``, plus
+    ``llm_calls`` in the result.
+    """
+
+    def __init__(self, llm, tools, system_prompt, return_direct=(), max_iterations=AGENT_MAX_ITERATIONS):
+        self.tools = {t.name: t for t in tools}
+        self.llm = llm.bind_tools(tools)
+        self.system_prompt = system_prompt
+        self.return_direct = set(return_direct)
+        self.max_iterations = max_iterations
+
+    def invoke(self, inputs, config=None):
+        messages = [SystemMessage(self.system_prompt), HumanMessage(inputs["input"])]
+        for iteration in range(1, self.max_iterations + 1):
+            message = self.llm.invoke(messages, config=config)
+            messages.append(message)
+            if not message.tool_calls:
+                return {"output": message.content, "llm_calls": iteration}
+
+            outputs = []
+            failed = False
+            for call in message.tool_calls:
+                tool = self.tools.get(call["name"])
+                if tool is None:
+                    output = f"Unknown tool: {call['name']}"
+                    failed = True
+                else:
+                    try:
+                        output = tool_text(tool.invoke(call["args"], config=config))
+                    except (ValidationError, ToolException) as e:
+                        # Bad model-generated arguments: let the model correct them on the next iteration
+                        output = f"Error calling {call['name']}: {e}"
+                        failed = True
+                outputs.append((call, output))
+                messages.append(ToolMessage(output, tool_call_id=call["id"]))
+
+            # An error is never the answer, even from a return_direct tool
+            if not failed and all(call["name"] in self.return_direct for call, _ in outputs):
+                return {"output": "\n".join(output for _, output in outputs), "llm_calls": iteration}
+        return {"output": ITERATION_LIMIT_MESSAGE, "llm_calls": self.max_iterations}
@@ -0,0 +1,244 @@
+# --- File: vector_index.py ---
+import logging
+import os
+import pickle
+import threading
+import time
+
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+BANK_DOCS_PATH = os.getenv("BANK_DOCS_PATH", "bank_docs")
+BANK_DOCS_MMAP = os.getenv("BANK_DOCS_MMAP", "true").lower() == "true"
+# Seconds between checks of the CURRENT snapshot pointer; 0 disables hot reload
+BANK_DOCS_RELOAD_INTERVAL = float(os.getenv("BANK_DOCS_RELOAD_INTERVAL", "10"))
+BANK_DOCS_TOP_K = int(os.getenv("BANK_DOCS_TOP_K", "4"))
+
+# Snapshot layout written by agents/bank_docs_builder.py:
+#   bank_docs/CURRENT              name of the active snapshot
+#   bank_docs/snapshots/<name>/    index.faiss, index.pkl, manifest.json
+# A bank_docs directory holding index.faiss directly is served as is.
+SNAPSHOTS_DIR = "snapshots"
+CURRENT_FILE = "CURRENT"
+
+# Embedding backend used to embed queries against bank_docs. It must match
+# the backend the index was built with.
+BANK_EMBEDDINGS = os.getenv("BANK_EMBEDDINGS", "openai")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+
+
+def _openai_embeddings():
+    from langchain_community.embeddings import OpenAIEmbeddings
+    return OpenAIEmbeddings()
+
+
+def _local_cpu_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=LOCAL_EMBEDDING_MODEL,
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
+
+EMBEDDING_BACKENDS = {
+    "openai": _openai_embeddings,
+    "local": _local_cpu_embeddings,
+}
+
+_lock = threading.Lock()
+_embeddings = {}
+# path -> (snapshot directory, store)
+_stores = {}
+load_stats = {}
+reload_stats = {}
+_last_check = {}
+# Paths with a background reload in progress
+_reloading = set()
+
+
+def get_embeddings(backend=None):
+    """
+    Shared embedding model for a backend name ('openai' or 'local').
+
+    Raises:
+        ValueError: If the backend is not registered in EMBEDDING_BACKENDS
+    """
+    backend = backend or BANK_EMBEDDINGS
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    with _lock:
+        if backend not in _embeddings:
+            _embeddings[backend] = EMBEDDING_BACKENDS[backend]()
+        return _embeddings[backend]
+
+
+def _is_mapped(index_file):
+    """Whether ``index_file`` is mapped into this process (Linux only; False elsewhere)."""
+    target = os.path.realpath(index_file)
+    try:
+        with open("/proc/self/maps") as f:
+            return any(line.rstrip("\n").endswith(" " + target) for line in f)
+    except OSError:
+        return False
+
+
+def read_faiss_index(index_file, mmap=BANK_DOCS_MMAP):
+    """
+    Read a FAISS index, memory-mapped when possible so that every worker on
+    the host shares the same page-cache pages.
+
+    IO_FLAG_MMAP_IFC maps the codes of flat indexes (IndexFlatL2 and other
+    IndexFlatCodes), which plain IO_FLAG_MMAP copies into private memory.
+    Older FAISS builds without the flag, and index types it cannot map, are
+    read into private memory instead.
+
+    Returns:
+        tuple: (index, whether the file is actually mapped)
+    """
+    if mmap:
+        try:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP_IFC)
+        except (AttributeError, RuntimeError, TypeError, ValueError) as e:
+            logger.warning("Cannot mmap %s (%s); loading it into memory", index_file, e)
+        else:
+            mapped = _is_mapped(index_file)
+            if not mapped:
+                logger.warning("%s was read into private memory, not mapped", index_file)
+            return index, mapped
+    return faiss.read_index(index_file), False
+
+
+def load_vectorstore(path=BANK_DOCS_PATH, embeddings=None, mmap=BANK_DOCS_MMAP):
+    """
+    Load a directory written by ``FAISS.save_local`` (index.faiss + index.pkl).
+
+    Args:
+        path (str): Index directory
+        embeddings: Query embedding model, default ``get_embeddings()``
+        mmap (bool): Memory-map the vectors instead of copying them
+
+    Returns:
+        FAISS: LangChain vector store over the mapped index
+    """
+    start = time.perf_counter()
+    index, mapped = read_faiss_index(os.path.join(path, "index.faiss"), mmap=mmap)
+    # index.pkl is our own save_local output, not untrusted input
+    with open(os.path.join(path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    store = FAISS(
+        embedding_function=embeddings or get_embeddings(),
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+    )
+    load_stats[path] = {
+        "load_ms": round((time.perf_counter() - start) * 1000, 2),
+        "mmap": mapped,
+        "vectors": index.ntotal,
+    }
+    return store
+
+
+def current_snapshot(path=BANK_DOCS_PATH):
+    """Directory of the active snapshot under ``path`` (``path`` itself for the flat layout)."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return path
+    return os.path.join(path, SNAPSHOTS_DIR, name)
+
+
+def reload_bank_docs(path=BANK_DOCS_PATH):
+    """
+    Swap to the snapshot CURRENT points at, if it is not the one being served.
+
+    The new snapshot is loaded before the swap, so queries keep using the
+    old store until then and only wait for the dictionary update.
+
+    Returns:
+        dict: Snapshot served, whether it changed, load and pause times
+    """
+    snapshot = current_snapshot(path)
+    loaded = _stores.get(path)
+    if loaded is not None and loaded[0] == snapshot:
+        return {"snapshot": snapshot, "changed": False}
+    start = time.perf_counter()
+    store = load_vectorstore(snapshot)
+    loaded_at = time.perf_counter()
+    with _lock:
+        previous = _stores.get(path)
+        _stores[path] = (snapshot, store)
+        _last_check[path] = time.monotonic()
+    swapped = time.perf_counter()
+    stats = reload_stats[path] = {
+        "snapshot": snapshot,
+        "previous": previous[0] if previous else None,
+        "changed": True,
+        "load_ms": round((loaded_at - start) * 1000, 2),
+        "pause_ms": round((swapped - loaded_at) * 1000, 4),
+        "vectors": store.index.ntotal,
+    }
+    if previous:
+        logger.info("bank_docs switched from %s to %s", previous[0], snapshot)
+    return stats
+
+
+def _background_reload(path):
+    try:
+        reload_bank_docs(path)
+    except Exception:
+        logger.exception("bank_docs reload of %s failed", path)
+    finally:
+        with _lock:
+            _reloading.discard(path)
+
+
+def _maybe_reload(path):
+    if not BANK_DOCS_RELOAD_INTERVAL or time.monotonic() - _last_check.get(path, 0) < BANK_DOCS_RELOAD_INTERVAL:
+        return
+    _last_check[path] = time.monotonic()
+    if current_snapshot(path) != _stores[path][0]:
+        with _lock:
+            # One load at a time; calls during a reload keep the current store
+            if path in _reloading:
+                return
+            _reloading.add(path)
+        # Load off the query path; queries keep the current store meanwhile
+        threading.Thread(target=_background_reload, args=(path,), name="bank-docs-reload", daemon=True).start()
+
+
+def get_bank_docs(path=BANK_DOCS_PATH):
+    """
+    The process-wide bank_docs vector store, loaded on first use.
+
+    Every BANK_DOCS_RELOAD_INTERVAL seconds the CURRENT pointer is checked,
+    and a new snapshot is loaded in the background and swapped in.
+    """
+    loaded = _stores.get(path)
+    if loaded is None:
+        with _lock:
+            loaded = _stores.get(path)
+        if loaded is None:
+            snapshot = current_snapshot(path)
+            store = load_vectorstore(snapshot)
+            with _lock:
+                loaded = _stores.setdefault(path, (snapshot, store))
+                _last_check.setdefault(path, time.monotonic())
+    else:
+        _maybe_reload(path)
+    return loaded[1]
+
+
+class BankDocsRetriever(BaseRetriever):
+    """Retriever that always searches the currently served bank_docs snapshot."""
+
+    path: str = BANK_DOCS_PATH
+    k: int = BANK_DOCS_TOP_K
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return get_bank_docs(self.path).similarity_search(query, k=self.k)
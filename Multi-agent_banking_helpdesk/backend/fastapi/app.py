@@ -1,24 +1,33 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, END
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
 from instructor import patch
-from langchain_groq import ChatGroq
+from typing import List, Optional
+import asyncio
+import json
 import os
+import time
 import uvicorn
 
-from agents.guideline_agent import guideline_agent
-from agents.account_agent import account_agent
-from agents.billing_agent import billing_agent
-
-from dotenv import load_dotenv
-
-load_dotenv()
-
-lc_api_key = os.environ.get('LANGCHAIN_API_KEY')
-os.environ["LANGCHAIN_API_URL"] = "https://api.langchain.com/v1/graphql"
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "multi-agent-assistant"
+from agents.registry import registry
+from concurrency import limiter
+from router import router
+import fast_path
+from profiling import profile_node, profile_request, should_profile
+from streaming import stream_graph_events
+from response_cache import guideline_cache, is_answer
+from agents.guideline_topics import on_topics_changed, store as guideline_store
+from agents.ledger import begin_request
+from agents.llm_client import get_llm, aclose_clients
+from metrics import (
+    metrics, instrument_node, AGENT_LATENCY, ERRORS, IN_FLIGHT, LLM_CALLS,
+    LLM_CALLS_PER_REQUEST, REQUESTS
+)
 
 
 # Initialize FastAPI with metadata
@@ -41,37 +50,267 @@ class AgentState(dict):
     """Shared state for agents"""
     user_input: str = Field(..., description="User's input query")
     user_id: str = Field(..., description="Unique identifier for the user")
+    status: str = Field(None, description="'success' or 'error' after each node")
+    response: str = Field(None, description="Final answer for the user")
+    agent: str = Field(None, description="Agent that produced the response")
+    error: str = Field(None, description="Error message, if any")
+    served_by: str = Field(None, description="'fast_path' (no LLM) or 'agent'")
     #pass
 
 class UserQuery(BaseModel):
     user_id: str
     user_input: str
+    idempotency_key: Optional[str] = Field(
+        None, description="Send the same key when retrying a request so a payment in it is made only once"
+    )
+
+class BatchQuery(BaseModel):
+    queries: List[UserQuery]
+    max_concurrency: Optional[int] = Field(None, gt=0, description="Per-agent group concurrency for this batch")
+
+class WarmupRequest(BaseModel):
+    agents: Optional[List[str]] = None
 
 class RoutingDecision(BaseModel):
     agent_name: str = Field(..., description="One of: 'guidelines', 'accounts', 'billing'")
     user_query: str = Field(..., description="Rewritten user query for the selected agent")
+    confidence: float = Field(1.0, description="Router confidence in the selected agent, 0 to 1")
 
-# Initialize LLM
-llm = ChatGroq(
-    model="llama3-8b-8192",
-    temperature=0,
-    groq_api_key=os.environ.get("GROQ_API_KEY")
-)
+# Shared LLM (same instance and connection pool as the agents)
+llm = get_llm("llama3-8b-8192")
+
+# Send low-confidence keyword routing decisions to the LLM
+LLM_ROUTING_FALLBACK = os.getenv("ROUTER_LLM_FALLBACK", "false").lower() == "true"
+
+# Cached guideline answers go stale as soon as the topics change
+on_topics_changed(guideline_cache.invalidate)
+
+# Answer unambiguous balance/guideline queries without the LLM
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Default number of queries each agent group of a batch runs at once
+BATCH_GROUP_CONCURRENCY = int(os.getenv("BATCH_GROUP_CONCURRENCY", "8"))
+
+# Agents to build at startup: empty (lazy), "all", or a comma-separated list
+AGENT_PRELOAD = os.getenv("AGENT_PRELOAD", "")
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "concurrency": limiter.stats(),
+        "agents": registry.stats(),
+        "paths": fast_path.path_stats.snapshot(),
+        "guideline_cache": guideline_cache.stats(),
+        "guideline_store": guideline_store.stats(),
+    }
+
+# Drop cached guideline answers, e.g. after the guideline corpus was updated
+@app.post("/cache/invalidate")
+async def invalidate_cache():
+    guideline_cache.invalidate()
+    return {"guideline_cache": guideline_cache.stats()}
+
+# Build agents ahead of traffic and report per-agent import/build time
+@app.post("/warmup")
+async def warmup_handler(request: Optional[WarmupRequest] = None):
+    names = request.agents if request else None
+    loop = asyncio.get_running_loop()
+    return {"agents": await loop.run_in_executor(None, registry.warmup, names)}
+
+# Switch the bank_docs RAG index to the snapshot CURRENT points at (see agents/bank_docs_builder.py)
+@app.post("/bank_docs/reload")
+async def reload_bank_docs_handler():
+    # Imported here so the service does not load FAISS unless bank_docs is used
+    from agents.vector_index import reload_bank_docs
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, reload_bank_docs)
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def metrics_handler():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts the LLM calls made while answering one request"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.calls += 1
+        LLM_CALLS.inc()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+        LLM_CALLS.inc()
+
+def record_request(endpoint, served_by, llm_calls, seconds):
+    fast_path.path_stats.record(served_by, seconds)
+    REQUESTS.inc(endpoint, served_by)
+    LLM_CALLS_PER_REQUEST.observe(llm_calls, served_by)
 
 # Main query endpoint
 @app.post("/query")
-async def query_handler(request: UserQuery):
+async def query_handler(request: UserQuery, http_request: Request):
+    IN_FLIGHT.inc("/query")
     try:
         state = {"user_input": request.user_input, "user_id": request.user_id}
-        result = graph.invoke(state)
-        return {"response": result["response"]}
+        counter = LLMCallCounter()
+        begin_request(request.idempotency_key)
+        async with limiter.request_slot():
+            start = time.perf_counter()
+            # Opt-in per request (PROFILE_HEADER) or sampled (PROFILE_SAMPLE_RATE)
+            with profile_request(should_profile(http_request.headers)) as profile:
+                result = await graph.ainvoke(state, config={"callbacks": [counter]})
+            served_by = result.get("served_by", "agent")
+            record_request("/query", served_by, counter.calls, time.perf_counter() - start)
+        response = {"response": result["response"], "served_by": served_by, "llm_calls": counter.calls}
+        if profile is not None:
+            response["profile"] = {**profile.summary(), "file": profile.path}
+        return response
     except Exception as e:
+        ERRORS.inc(type(e).__name__)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        IN_FLIGHT.dec("/query")
+
+# Streaming query endpoint (server-sent events)
+@app.post("/query/stream")
+async def query_stream_handler(request: UserQuery):
+    state = {"user_input": request.user_input, "user_id": request.user_id}
+
+    async def events():
+        IN_FLIGHT.inc("/query/stream")
+        try:
+            counter = LLMCallCounter()
+            begin_request(request.idempotency_key)
+            async with limiter.request_slot():
+                start = time.perf_counter()
+
+                def record(final):
+                    served_by = final.get("served_by", "agent")
+                    record_request("/query/stream", served_by, counter.calls, time.perf_counter() - start)
+                    return {"llm_calls": counter.calls}
+
+                config = {"callbacks": [counter]}
+                async for frame in stream_graph_events(graph, state, config=config, on_done=record):
+                    yield frame
+        finally:
+            IN_FLIGHT.dec("/query/stream")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Batch query endpoint: one JSON line per query in input order, then a summary line
+@app.post("/query/batch")
+async def query_batch_handler(request: BatchQuery):
+    return StreamingResponse(
+        batch_results(
+            request.queries,
+            BATCH_GROUP_CONCURRENCY if request.max_concurrency is None else request.max_concurrency
+        ),
+        media_type="application/x-ndjson"
+    )
+
+async def batch_results(queries: List[UserQuery], group_concurrency: int):
+    """
+    Answer a batch of queries.
+
+    Identical (user_id, user_input) pairs are answered once. Fast-path
+    queries are answered inline; the rest are routed in one call, grouped
+    by agent and each group runs up to ``group_concurrency`` at a time.
+    Results are yielded in input order as soon as they are ready.
+    """
+    start = time.perf_counter()
+    unique = {}
+    for query in queries:
+        # key -> idempotency key of its first occurrence
+        unique.setdefault((query.user_id, query.user_input), query.idempotency_key)
+
+    results = {}
+    pending = []
+    for key in unique:
+        user_id, user_input = key
+        answered = fast_path.answer(user_input, user_id) if FAST_PATH_ENABLED and user_input and user_id else None
+        future = asyncio.get_running_loop().create_future()
+        results[key] = future
+        if not user_input or not user_id:
+            future.set_result({"status": "error", "error": "Missing required input"})
+        elif answered is not None:
+            future.set_result({
+                "status": "success", "response": answered[1], "agent": answered[0], "served_by": "fast_path",
+                "llm_calls": 0
+            })
+        else:
+            pending.append(key)
+
+    groups = {}
+    for key, decision in zip(pending, route_many([key[1] for key in pending])):
+        groups.setdefault(decision.agent_name, []).append((key, decision))
+
+    agent_timing = {}
+
+    async def run_group(agent_name, items):
+        semaphore = asyncio.Semaphore(group_concurrency)
+        timing = agent_timing[agent_name] = {"queries": len(items), "busy_ms": 0.0}
+        group_start = time.perf_counter()
+
+        async def run_one(key, decision):
+            # Runs in its own task, so the payment scope covers this query only
+            begin_request(unique[key])
+            async with semaphore:
+                one_start = time.perf_counter()
+                counter = LLMCallCounter()
+                try:
+                    result = await run_decision(decision, {"callbacks": [counter]})
+                except Exception as e:
+                    ERRORS.inc(type(e).__name__)
+                    result = {"status": "error", "error": str(e)}
+                result["llm_calls"] = counter.calls
+                if not results[key].done():
+                    results[key].set_result(result)
+                elapsed = time.perf_counter() - one_start
+                timing["busy_ms"] += elapsed * 1000
+                record_request("/query/batch", result.get("served_by", "error"), counter.calls, elapsed)
+
+        try:
+            await asyncio.gather(*(run_one(key, decision) for key, decision in items))
+        except Exception as e:
+            # Every query must get a result, or the stream waits on it forever
+            ERRORS.inc(type(e).__name__)
+            for key, _ in items:
+                if not results[key].done():
+                    results[key].set_result({"status": "error", "error": str(e), "llm_calls": 0})
+        timing["wall_ms"] = round((time.perf_counter() - group_start) * 1000, 2)
+        timing["mean_ms"] = round(timing["busy_ms"] / len(items), 2)
+        timing["busy_ms"] = round(timing["busy_ms"], 2)
+
+    IN_FLIGHT.inc("/query/batch")
+    async with limiter.request_slot():
+        tasks = [asyncio.create_task(run_group(name, items)) for name, items in groups.items()]
+        try:
+            for index, query in enumerate(queries):
+                result = await results[(query.user_id, query.user_input)]
+                yield json.dumps({"index": index, "user_id": query.user_id, **result}) + "\n"
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            IN_FLIGHT.dec("/query/batch")
+
+    elapsed = time.perf_counter() - start
+    yield json.dumps({"summary": {
+        "queries": len(queries),
+        "unique": len(unique),
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "queries_per_s": round(len(queries) / elapsed, 2) if elapsed else None,
+        "agents": agent_timing,
+    }}) + "\n"
 
 # Error handler
 @app.exception_handler(Exception)
@@ -88,50 +327,99 @@ def handle_error(state):
     return {"response": f"Error: {error}", "status": "error"}
 
 
+async def deterministic_path(state: AgentState, config: RunnableConfig) -> dict:
+    """Answer unambiguous balance/guideline queries directly, without the LLM"""
+    result = fast_path.answer(state["user_input"], state.get("user_id")) if FAST_PATH_ENABLED else None
+    if result is None:
+        return {"served_by": "agent"}
+    agent_name, response = result
+    await adispatch_custom_event(
+        "routing", {"agent": agent_name, "confidence": 1.0, "served_by": "fast_path"}, config=config
+    )
+    return {
+        "status": "success",
+        "response": response,
+        "agent": agent_name,
+        "served_by": "fast_path"
+    }
+
 def route_to_agent(query: str) -> RoutingDecision:
     """Determine which agent should handle the query"""
-    # Simple keyword-based routing
-    keywords = {
-        'guidelines': ['policy', 'kyc', 'rules', 'guidelines'],
-        'accounts': ['balance', 'transfer', 'account'],
-        'billing': ['pay', 'bill', 'payment']
-    }
-    
-    query_lower = query.lower()
-    for agent, words in keywords.items():
-        if any(word in query_lower for word in words):
-            return RoutingDecision(
-            agent_name=agent,
-            user_query=query
-            )
-        # Default to guidelines if no matches found
-        return RoutingDecision(
-        agent_name='guidelines',  # Default to guidelines
-        user_query=query
+    # Keyword routing through the pattern compiled once in router.py
+    agent_name, confidence, _ = router.route(query)
+    return RoutingDecision(
+        agent_name=agent_name,
+        user_query=query,
+        confidence=confidence
+    )
+
+def route_many(queries: list) -> list:
+    """Route a batch of queries in one call, preserving input order"""
+    return [
+        RoutingDecision(agent_name=agent_name, user_query=query, confidence=confidence)
+        for query, (agent_name, confidence, _) in zip(queries, router.route_many(queries))
+    ]
+
+def llm_route(query: str, config: Optional[RunnableConfig] = None) -> RoutingDecision:
+    """Ask the LLM to pick an agent when keyword routing is not confident"""
+    decision = llm.with_structured_output(RoutingDecision).invoke(
+        "Pick the agent for this banking helpdesk query. "
+        "agent_name must be one of: 'guidelines', 'accounts', 'billing'.\n"
+        f"Query: {query}",
+        config=config
+    )
+    return RoutingDecision(agent_name=decision.agent_name, user_query=query, confidence=1.0)
+
+async def run_decision(decision: RoutingDecision, config: Optional[RunnableConfig] = None) -> dict:
+    """Answer a routed query from the guideline cache or the selected agent"""
+    if decision.agent_name not in registry:
+        raise ValueError(f"Unknown agent: {decision.agent_name}")
+
+    # Guideline answers only depend on the topics, so repeat questions come from the cache
+    if decision.agent_name == "guidelines":
+        cached = guideline_cache.get(decision.user_query)
+        if cached is not None:
+            return {
+                "status": "success",
+                "response": cached,
+                "agent": decision.agent_name,
+                "served_by": "cache"
+            }
+
+    # The blocking ReAct run (and a first-use build) goes to the agent executor
+    start = time.perf_counter()
+    response = await limiter.run_agent(
+        decision.agent_name, registry.run, decision.agent_name, decision.user_query, config=config
     )
+    AGENT_LATENCY.observe(time.perf_counter() - start, decision.agent_name)
+    result = {
+        "status": "success",
+        "response": response,
+        "agent": decision.agent_name,
+        "served_by": "agent"
+    }
+    # Iteration-limit, parse-error and error outputs would be replayed to everyone asking the same question
+    if decision.agent_name == "guidelines" and result["status"] == "success" and is_answer(response):
+        guideline_cache.put(decision.user_query, response)
 
-def orchestrator(state: AgentState) -> dict:
+    return result
+
+async def orchestrator(state: AgentState, config: RunnableConfig) -> dict:
     """Route and process queries through appropriate agents"""
     try:
         # Get routing decision
         decision = route_to_agent(state["user_input"])
+        if LLM_ROUTING_FALLBACK and not router.is_confident(decision.confidence):
+            decision = await limiter.run_agent("router", llm_route, state["user_input"], config)
+        await adispatch_custom_event(
+            "routing",
+            {"agent": decision.agent_name, "confidence": decision.confidence, "served_by": "agent"},
+            config=config
+        )
         
-        # Route to appropriate agent
-        if decision.agent_name == "guidelines":
-            response = guideline_agent.run(decision.user_query)
-        elif decision.agent_name == "accounts":
-            response = account_agent.run(decision.user_query)
-        elif decision.agent_name == "billing":
-            response = billing_agent.run(decision.user_query)
-        else:
-            raise ValueError(f"Unknown agent: {decision.agent_name}")
-            
-        return {
-            "status": "success",
-            "response": response,
-            "agent": decision.agent_name
-        }
+        return await run_decision(decision, config)
     except Exception as e:
+        ERRORS.inc(type(e).__name__)
         return {
             "status": "error",
             "error": str(e)
@@ -141,10 +429,15 @@ def orchestrator(state: AgentState) -> dict:
 # Build LangGraph with proper flow
 builder = StateGraph(AgentState)
 
+def graph_node(name, func):
+    """Node timed into banking_node_latency_seconds and sampled for profiled requests"""
+    return instrument_node(name, profile_node(name, func))
+
 # Add nodes
-builder.add_node("validate", validate_input)
-builder.add_node("orchestrator", orchestrator)
-builder.add_node("error_handler", handle_error)
+builder.add_node("validate", graph_node("validate", validate_input))
+builder.add_node("fast_path", graph_node("fast_path", deterministic_path))
+builder.add_node("orchestrator", graph_node("orchestrator", orchestrator))
+builder.add_node("error_handler", graph_node("error_handler", handle_error))
 
 # Configure edges
 builder.set_entry_point("validate")
@@ -152,7 +445,13 @@ builder.set_entry_point("validate")
 # Add edges with conditional routing
 builder.add_conditional_edges(
     "validate",
-    lambda x: "orchestrator" if x["status"] == "success" else "error_handler"
+    lambda x: "fast_path" if x["status"] == "success" else "error_handler"
+)
+
+# Fall through to the LLM orchestrator only when the fast path could not answer
+builder.add_conditional_edges(
+    "fast_path",
+    lambda x: END if x.get("served_by") == "fast_path" else "orchestrator"
 )
 
 # Add edge from orchestrator to END to ensure completion
@@ -166,6 +465,19 @@ builder.set_finish_point("orchestrator")
 # Compile graph with config
 graph = builder.compile()
 
+@app.on_event("startup")
+async def preload_agents():
+    if not AGENT_PRELOAD:
+        return
+    names = None if AGENT_PRELOAD == "all" else [n.strip() for n in AGENT_PRELOAD.split(",")]
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, registry.warmup, names)
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    limiter.shutdown()
+    await aclose_clients()
+
 if __name__ == "__main__":
     uvicorn.run(
         "app:app",
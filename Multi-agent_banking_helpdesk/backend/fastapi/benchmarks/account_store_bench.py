@@ -0,0 +1,137 @@
+# --- File: benchmarks/account_store_bench.py ---
+"""
+Memory and lookup throughput: nested-dict accounts vs. agents/account_store.py.
+
+For each size, every variant runs in its own process so resident memory
+is measured in isolation:
+
+- dict:  {user_id: {"savings": x, "checking": y}}, like mock_accounts
+- store: memory-mapped NumPy columns + hash index, opened from disk
+
+Reports added RSS after loading, single-user lookups per second (random
+existing IDs) and, for the store, bulk lookups per second via rows() and
+get_many(). Dicts above --dict-max are skipped, since at 10M accounts
+they need several GB.
+
+Usage (from backend/fastapi):
+    python benchmarks/account_store_bench.py --sizes 1000000 10000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def sample_ids(size, count, seed=1):
+    rng = random.Random(seed)
+    return [f"user{rng.randrange(size)}" for _ in range(count)]
+
+
+def worker_dict(size, lookups):
+    ids = sample_ids(size, lookups)
+    before = rss_mb()
+    start = time.perf_counter()
+    accounts = {f"user{i}": {"savings": i * 1.5, "checking": i * 0.25} for i in range(size)}
+    load_s = time.perf_counter() - start
+    memory = rss_mb() - before
+    start = time.perf_counter()
+    for user_id in ids:
+        accounts.get(user_id, {})
+    single = lookups / (time.perf_counter() - start)
+    return {"load_s": load_s, "rss_mb": memory, "single_per_s": single}
+
+
+def worker_store(path, size, lookups, batch):
+    from agents.account_store import AccountStore
+    ids = sample_ids(size, lookups)
+    before = rss_mb()
+    start = time.perf_counter()
+    store = AccountStore.open(path)
+    load_s = time.perf_counter() - start
+    memory = rss_mb() - before
+    start = time.perf_counter()
+    for user_id in ids:
+        store.get(user_id)
+    single = lookups / (time.perf_counter() - start)
+    bulk_ids = sample_ids(size, batch, seed=2)
+    start = time.perf_counter()
+    store.rows(bulk_ids)
+    rows_per_s = batch / (time.perf_counter() - start)
+    start = time.perf_counter()
+    store.get_many(bulk_ids)
+    many_per_s = batch / (time.perf_counter() - start)
+    return {
+        "load_s": load_s, "rss_mb": memory, "rss_after_lookups_mb": rss_mb() - before,
+        "single_per_s": single, "rows_per_s": rows_per_s, "get_many_per_s": many_per_s,
+    }
+
+
+def build_store(path, size):
+    import numpy as np
+    from agents.account_store import build_account_store
+    index = np.arange(size)
+    start = time.perf_counter()
+    build_account_store(path, [f"user{i}" for i in range(size)], {
+        "savings": index * 1.5, "checking": index * 0.25,
+    })
+    disk = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+    return time.perf_counter() - start, disk
+
+
+def run_worker(*args):
+    out = subprocess.run([sys.executable, __file__, "--worker", *map(str, args)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--dict-max", type=int, default=2_000_000)
+    parser.add_argument("--worker", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        kind, *rest = args.worker
+        if kind == "dict":
+            print(json.dumps(worker_dict(int(rest[0]), int(rest[1]))))
+        else:
+            print(json.dumps(worker_store(rest[0], int(rest[1]), int(rest[2]), int(rest[3]))))
+        return
+
+    print(f"{'accounts':>10} {'variant':<6} {'load s':>8} {'RSS MB':>8} {'disk MB':>8} "
+          f"{'get/s':>10} {'rows/s':>11} {'get_many/s':>11}")
+    for size in args.sizes:
+        if size <= args.dict_max:
+            d = run_worker("dict", size, args.lookups)
+            print(f"{size:>10} {'dict':<6} {d['load_s']:>8.2f} {d['rss_mb']:>8.0f} {'-':>8} "
+                  f"{d['single_per_s']:>10.0f} {'-':>11} {'-':>11}")
+        else:
+            print(f"{size:>10} {'dict':<6} skipped (above --dict-max)")
+        path = tempfile.mkdtemp(prefix="account-store-")
+        try:
+            build_s, disk = build_store(path, size)
+            s = run_worker("store", path, size, args.lookups, args.batch)
+            print(f"{size:>10} {'store':<6} {s['load_s']:>8.3f} {s['rss_mb']:>8.0f} {disk:>8.0f} "
+                  f"{s['single_per_s']:>10.0f} {s['rows_per_s']:>11.0f} {s['get_many_per_s']:>11.0f}"
+                  f"   (build {build_s:.1f} s, RSS after lookups {s['rss_after_lookups_mb']:.0f} MB)")
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# --- File: benchmarks/cold_start.py ---
+"""
+Cold-start timing for a fresh banking worker process.
+
+Each run starts a new Python interpreter (as a new uvicorn worker would),
+times ``import app``, then either builds only the agent that the first
+request needs (lazy) or warms every agent concurrently (preload), and
+prints the per-agent import/build times recorded by the registry.
+
+Usage (from backend/fastapi):
+    python benchmarks/cold_start.py --runs 5 --first-agent accounts
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+mode, first_agent = sys.argv[1], sys.argv[2]
+if mode == "lazy":
+    app.registry.get(first_agent)
+else:
+    app.registry.warmup()
+ready = time.perf_counter()
+print(json.dumps({
+    "import_app_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "agents": app.registry.stats(),
+}))
+"""
+
+
+def run_child(mode, first_agent):
+    env = dict(os.environ, BANKING_LLM_STUB="true", GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "stub"))
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, first_agent],
+        cwd=HERE, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--first-agent", default="accounts")
+    args = parser.parse_args()
+
+    for mode in ("lazy", "preload"):
+        results = [run_child(mode, args.first_agent) for _ in range(args.runs)]
+        import_ms = statistics.median(r["import_app_ms"] for r in results)
+        ready_ms = statistics.median(r["ready_ms"] for r in results)
+        print(f"[{mode}] import app: {import_ms:.1f} ms, ready for first request: {ready_ms:.1f} ms")
+        for name, stats in results[-1]["agents"].items():
+            if stats["built"]:
+                print(f"    {name:<12} import {stats['import_ms']:>8.1f} ms  build {stats['build_ms']:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
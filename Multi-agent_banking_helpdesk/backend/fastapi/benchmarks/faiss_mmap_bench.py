@@ -0,0 +1,112 @@
+# --- File: benchmarks/faiss_mmap_bench.py ---
+"""
+Per-worker memory and cold-load time for the bank_docs index.
+
+Builds a synthetic bank_docs directory (random vectors, FAISS.save_local
+layout), then starts 1, 4 and 8 worker processes at once. Each worker
+loads it with agents.vector_index.load_vectorstore (mmap on or off),
+scans the whole index with a few searches so every page is touched,
+and reports its load time, RSS and PSS. PSS splits shared pages between
+the processes that map them, so it shows what a worker really costs.
+
+Linux only (reads /proc/self/status and smaps_rollup).
+
+Usage (from backend/fastapi):
+    python benchmarks/faiss_mmap_bench.py --vectors 200000 --dim 768
+"""
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def build_index(path, vectors, dim):
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import FakeEmbeddings
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(dim)
+    for start in range(0, vectors, 50_000):
+        index.add(rng.standard_normal((min(50_000, vectors - start), dim), dtype=np.float32))
+    ids = [str(i) for i in range(vectors)]
+    docstore = InMemoryDocstore({i: Document(page_content=f"policy chunk {i}") for i in ids})
+    store = FAISS(FakeEmbeddings(size=dim), index, docstore, dict(enumerate(ids)))
+    store.save_local(path)
+
+
+def memory_kb():
+    stats = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                stats["rss"] = int(line.split()[1])
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                stats["pss"] = int(line.split()[1])
+    return stats
+
+
+def worker(path, dim, mmap, barrier, results):
+    from langchain_core.embeddings import FakeEmbeddings
+    from agents.vector_index import load_vectorstore
+
+    start = time.perf_counter()
+    store = load_vectorstore(path, embeddings=FakeEmbeddings(size=dim), mmap=mmap)
+    load_ms = (time.perf_counter() - start) * 1000
+    queries = np.random.default_rng(os.getpid()).standard_normal((4, dim), dtype=np.float32)
+    store.index.search(queries, 5)
+    # Measure while every worker is alive, so shared pages are split between them
+    barrier.wait()
+    results.put({"load_ms": load_ms, **memory_kb()})
+    barrier.wait()
+
+
+def run(path, dim, workers, mmap):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(path, dim, mmap, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/tmp/bank_docs_bench")
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.path, "index.faiss")):
+        build_index(args.path, args.vectors, args.dim)
+    size_mb = os.path.getsize(os.path.join(args.path, "index.faiss")) / 2**20
+    print(f"index.faiss: {size_mb:.0f} MB")
+
+    print(f"{'mode':<8} {'workers':>7} {'load ms':>9} {'RSS MB':>9} {'PSS MB':>9} {'total PSS MB':>13}")
+    for mmap in (False, True):
+        for workers in args.workers:
+            rows = run(args.path, args.dim, workers, mmap)
+            print(f"{'mmap' if mmap else 'private':<8} {workers:>7} "
+                  f"{statistics.median(r['load_ms'] for r in rows):>9.1f} "
+                  f"{statistics.mean(r['rss'] for r in rows) / 1024:>9.1f} "
+                  f"{statistics.mean(r['pss'] for r in rows) / 1024:>9.1f} "
+                  f"{sum(r['pss'] for r in rows) / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
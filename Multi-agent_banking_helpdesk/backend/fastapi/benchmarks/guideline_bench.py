@@ -0,0 +1,128 @@
+# --- File: benchmarks/guideline_bench.py ---
+"""
+Lookup latency and hit quality of agents/guideline_store.py.
+
+Generates --pages synthetic policy files. Each page is a topic named from
+banking words (e.g. WireTransferLimits0042) with a few paragraphs that
+mix shared boilerplate with terms unique to the page. Then measures:
+
+- topic lookups as an LLM might write them: exact, spaced, lower-case,
+  one character dropped (fuzzy), and by alias;
+- free-text questions built from a page's unique terms (BM25), scored
+  as hit@1 / hit@k on the page's topic;
+- full build time vs. an incremental reload after editing a few files.
+
+Only needs the standard library.
+
+Usage (from backend/fastapi):
+    python benchmarks/guideline_bench.py --pages 5000 --queries 2000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.guideline_store import GuidelineStore, topic_words
+
+SUBJECTS = ["Wire", "Card", "Loan", "Mortgage", "Savings", "Checking", "Overdraft", "Deposit",
+            "Fraud", "Account", "Credit", "Debit", "Cheque", "Forex", "Locker", "Pension"]
+ASPECTS = ["Transfer", "Dispute", "Fee", "Limit", "Interest", "Closure", "Opening", "Renewal",
+           "Eligibility", "Penalty", "Reversal", "Statement", "Verification", "Refund"]
+KINDS = ["Policy", "Rules", "Guidelines", "Procedure", "Terms"]
+BOILERPLATE = ("Customers must provide valid identification. The bank may update this policy "
+               "at any time. Contact the branch for further assistance with your account.")
+
+
+def make_corpus(directory, pages, rng):
+    """Write the policy files; returns [(topic, unique terms, alias)]."""
+    truth = []
+    for i in range(pages):
+        topic = f"{rng.choice(SUBJECTS)}{rng.choice(ASPECTS)}{rng.choice(KINDS)}{i:04d}"
+        unique = [f"term{i}x{j}" for j in range(4)]
+        alias = f"policy code {i}"
+        paragraphs = [
+            f"{topic_words(topic)} applies to {unique[0]} and {unique[1]} accounts.",
+            BOILERPLATE,
+            f"Charges for {unique[2]} are waived when {unique[3]} is active.",
+        ]
+        with open(os.path.join(directory, f"{topic}.md"), "w") as f:
+            f.write(f"Aliases: {alias}\n" + "\n\n".join(paragraphs))
+        truth.append((topic, unique, alias))
+    return truth
+
+
+def drop_char(text, rng):
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1:]
+
+
+def timed(store, query, k):
+    start = time.perf_counter()
+    result = store.lookup(query, k)
+    return (time.perf_counter() - start) * 1e6, result
+
+
+def report(name, latencies, hits1, hitsk, total, k):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<14} {statistics.mean(latencies):>9.1f} {statistics.median(latencies):>9.1f} {p99:>9.1f} "
+          f"{hits1 / total:>7.1%} {hitsk / total:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp(prefix="guidelines-")
+    try:
+        truth = make_corpus(directory, args.pages, rng)
+
+        start = time.perf_counter()
+        store = GuidelineStore(directory, reload_interval=0)
+        print(f"full build: {(time.perf_counter() - start) * 1000:.1f} ms for {store.stats()}")
+
+        variants = {
+            "exact": lambda topic, unique, alias: topic,
+            "spaced": lambda topic, unique, alias: topic_words(topic),
+            "lower": lambda topic, unique, alias: topic_words(topic).lower(),
+            "typo": lambda topic, unique, alias: drop_char(topic, rng),
+            "alias": lambda topic, unique, alias: alias,
+            "question": lambda topic, unique, alias: f"are charges waived for {unique[2]} when {unique[3]}?",
+            "keywords": lambda topic, unique, alias: f"{unique[0]} accounts",
+        }
+        print(f"{'query':<14} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'hit@1':>7} {f'hit@{args.k}':>7}")
+        for name, make_query in variants.items():
+            latencies, hits1, hitsk = [], 0, 0
+            for _ in range(args.queries):
+                topic, unique, alias = rng.choice(truth)
+                elapsed, passages = timed(store, make_query(topic, unique, alias), args.k)
+                latencies.append(elapsed)
+                topics = [p.topic for p in passages[:args.k]]
+                hits1 += bool(topics) and topics[0] == topic
+                hitsk += topic in topics
+            report(name, latencies, hits1, hitsk, args.queries, args.k)
+
+        for topic, unique, alias in rng.sample(truth, args.edits):
+            with open(os.path.join(directory, f"{topic}.md"), "a") as f:
+                f.write(f"\n\nAmended: {unique[0]} limits were revised.")
+        start = time.perf_counter()
+        changed = store.reload()
+        print(f"incremental reload: {(time.perf_counter() - start) * 1000:.1f} ms, {len(changed)} topics re-indexed")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
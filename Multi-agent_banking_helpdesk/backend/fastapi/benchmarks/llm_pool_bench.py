@@ -0,0 +1,115 @@
+# --- File: benchmarks/llm_pool_bench.py ---
+"""
+Connection reuse benchmark for the shared LLM client.
+
+Starts a local HTTP/1.1 keep-alive stand-in for the Groq chat completions
+API and sends the same workload three ways:
+
+  fresh-client   a new ChatGroq (and HTTP client) per call
+  per-agent      one ChatGroq per agent module, as before llm_client.py
+  shared-pool    agents.llm_client.get_llm(), one pooled client per worker
+
+For each mode it reports calls/s, mean latency and how many TCP
+connections the stand-in had to accept.
+
+Usage (from backend/fastapi):
+    python benchmarks/llm_pool_bench.py --calls 500 --threads 8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from langchain_groq import ChatGroq
+
+COMPLETION = {
+    "id": "chatcmpl-local",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "llama3-8b-8192",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "Final Answer: ok"},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_mode(label, get_model, calls, threads):
+    StandInHandler.connections = 0
+
+    def one_call(i):
+        start = time.perf_counter()
+        get_model(i).invoke("What is the balance for user123?")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one_call, range(calls)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {calls / elapsed:>9.1f} {sum(latencies) / len(latencies) * 1000:>10.2f} "
+          f"{StandInHandler.connections:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--agents", type=int, default=5, help="Independent clients in per-agent mode")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["GROQ_API_BASE"] = base_url
+
+    from agents import llm_client
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+    def new_groq():
+        return ChatGroq(model="llama3-8b-8192", temperature=0, base_url=base_url, max_retries=0)
+
+    per_agent = [new_groq() for _ in range(args.agents)]
+
+    print(f"{'mode':<14} {'calls/s':>9} {'mean ms':>10} {'connections':>12}")
+    run_mode("fresh-client", lambda i: new_groq(), args.calls, args.threads)
+    run_mode("per-agent", lambda i: per_agent[i % len(per_agent)], args.calls, args.threads)
+    run_mode("shared-pool", lambda i: llm_client.get_llm("llama3-8b-8192"), args.calls, args.threads)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
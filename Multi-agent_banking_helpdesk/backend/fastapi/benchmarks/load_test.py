@@ -0,0 +1,173 @@
+# --- File: benchmarks/load_test.py ---
+"""
+Load test for the banking helpdesk /query endpoint.
+
+Runs the FastAPI app in-process with the real agents on a stub LLM
+(BANKING_LLM_STUB) that blocks for a fixed round trip, then drives it
+with N concurrent clients and reports requests/s and p50/p99 latency.
+A /health probe runs alongside the load to show whether the event loop
+stays responsive.
+
+The in-process server runs with FAST_PATH_ENABLED=false (unless
+--fast-path), so every request goes through the agents. Requests that
+fail (non-200, or an "Error: ..." response) are counted, and the script
+exits non-zero if there were any: throughput over failed requests is
+not a result.
+
+Usage (from backend/fastapi):
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --latency 0.5 --requests 512 --clients 1 16 128
+    python benchmarks/load_test.py --url http://localhost:8000   # existing server
+"""
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+import httpx
+import uvicorn
+
+# One query per agent; each needs the agent (and its LLM round trips) to answer
+SAMPLE_QUERIES = [
+    "Which documents do I need for KYC when opening a new account?",
+    "Can you check how much money user123 has across their accounts?",
+    "Pay my electricity bill of 100 for user123",
+]
+
+
+def start_local_server(latency, port, fast_path=False):
+    os.environ["BANKING_LLM_STUB"] = "true"
+    os.environ["BANKING_LLM_STUB_LATENCY"] = str(latency)
+    # Measure the agents, not the LLM-free fast path
+    os.environ["FAST_PATH_ENABLED"] = "true" if fast_path else "false"
+    import app as banking_app
+
+    # Tracing is switched on at import; keep the benchmark off the network
+    os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+    config = uvicorn.Config(banking_app.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_level(base_url, clients, total_requests):
+    latencies = []
+    health_latencies = []
+    counter = {"next": 0, "errors": 0}
+    served_by = collections.Counter()
+    first_error = []
+    done = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            while counter["next"] < total_requests:
+                i = counter["next"]
+                counter["next"] += 1
+                payload = {"user_id": "user123", "user_input": SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]}
+                start = time.perf_counter()
+                body = {}
+                try:
+                    resp = await client.post("/query", json=payload)
+                except httpx.HTTPError as e:
+                    resp, detail = None, repr(e)
+                latencies.append(time.perf_counter() - start)
+                if resp is not None:
+                    detail = resp.text[:200]
+                    try:
+                        body = resp.json()
+                    except ValueError:
+                        pass
+                    if not isinstance(body, dict):
+                        body = {}
+                # app.handle_error answers with status 200 and an "Error: ..." response
+                if resp is None or resp.status_code != 200 or str(body.get("response", "")).startswith("Error:"):
+                    counter["errors"] += 1
+                    served_by["error"] += 1
+                    if not first_error:
+                        first_error.append(detail)
+                else:
+                    served_by[body.get("served_by", "unknown")] += 1
+
+        async def health_probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe = asyncio.create_task(health_probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": counter["errors"],
+        "served_by": dict(served_by),
+        "first_error": first_error[0] if first_error else None,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "health_p99_ms": percentile(health_latencies, 99) * 1000 if health_latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running server instead of the in-process stub")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM round trip in seconds")
+    parser.add_argument("--requests", type=int, default=256, help="Requests per concurrency level")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 128])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fast-path", action="store_true", help="Keep the fast path on in the in-process server")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, _ = start_local_server(args.latency, args.port, args.fast_path)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'/health p99 ms':>15}")
+    errors = 0
+    try:
+        for clients in args.clients:
+            total = max(args.requests, clients)
+            r = asyncio.run(run_level(base_url, clients, total))
+            errors += r["errors"]
+            print(f"{r['clients']:>8} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+                  f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['health_p99_ms']:>15.1f}   {r['served_by']}")
+            if r["first_error"]:
+                print(f"{'':>8} first error: {r['first_error']}")
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    if errors:
+        print(f"\n{errors} requests failed; the figures above are not valid", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
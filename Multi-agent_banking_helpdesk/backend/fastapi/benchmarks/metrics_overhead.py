@@ -0,0 +1,82 @@
+# --- File: benchmarks/metrics_overhead.py ---
+"""
+Per-request cost of the /metrics instrumentation.
+
+Replays the metric updates one /query makes (4 node timings, an agent
+timing, 2 LLM call counts, request counter, LLM-calls histogram and the
+in-flight gauge) from 1 and 8 threads, and compares them with the same
+updates behind one global lock. Also times a /metrics render. Only needs
+the standard library.
+
+Usage (from backend/fastapi):
+    python benchmarks/metrics_overhead.py --requests 200000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import (
+    metrics, AGENT_LATENCY, IN_FLIGHT, LLM_CALLS, LLM_CALLS_PER_REQUEST, NODE_LATENCY, REQUESTS
+)
+
+NODES = ("validate", "fast_path", "orchestrator", "error_handler")
+
+
+def one_request():
+    IN_FLIGHT.inc("/query")
+    for node in NODES:
+        NODE_LATENCY.observe(0.004, node)
+    AGENT_LATENCY.observe(0.8, "accounts")
+    LLM_CALLS.inc()
+    LLM_CALLS.inc()
+    REQUESTS.inc("/query", "agent")
+    LLM_CALLS_PER_REQUEST.observe(2, "agent")
+    IN_FLIGHT.dec("/query")
+
+
+_lock = threading.Lock()
+_locked_store = {}
+
+
+def one_request_locked():
+    # Same number of updates, each behind one global lock
+    for key in ("in_flight", *NODES, "agent", "llm", "llm", "requests", "llm_per_request", "in_flight"):
+        with _lock:
+            _locked_store[key] = _locked_store.get(key, 0) + 1
+
+
+def run(func, requests, threads):
+    per_thread = requests // threads
+
+    def loop(_):
+        for _ in range(per_thread):
+            func()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(loop, range(threads)))
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'variant':<22} {'threads':>7} {'us/request':>11}")
+    for threads in (1, 8):
+        print(f"{'per-thread shards':<22} {threads:>7} {run(one_request, args.requests, threads):>11.2f}")
+        print(f"{'global lock':<22} {threads:>7} {run(one_request_locked, args.requests, threads):>11.2f}")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"/metrics render: {(time.perf_counter() - start) * 1000:.2f} ms, {len(text.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Per-request cost of the profiling hook in profiling.py.
+
+Runs a small CPU-bound fake graph (two sync nodes and an async node that
+hands work to a thread pool, like the orchestrator) three ways:
+
+- bare:      plain functions
+- hooked:    wrapped with profile_node/bind, request not profiled
+- profiled:  every request profiled and its collapsed stacks written
+
+and reports mean latency per request. The expected production cost is
+hooked + PROFILE_SAMPLE_RATE * (profiled - hooked). Only needs the
+standard library.
+
+Usage (from backend/fastapi):
+    python benchmarks/profiling_overhead.py --requests 200 --work-ms 20
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+
+
+def spin(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        sum(range(200))
+
+
+def make_graph(executor, work_ms, hooked):
+    wrap = profiling.profile_node if hooked else (lambda name, func: func)
+    bind = profiling.bind if hooked else (lambda func: func)
+
+    validate = wrap("validate", lambda state: spin(work_ms / 10))
+    fast_path = wrap("fast_path", lambda state: spin(work_ms / 10))
+
+    async def orchestrator(state):
+        spin(work_ms / 10)
+        await asyncio.get_running_loop().run_in_executor(executor, bind(spin), work_ms)
+    orchestrator = wrap("orchestrator", orchestrator)
+
+    async def run(state):
+        validate(state)
+        fast_path(state)
+        await orchestrator(state)
+    return run
+
+
+async def measure(run, requests, profile):
+    start = time.perf_counter()
+    for _ in range(requests):
+        with profiling.profile_request(profile):
+            await run({})
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--work-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    profiling.PROFILE_DIR = tempfile.mkdtemp(prefix="profiles-")
+    executor = ThreadPoolExecutor(max_workers=4)
+    try:
+        bare = asyncio.run(measure(make_graph(executor, args.work_ms, False), args.requests, False))
+        hooked = asyncio.run(measure(make_graph(executor, args.work_ms, True), args.requests, False))
+        profiled = asyncio.run(measure(make_graph(executor, args.work_ms, True), args.requests, True))
+    finally:
+        executor.shutdown()
+        shutil.rmtree(profiling.PROFILE_DIR)
+
+    print(f"{'variant':<10} {'ms/request':>11} {'overhead':>9}")
+    for name, ms in (("bare", bare), ("hooked", hooked), ("profiled", profiled)):
+        print(f"{name:<10} {ms:>11.3f} {(ms / bare - 1) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# --- File: benchmarks/sqlite_bench.py ---
+"""
+Balance lookup benchmark for agents/bank_db.py.
+
+Generates a bank.db with --rows account rows (two accounts per user),
+then compares lookups/s for:
+
+  connect-per-call  the original tool: connect, query, close
+  pooled            bank_db.get_balance on the read-only WAL pool
+  pooled x threads  the same from several threads at once
+  bulk              bank_db.get_balances, --batch users per query
+
+Only needs the standard library.
+
+Usage (from backend/fastapi):
+    python benchmarks/sqlite_bench.py --rows 1000000 --db /tmp/bank_bench.db
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def generate_db(path, rows, with_index):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE accounts (user_id TEXT, account_type TEXT, balance REAL)")
+    users = rows // 2
+    rng = random.Random(7)
+    conn.executemany(
+        "INSERT INTO accounts VALUES (?, ?, ?)",
+        ((f"user{i}", kind, round(rng.uniform(0, 10000), 2))
+         for i in range(users) for kind in ("savings", "checking")),
+    )
+    if with_index:
+        conn.execute("CREATE INDEX idx_accounts_user_id ON accounts(user_id)")
+    conn.commit()
+    conn.close()
+    return users
+
+
+def legacy_lookup(path, user_id):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT account_type, balance FROM accounts WHERE user_id=?", (user_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def report(label, lookups, elapsed):
+    print(f"{label:<22} {lookups / elapsed:>12.0f} lookups/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default="/tmp/bank_bench.db")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--no-index", action="store_true",
+                        help="Generate without the index to see the original code's worst case")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    users = generate_db(args.db, args.rows, with_index=not args.no_index)
+    print(f"generated {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(11)
+    user_ids = [f"user{rng.randrange(users)}" for _ in range(args.lookups)]
+
+    legacy_n = min(len(user_ids), 2000) if args.no_index else len(user_ids)
+    start = time.perf_counter()
+    for user_id in user_ids[:legacy_n]:
+        legacy_lookup(args.db, user_id)
+    report("connect-per-call", legacy_n, time.perf_counter() - start)
+
+    # Imported after generation: the first pool use runs prepare_database
+    os.environ["BANK_DB_PATH"] = args.db
+    os.environ["BANK_DB_POOL_SIZE"] = str(args.threads)
+    from agents import bank_db
+
+    bank_db.get_pool()
+    start = time.perf_counter()
+    for user_id in user_ids:
+        bank_db.get_balance(user_id)
+    report("pooled", len(user_ids), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(bank_db.get_balance, user_ids))
+    report(f"pooled x{args.threads} threads", len(user_ids), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(user_ids), args.batch):
+        bank_db.get_balances(user_ids[i:i + args.batch])
+    report(f"bulk ({args.batch}/query)", len(user_ids), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
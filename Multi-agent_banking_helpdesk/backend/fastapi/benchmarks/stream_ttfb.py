@@ -0,0 +1,82 @@
+# --- File: benchmarks/stream_ttfb.py ---
+"""
+Time-to-first-byte of /query vs /query/stream.
+
+Starts the app in-process on the stub LLM with a per-token delay, so the
+answer trickles out the way a slow Groq completion would, and sends the
+same agent-bound query to both endpoints. Reports median time to first
+byte, to the first answer token (stream only) and to completion.
+
+Usage (from backend/fastapi):
+    python benchmarks/stream_ttfb.py --latency 0.3 --token-delay 0.05 --runs 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.load_test import start_local_server
+
+# Goes to the billing agent, so neither the fast path nor the cache answers it
+QUERY = {"user_id": "user123", "user_input": "Pay my electricity bill of 100 to City Power"}
+
+
+def time_query(client):
+    start = time.perf_counter()
+    with client.stream("POST", "/query", json=QUERY) as resp:
+        first = None
+        for _ in resp.iter_bytes():
+            if first is None:
+                first = time.perf_counter() - start
+    return first, None, time.perf_counter() - start
+
+
+def time_stream(client):
+    start = time.perf_counter()
+    first = first_token = None
+    with client.stream("POST", "/query/stream", json=QUERY) as resp:
+        for line in resp.iter_lines():
+            if first is None:
+                first = time.perf_counter() - start
+            if first_token is None and line == "event: token":
+                first_token = time.perf_counter() - start
+    return first, first_token, time.perf_counter() - start
+
+
+def summarize(label, rows):
+    def med(i):
+        values = [r[i] for r in rows if r[i] is not None]
+        return f"{statistics.median(values) * 1000:>10.1f}" if values else f"{'-':>10}"
+    print(f"{label:<14} {med(0)} {med(1)} {med(2)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub LLM time before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="Stub LLM delay between tokens")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    os.environ["BANKING_LLM_STUB_TOKEN_DELAY"] = str(args.token_delay)
+    server, _ = start_local_server(args.latency, args.port)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+            time_stream(client)  # build the agent before timing
+            query_rows = [time_query(client) for _ in range(args.runs)]
+            stream_rows = [time_stream(client) for _ in range(args.runs)]
+    finally:
+        server.should_exit = True
+
+    print(f"{'endpoint':<14} {'TTFB ms':>10} {'1st token':>10} {'total ms':>10}")
+    summarize("/query", query_rows)
+    summarize("/query/stream", stream_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# --- File: concurrency.py ---
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import profiling
+
+# Global cap on /query requests being processed at once (queued requests wait)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))
+
+# Per-agent caps, so one slow agent cannot take every worker thread
+AGENT_CONCURRENCY = {
+    "guidelines": int(os.getenv("GUIDELINES_MAX_CONCURRENCY", "16")),
+    "accounts": int(os.getenv("ACCOUNTS_MAX_CONCURRENCY", "16")),
+    "billing": int(os.getenv("BILLING_MAX_CONCURRENCY", "8")),
+}
+DEFAULT_AGENT_CONCURRENCY = int(os.getenv("DEFAULT_AGENT_MAX_CONCURRENCY", "8"))
+
+# Threads that run the blocking agent calls, off the event loop
+AGENT_EXECUTOR_WORKERS = int(os.getenv("AGENT_EXECUTOR_WORKERS", str(MAX_CONCURRENT_REQUESTS)))
+
+
+class ConcurrencyLimiter:
+    """
+    Bounds the number of in-flight requests and agent runs.
+
+    Blocking agent calls are handed to a dedicated thread pool, so the
+    uvicorn event loop stays free to serve other requests (and /health).
+    """
+
+    def __init__(self, global_limit, agent_limits, default_agent_limit, max_workers):
+        self.global_limit = global_limit
+        self.agent_limits = dict(agent_limits)
+        self.default_agent_limit = default_agent_limit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._request_semaphore = asyncio.Semaphore(global_limit)
+        self._agent_semaphores = {}
+        self._in_flight = {"requests": 0}
+
+    def _agent_semaphore(self, agent_name):
+        semaphore = self._agent_semaphores.get(agent_name)
+        if semaphore is None:
+            limit = self.agent_limits.get(agent_name, self.default_agent_limit)
+            semaphore = self._agent_semaphores[agent_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    @asynccontextmanager
+    async def request_slot(self):
+        """Hold one of the global request slots for the duration of a request."""
+        async with self._request_semaphore:
+            self._in_flight["requests"] += 1
+            try:
+                yield
+            finally:
+                self._in_flight["requests"] -= 1
+
+    async def run_agent(self, agent_name, func, *args, **kwargs):
+        """
+        Run a blocking agent call in the executor under the agent's limit.
+
+        Args:
+            agent_name (str): Name of the agent, used to pick its semaphore
+            func (callable): Blocking callable, e.g. ``agent.run``
+            *args, **kwargs: Passed through to ``func``
+
+        Returns:
+            Whatever ``func`` returns
+        """
+        async with self._agent_semaphore(agent_name):
+            self._in_flight[agent_name] = self._in_flight.get(agent_name, 0) + 1
+            try:
+                loop = asyncio.get_running_loop()
+                # run_in_executor does not copy context variables (e.g. the request's payment key)
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self.executor, functools.partial(context.run, profiling.bind(func), *args, **kwargs)
+                )
+            finally:
+                self._in_flight[agent_name] -= 1
+
+    def stats(self):
+        """Current limits and in-flight counts, for the health endpoint."""
+        return {
+            "max_concurrent_requests": self.global_limit,
+            "agent_limits": {**self.agent_limits},
+            "in_flight": dict(self._in_flight),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+limiter = ConcurrencyLimiter(
+    global_limit=MAX_CONCURRENT_REQUESTS,
+    agent_limits=AGENT_CONCURRENCY,
+    default_agent_limit=DEFAULT_AGENT_CONCURRENCY,
+    max_workers=AGENT_EXECUTOR_WORKERS,
+)
@@ -0,0 +1,161 @@
+# --- File: fast_path.py ---
+import re
+import threading
+
+# Explicit lookups only ("my balance", "balance for user123", "check the balance"), so that
+# questions about balance rules ("what is the minimum balance?") go to the agents
+BALANCE_PATTERN = re.compile(
+    r"\bmy\s+(?:account\s+)?balances?\b"
+    r"|\bbalances?\s+(?:of|for|on|in)\s+(?:user\d+|my)\b"
+    r"|\b(?:what(?:'s|\s+is|\s+are)|check|show|get|see)\s+(?:the\s+|my\s+)?(?:account\s+)?balances?\b"
+)
+USER_ID_PATTERN = re.compile(r"\buser\d+\b")
+# Words that turn a balance question into something an agent must reason about
+BALANCE_BLOCKERS = re.compile(
+    r"\b(?:transfer|transfers|move|pay|payment|bill|after|if|history|"
+    r"policy|policies|minimum|min|maximum|fee|fees|charge|charges|penalty|low|"
+    r"requirement|requirements|require|required|need|open|opening|interest|rule|rules)\b"
+)
+# Words that make a topic mention part of a larger request (a payment, a transfer, a sequence of steps)
+GUIDELINE_BLOCKERS = re.compile(
+    r"\b(?:pay|paid|paying|payment|payments|bill|bills|biller|transfer|transfers|send|move|"
+    r"balance|balances|before|after|first|then|if)\b"
+)
+
+# Extra ways users name a topic, on top of the topic keys themselves
+TOPIC_ALIASES = {
+    "KYC": ["kyc", "know your customer"],
+    "LoanPolicy": ["loan policy", "loan policies", "personal loan", "personal loans", "loan interest"],
+}
+
+
+def _topic_phrases(topic):
+    # 'LoanPolicy' -> 'loanpolicy', 'loan policy'
+    spaced = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", topic).lower()
+    return {topic.lower(), spaced, *TOPIC_ALIASES.get(topic, [])}
+
+
+def _compile_topics():
+    from agents.guideline_topics import store
+
+    phrase_to_topic = {}
+    # The store also holds the topics loaded from GUIDELINES_DIR
+    for topic in store.topics():
+        for phrase in _topic_phrases(topic):
+            phrase_to_topic[phrase] = topic
+    alternation = "|".join(re.escape(p) for p in sorted(phrase_to_topic, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b"), phrase_to_topic
+
+
+_topic_lock = threading.Lock()
+_topic_matcher = None
+_listening = False
+
+
+def _topics_changed(changed):
+    global _topic_matcher
+    with _topic_lock:
+        _topic_matcher = None
+
+
+def topic_matcher():
+    """
+    (pattern, phrase -> topic) for the guideline topics.
+
+    Compiled on first use and again after update_topics or a GUIDELINES_DIR
+    reload changes the topics.
+    """
+    global _topic_matcher, _listening
+    with _topic_lock:
+        if not _listening:
+            from agents.guideline_topics import on_topics_changed
+            on_topics_changed(_topics_changed)
+            _listening = True
+        if _topic_matcher is None:
+            _topic_matcher = _compile_topics()
+        return _topic_matcher
+
+
+def extract_intent(query, user_id=None):
+    """
+    Pull a deterministic intent and its arguments out of a query.
+
+    Args:
+        query (str): Raw user query
+        user_id (str): Caller's (authenticated) user ID; balances are only read for it
+
+    Returns:
+        tuple or None: ``("balance", user_id)`` or ``("guideline", topic)``;
+                       None when the query is ambiguous or needs an agent
+    """
+    text = query.lower()
+    intents = []
+
+    if BALANCE_PATTERN.search(text) and not BALANCE_BLOCKERS.search(text):
+        # Another user's balance, or no caller to check against: leave it to the agent
+        if not user_id or set(USER_ID_PATTERN.findall(text)) - {user_id.lower()}:
+            return None
+        intents.append(("balance", user_id))
+
+    topic_pattern, phrase_to_topic = topic_matcher()
+    matched_topics = {phrase_to_topic[m] for m in topic_pattern.findall(text)}
+    if len(matched_topics) > 1:
+        return None
+    if matched_topics:
+        if GUIDELINE_BLOCKERS.search(text):
+            # e.g. "pay my bill, do I need KYC first?": the canned topic text would skip the payment
+            return None
+        intents.append(("guideline", matched_topics.pop()))
+
+    return intents[0] if len(intents) == 1 else None
+
+
+def answer(query, user_id=None):
+    """
+    Answer a query without the LLM when its intent is unambiguous.
+
+    Returns:
+        tuple or None: ``(agent_name, response)``, or None to fall back to the agent
+    """
+    intent = extract_intent(query, user_id)
+    if intent is None:
+        return None
+    kind, argument = intent
+    if kind == "balance":
+        # Imported here: the account agent loads tools and stores that the fast path may never need
+        from agents.account_agent import get_account_balance
+        return "accounts", get_account_balance.func(argument).answer
+    from agents.guideline_topics import guideline_answer, store
+    if store.resolve_topic(argument) is None:
+        # Removed since the pattern was compiled; the agent can still search the store
+        return None
+    return "guidelines", guideline_answer(argument)
+
+
+class PathStats:
+    """Request counts and latency totals per serving path (fast_path / agent)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._seconds = {}
+
+    def record(self, path, seconds):
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._seconds[path] = self._seconds.get(path, 0.0) + seconds
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                path: {
+                    "requests": count,
+                    "share": round(count / total, 4),
+                    "mean_latency_ms": round(self._seconds[path] / count * 1000, 3),
+                }
+                for path, count in self._counts.items()
+            }
+
+
+path_stats = PathStats()
@@ -0,0 +1,190 @@
+# --- File: metrics.py ---
+import asyncio
+from bisect import bisect_left
+import functools
+import threading
+import time
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 12, 20)
+
+
+class MetricsRegistry:
+    """
+    Prometheus-style metrics with per-thread aggregation.
+
+    Every metric keeps one shard per thread and a thread writes only to its
+    own, so recording takes no lock (the event loop thread and each executor
+    thread have one shard each). A scrape copies and sums the shards.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(metric.merged().items()):
+                lines.extend(metric.samples(labels, value))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _new_shard(self):
+        # Label values -> value, written only by the calling thread
+        shard = self._local.shard = {}
+        with self._shards_lock:
+            self._shards.append(shard)
+        return shard
+
+    def merged(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for labels, value in shard.copy().items():
+                merged[labels] = self._add(merged.get(labels), value)
+        return merged
+
+    def _add(self, total, value):
+        return value if total is None else total + value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, value=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[labels] = shard.get(labels, 0) + value
+
+    def samples(self, labels, value):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"]
+
+
+class Gauge(Counter):
+    """Up/down gauge; shards hold deltas, so inc and dec may come from different threads."""
+
+    kind = "gauge"
+
+    def dec(self, *labels, value=1):
+        self.inc(*labels, value=-value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        # [count per bucket..., +Inf count, sum]
+        data = shard.get(labels)
+        if data is None:
+            data = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def _add(self, total, value):
+        if total is None:
+            return list(value)
+        for i, v in enumerate(value):
+            total[i] += v
+        return total
+
+    def samples(self, labels, data):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), data[:-1]):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {data[-1]}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+metrics = MetricsRegistry()
+
+NODE_LATENCY = metrics.histogram(
+    "banking_node_latency_seconds", "Latency of each LangGraph node.", ("node",))
+AGENT_LATENCY = metrics.histogram(
+    "banking_agent_latency_seconds", "Latency of agent runs, including queueing for a slot.", ("agent",))
+LLM_CALLS_PER_REQUEST = metrics.histogram(
+    "banking_llm_calls_per_request", "LLM calls made while answering one request.", ("served_by",),
+    buckets=COUNT_BUCKETS)
+LLM_CALLS = metrics.counter(
+    "banking_llm_calls_total", "LLM calls made by agents and routing.")
+REQUESTS = metrics.counter(
+    "banking_requests_total", "Answered requests.", ("endpoint", "served_by"))
+ERRORS = metrics.counter(
+    "banking_errors_total", "Errors by exception type.", ("type",))
+IN_FLIGHT = metrics.gauge(
+    "banking_requests_in_flight", "Requests currently being processed.", ("endpoint",))
+
+
+def instrument_node(name, func):
+    """
+    Wrap a LangGraph node so its latency lands in NODE_LATENCY.
+
+    ``functools.wraps`` keeps the signature visible to LangGraph, so nodes
+    that take a ``config`` argument still receive it.
+    """
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                NODE_LATENCY.observe(time.perf_counter() - start, name)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            NODE_LATENCY.observe(time.perf_counter() - start, name)
+    return wrapper
+
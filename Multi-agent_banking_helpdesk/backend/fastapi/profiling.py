@@ -0,0 +1,216 @@
+# --- File: profiling.py ---
+import asyncio
+import contextvars
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+# Profile a fraction of requests (0 disables env-driven profiling; headers still work)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Request header that forces a profile for one request, e.g. "X-Profile: 1"; empty disables it
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+# Stack sampling interval
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# One collapsed-stack file per profiled request is written here
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# (RequestProfile, node name) for the code currently running on behalf of a profiled request
+_current = contextvars.ContextVar("profile", default=None)
+
+
+class RequestProfile:
+    """
+    Stack samples for one request.
+
+    ``stacks`` counts collapsed stacks ("node;outer;...;inner"), the format
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.stacks = Counter()
+        self.node_ms = {}
+        self.started = time.time()
+        self.samples = 0
+        self.path = None
+
+    def add_node_time(self, node, seconds):
+        self.node_ms[node] = self.node_ms.get(node, 0.0) + seconds * 1000
+
+    def write(self, directory=None):
+        """Write the collapsed stacks (under PROFILE_DIR by default) and return the file path."""
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self.started))
+        path = os.path.join(directory, f"{stamp}-{self.request_id}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def summary(self):
+        return {
+            "request_id": self.request_id,
+            "samples": self.samples,
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "node_ms": {node: round(ms, 2) for node, ms in self.node_ms.items()},
+        }
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Background thread that samples every thread's stack while profiles are active.
+
+    Node wrappers register their own frame in ``markers``; a sampled stack is
+    charged to the request and node of the innermost marker frame on it, and
+    only the frames above that marker are kept. This attributes samples from
+    the event loop thread (shared by all requests) and from agent executor
+    threads without tracing every call, so unprofiled requests pay nothing.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.markers = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        # Taking the lock also waits out a sampling pass, so the profile is not written mid-update
+        with self._lock:
+            self._active -= 1
+            if not self._active:
+                self._wake.clear()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._wake.wait()
+            with self._lock:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own:
+                        self._sample(frame)
+            time.sleep(self.interval)
+
+    def _sample(self, frame):
+        names = []
+        while frame is not None:
+            marker = self.markers.get(id(frame))
+            if marker is not None:
+                profile, node = marker
+                names.append(node)
+                profile.stacks[";".join(reversed(names))] += 1
+                profile.samples += 1
+                return
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+
+
+sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+
+
+def should_profile(headers):
+    """Whether to profile a request: forced by PROFILE_HEADER, otherwise PROFILE_SAMPLE_RATE."""
+    if PROFILE_HEADER and headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def profile_request(enabled):
+    """
+    Profile the graph run inside the block when ``enabled``.
+
+    Yields the RequestProfile (or None); on exit its collapsed stacks are
+    written under PROFILE_DIR.
+    """
+    if not enabled:
+        yield None
+        return
+    profile = RequestProfile(uuid.uuid4().hex[:12])
+    token = _current.set((profile, None))
+    sampler.start()
+    try:
+        yield profile
+    finally:
+        sampler.stop()
+        _current.reset(token)
+        profile.path = profile.write()
+
+
+@contextmanager
+def _marked(frame, profile, node):
+    sampler.markers[id(frame)] = (profile, node)
+    token = _current.set((profile, node))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_node_time(node, time.perf_counter() - start)
+        _current.reset(token)
+        del sampler.markers[id(frame)]
+
+
+def profile_node(name, func):
+    """
+    Wrap a LangGraph node so its stacks are sampled when the request is profiled.
+
+    Outside a profiled request the wrapper only reads a context variable.
+    """
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            current = _current.get()
+            if current is None:
+                return await func(*args, **kwargs)
+            with _marked(sys._getframe(), current[0], name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        current = _current.get()
+        if current is None:
+            return func(*args, **kwargs)
+        with _marked(sys._getframe(), current[0], name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def bind(func):
+    """
+    Carry the caller's profile over to another thread.
+
+    ``run_in_executor`` does not copy context variables, so blocking agent
+    calls are wrapped here before they are handed to the executor.
+    """
+    current = _current.get()
+    if current is None or current[1] is None:
+        return func
+    profile, node = current
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _marked(sys._getframe(), profile, f"{node}[executor]"):
+            return func(*args, **kwargs)
+    return wrapper
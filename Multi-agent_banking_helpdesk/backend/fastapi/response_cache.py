@@ -0,0 +1,119 @@
+# --- File: response_cache.py ---
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+GUIDELINE_CACHE_SIZE = int(os.getenv("GUIDELINE_CACHE_SIZE", "2048"))
+GUIDELINE_CACHE_TTL = float(os.getenv("GUIDELINE_CACHE_TTL", "3600"))
+CACHE_REMOVE_STOPWORDS = os.getenv("CACHE_REMOVE_STOPWORDS", "true").lower() == "true"
+CACHE_LEMMATIZE = os.getenv("CACHE_LEMMATIZE", "true").lower() == "true"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a an the is are was were be been am do does did s of for to in on at by with about
+what whats which who how can could would should please tell me my i you your
+explain describe give show know
+""".split())
+
+# Agent outputs that are not answers (iteration limits, parse failures, errors); never cached
+NON_ANSWER_PATTERN = re.compile(
+    r"^\s*(?:agent stopped due to|could not parse|invalid format|invalid or incomplete response|"
+    r"error\b|no information available)",
+    re.IGNORECASE
+)
+
+# Irregular forms first, then suffix rules applied in order (longest first)
+LEMMA_EXCEPTIONS = {"policies": "policy", "rules": "rule", "fees": "fee", "loans": "loan"}
+LEMMA_SUFFIXES = (("ies", "y"), ("ing", ""), ("es", ""), ("s", ""))
+
+
+def lemmatize(token):
+    """Cheap rule-based lemmatizer; good enough to merge plural/verb forms in cache keys."""
+    if token in LEMMA_EXCEPTIONS:
+        return LEMMA_EXCEPTIONS[token]
+    if len(token) <= 4 or token.endswith("ss"):
+        return token
+    for suffix, replacement in LEMMA_SUFFIXES:
+        if token.endswith(suffix):
+            return token[: -len(suffix)] + replacement
+    return token
+
+
+def normalize_query(query, remove_stopwords=CACHE_REMOVE_STOPWORDS, lemmatize_tokens=CACHE_LEMMATIZE):
+    """
+    Cache key for a query: lower-cased alphanumeric tokens, optionally
+    without stop words and lemmatized. "What is KYC?" and "what's kyc"
+    map to the same key.
+    """
+    tokens = TOKEN_PATTERN.findall(query.lower())
+    if remove_stopwords:
+        kept = [t for t in tokens if t not in STOP_WORDS]
+        tokens = kept or tokens
+    if lemmatize_tokens:
+        tokens = [lemmatize(t) for t in tokens]
+    return " ".join(tokens)
+
+
+def is_answer(response):
+    """Whether an agent output is a real answer worth replaying to other users."""
+    return isinstance(response, str) and bool(response.strip()) and not NON_ANSWER_PATTERN.match(response)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and hit/miss counters.
+    """
+
+    def __init__(self, maxsize=GUIDELINE_CACHE_SIZE, ttl=GUIDELINE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, query):
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query, response):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *_):
+        """Drop every entry, e.g. when the guideline topics change."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+guideline_cache = ResponseCache()
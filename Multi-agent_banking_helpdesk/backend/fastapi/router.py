@@ -0,0 +1,80 @@
+# --- File: router.py ---
+import os
+import re
+
+# Keywords per agent. Plural/verb forms are listed explicitly so the
+# combined pattern can stay a plain word-boundary alternation.
+ROUTING_KEYWORDS = {
+    'guidelines': ['policy', 'policies', 'kyc', 'rule', 'rules', 'guideline', 'guidelines',
+                   'regulation', 'regulations', 'loan', 'loans', 'interest'],
+    'accounts': ['balance', 'balances', 'transfer', 'transfers', 'account', 'accounts',
+                 'savings', 'checking', 'statement'],
+    'billing': ['pay', 'pays', 'paid', 'paying', 'bill', 'bills', 'payment', 'payments',
+                'biller', 'billers', 'invoice'],
+}
+
+DEFAULT_AGENT = 'guidelines'
+
+# Decisions below this confidence are flagged for LLM routing
+CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.6"))
+
+
+class IntentRouter:
+    """
+    Keyword router compiled once into a single word-boundary regex.
+
+    One ``finditer`` pass over the lower-cased query scores every agent at
+    once; the winning agent's share of all hits is reported as confidence.
+    """
+
+    def __init__(self, keywords, default_agent=DEFAULT_AGENT, threshold=CONFIDENCE_THRESHOLD):
+        self.default_agent = default_agent
+        self.threshold = threshold
+        self.agents = list(keywords)
+        self._keyword_to_agent = {}
+        for agent, words in keywords.items():
+            for word in words:
+                self._keyword_to_agent[word.lower()] = agent
+        # Longest first so that e.g. 'payments' wins over 'pay' at the same position
+        alternation = "|".join(
+            re.escape(word) for word in sorted(self._keyword_to_agent, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"\b(?:{alternation})\b")
+
+    def scores(self, query):
+        """Keyword hit counts per agent for one query."""
+        scores = dict.fromkeys(self.agents, 0)
+        keyword_to_agent = self._keyword_to_agent
+        for word in self._pattern.findall(query.lower()):
+            scores[keyword_to_agent[word]] += 1
+        return scores
+
+    def route(self, query):
+        """
+        Pick an agent for a query.
+
+        Args:
+            query (str): Raw user query
+
+        Returns:
+            tuple: (agent_name, confidence, scores). Confidence is 0.0 when no
+                   keyword matched and the default agent was chosen.
+        """
+        scores = self.scores(query)
+        total = sum(scores.values())
+        if total == 0:
+            return self.default_agent, 0.0, scores
+        # Ties resolve in ROUTING_KEYWORDS order
+        agent = max(scores, key=scores.get)
+        return agent, scores[agent] / total, scores
+
+    def route_many(self, queries):
+        """Route a batch of queries; returns a list of ``route`` results in input order."""
+        route = self.route
+        return [route(query) for query in queries]
+
+    def is_confident(self, confidence):
+        return confidence >= self.threshold
+
+
+router = IntentRouter(ROUTING_KEYWORDS)
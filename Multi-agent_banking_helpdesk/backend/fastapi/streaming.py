@@ -0,0 +1,88 @@
+# --- File: streaming.py ---
+import json
+
+# Graph nodes whose start/end are forwarded to the client
+GRAPH_NODES = {"validate", "fast_path", "orchestrator", "error_handler"}
+# ReAct agents put the user-facing answer after this marker
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+def sse(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class FinalAnswerFilter:
+    """
+    Passes through only the LLM tokens that come after "Final Answer:".
+
+    Thought/Action tokens of the ReAct loop are held back; text is buffered
+    per LLM run until the marker shows up.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self._open = set()
+
+    def feed(self, run_id, text):
+        if run_id in self._open:
+            return text
+        buffer = self._buffers.get(run_id, "") + text
+        marker = buffer.find(FINAL_ANSWER_MARKER)
+        if marker < 0:
+            self._buffers[run_id] = buffer
+            return ""
+        self._open.add(run_id)
+        self._buffers.pop(run_id, None)
+        return buffer[marker + len(FINAL_ANSWER_MARKER):].lstrip()
+
+
+async def stream_graph_events(graph, state, config=None, on_done=None):
+    """
+    Run the graph and translate its events into SSE frames.
+
+    Emits ``route`` as soon as a routing decision is made, ``node`` and
+    ``tool`` events while the agent works, ``token`` for final-answer text
+    as the LLM produces it, and a closing ``final`` (or ``error``) event.
+
+    Args:
+        graph: Compiled LangGraph
+        state (dict): Initial state
+        config (dict): RunnableConfig for the run, e.g. extra callbacks
+        on_done (callable): Called with the final state values once finished;
+            a returned dict is added to the ``final`` event
+
+    Yields:
+        str: SSE-formatted frames
+    """
+    answer_filter = FinalAnswerFilter()
+    final = {}
+    try:
+        async for event in graph.astream_events(state, config=config, version="v2"):
+            kind = event["event"]
+            name = event.get("name")
+            if kind == "on_custom_event" and name == "routing":
+                yield sse("route", event["data"])
+            elif kind in ("on_chain_start", "on_chain_end") and name in GRAPH_NODES \
+                    and event.get("metadata", {}).get("langgraph_node") == name:
+                if kind == "on_chain_end" and isinstance(event["data"].get("output"), dict):
+                    final.update(event["data"]["output"])
+                yield sse("node", {"node": name, "phase": "start" if kind == "on_chain_start" else "end"})
+            elif kind == "on_tool_start":
+                yield sse("tool", {"tool": name, "phase": "start", "input": event["data"].get("input")})
+            elif kind == "on_tool_end":
+                yield sse("tool", {"tool": name, "phase": "end", "output": event["data"].get("output")})
+            elif kind == "on_chat_model_stream":
+                text = answer_filter.feed(event["run_id"], event["data"]["chunk"].content)
+                if text:
+                    yield sse("token", {"text": text})
+    except Exception as e:
+        yield sse("error", {"error": str(e)})
+        return
+    extra = on_done(final) if on_done is not None else None
+    if final.get("status") == "error" and "response" not in final:
+        yield sse("error", {"error": final.get("error", "Unknown error occurred")})
+    else:
+        yield sse("final", {
+            "response": final.get("response"), "served_by": final.get("served_by", "agent"), **(extra or {})
+        })
@@ -0,0 +1,137 @@
+import math
+import os
+
+import faiss
+import numpy as np
+
+from embedding_cache import CachedEmbeddings
+
+# 'flat' (exact), 'hnsw', 'ivfpq' or 'sq8' (8-bit scalar quantized)
+INDEX_TYPE = os.getenv('INDEX_TYPE', 'flat')
+# IVF-PQ needs enough vectors to train its coarse and product quantizers;
+# smaller corpora stay on the exact flat index
+IVFPQ_MIN_VECTORS = int(os.getenv('IVFPQ_MIN_VECTORS', '10000'))
+INDEX_TYPES = ('flat', 'hnsw', 'ivfpq', 'sq8')
+
+
+def effective_type(index_type, ntotal):
+    """Index type actually used for a corpus of ``ntotal`` vectors."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {index_type}")
+    if index_type == 'ivfpq' and ntotal < IVFPQ_MIN_VECTORS:
+        return 'flat'
+    return index_type
+
+
+def choose_params(index_type, ntotal, dim):
+    """
+    Index parameters for a corpus size.
+
+    - hnsw:  more links per node and a wider search beam as the corpus grows
+    - ivfpq: about 4 * sqrt(n) lists (at least 39 training points each),
+             probing 1/16 of them, 8-bit codes of 16 dimensions each
+    """
+    if index_type == 'hnsw':
+        large = ntotal >= 100_000
+        return {'M': 32 if large else 16, 'ef_construction': 200, 'ef_search': 128 if large else 64}
+    if index_type == 'ivfpq':
+        nlist = 2 ** round(math.log2(max(16, 4 * math.sqrt(ntotal))))
+        nlist = max(16, min(nlist, ntotal // 39))
+        m = next(m for m in range(max(1, dim // 16), 0, -1) if dim % m == 0)
+        return {'nlist': nlist, 'nprobe': max(1, nlist // 16), 'm': m, 'nbits': 8}
+    return {}
+
+
+def build_index(index_type, vectors):
+    """
+    Train an index of ``index_type`` on ``vectors`` and add them, in order.
+
+    Returns:
+        tuple: (faiss index, parameters used)
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    ntotal, dim = vectors.shape
+    params = choose_params(index_type, ntotal, dim)
+    if index_type == 'flat':
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, params['M'])
+        index.hnsw.efConstruction = params['ef_construction']
+        index.hnsw.efSearch = params['ef_search']
+    elif index_type == 'ivfpq':
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, params['nlist'], params['m'], params['nbits'])
+        index.train(vectors)
+        index.nprobe = params['nprobe']
+        # Hashtable direct map: supports both remove_ids and reconstruct
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    elif index_type == 'sq8':
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+        index.train(vectors)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    index.add(vectors)
+    return index, params
+
+
+def index_type_of(index):
+    """Inverse of build_index: the type name of a FAISS index."""
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexIVF):
+        return 'ivfpq'
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return 'sq8'
+    return 'flat'
+
+
+def stored_vectors(store):
+    """
+    The store's vectors in index order.
+
+    Taken from the embedding cache when the store embeds through one, so
+    retraining a quantized index starts from the original vectors rather
+    than their lossy reconstructions.
+    """
+    index = store.index
+    if isinstance(store.embedding_function, CachedEmbeddings):
+        texts = [store.docstore.search(store.index_to_docstore_id[i]).page_content for i in range(index.ntotal)]
+        return np.asarray(store.embedding_function.embed_documents(texts), dtype=np.float32)
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def rebuild(store, index_type, vectors=None):
+    """Replace ``store.index`` with a freshly trained index of ``index_type``."""
+    if vectors is None:
+        vectors = stored_vectors(store)
+    store.index, params = build_index(index_type, vectors)
+    return params
+
+
+def delete(store, ids):
+    """
+    Delete documents by id from a LangChain FAISS store of any index type.
+
+    Flat and scalar-quantized indexes compact their ids on removal, which is
+    what LangChain's ``delete`` expects. HNSW cannot remove vectors and IVF
+    keeps the old ids, so those are rebuilt from the remaining vectors.
+    """
+    index_type = index_type_of(store.index)
+    if index_type in ('flat', 'sq8'):
+        store.delete(ids)
+        return
+    drop = set(ids)
+    positions = range(store.index.ntotal)
+    keep = [i for i in positions if store.index_to_docstore_id[i] not in drop]
+    vectors = stored_vectors(store)[keep]
+    store.docstore.delete([store.index_to_docstore_id[i] for i in positions if store.index_to_docstore_id[i] in drop])
+    store.index_to_docstore_id = {new: store.index_to_docstore_id[old] for new, old in enumerate(keep)}
+    if keep:
+        rebuild(store, effective_type(index_type, len(keep)), vectors)
+    else:
+        store.index = faiss.IndexFlatL2(store.index.d)
+
+
+def index_memory_bytes(index):
+    """Serialized size of an index, a close proxy for its memory footprint."""
+    return faiss.serialize_index(index).nbytes
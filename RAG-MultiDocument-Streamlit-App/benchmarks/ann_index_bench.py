@@ -0,0 +1,87 @@
+"""
+Recall, query latency and memory of the index types in ann_index.py.
+
+For each corpus size, generates clustered random vectors (normalized, like
+the embedding stage's output), builds every index type with the parameters
+ann_index.choose_params picks for that size and reports:
+
+- recall@5:   overlap with the exact top 5 from a flat index
+- p50 / p99:  single-query search latency
+- memory:     serialized index size
+- build:      training + add time
+
+IVF-PQ below IVFPQ_MIN_VECTORS is reported as the flat index it falls back to.
+1M x 1024 needs about 8 GB of RAM for the vectors and the exact baseline;
+use --dim 384 or fewer sizes on smaller machines.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/ann_index_bench.py --sizes 10000 100000 1000000 --dim 1024
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+
+import ann_index
+
+
+def make_vectors(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        vectors[start:end] = centers[rng.integers(0, clusters, end - start)]
+        vectors[start:end] += 0.5 * rng.standard_normal((end - start, dim), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--types", nargs="+", default=list(ann_index.INDEX_TYPES))
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>9} {'type':<6} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'memory MB':>10} {'build s':>8}  params")
+    for size in args.sizes:
+        clusters = max(16, int(np.sqrt(size)))
+        vectors = make_vectors(size, args.dim, clusters, rng)
+        queries = make_vectors(args.queries, args.dim, clusters, np.random.default_rng(size))
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(vectors)
+        _, truth = exact.search(queries, args.k)
+        del exact
+
+        for index_type in args.types:
+            effective = ann_index.effective_type(index_type, size)
+            start = time.perf_counter()
+            index, params = ann_index.build_index(effective, vectors)
+            build_s = time.perf_counter() - start
+            latencies, hits = [], 0
+            for q in range(args.queries):
+                start = time.perf_counter()
+                _, found = index.search(queries[q:q + 1], args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len(set(found[0]) & set(truth[q]))
+            memory = ann_index.index_memory_bytes(index) / 2**20
+            name = index_type if effective == index_type else f"{index_type}>{effective}"
+            print(f"{size:>9} {name:<6} {hits / (args.queries * args.k):>9.3f} "
+                  f"{np.percentile(latencies, 50):>8.3f} {np.percentile(latencies, 99):>8.3f} "
+                  f"{memory:>10.1f} {build_s:>8.1f}  {params}")
+            del index
+        del vectors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Prompt size and latency with and without the context packer.
+
+Indexes --docs synthetic policy documents (see hybrid_retrieval_bench.py)
+and builds the prompt for --queries questions two ways:
+
+- before: the top 5 chunks formatted by query_documents, as prompt_ai used to
+- after:  pack_context(search_chunks(...)) as prompt_ai does now
+
+Prompt tokens are estimated at 4 characters per token. With --llm each
+prompt is also sent to the Groq model (GROQ_API_KEY) and the end-to-end
+time is reported.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/context_packing_bench.py --docs 500 --queries 100
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+from context_packer import CONTEXT_TOKEN_BUDGET, estimate_tokens, pack_context
+from embedding_stage import SentenceTransformerEmbeddings
+from hybrid_retrieval_bench import TOPICS, write_corpus
+from index_manager import IndexManager
+from rag_utils import CONTEXT_CHUNKS, EMBEDDING_MODEL, get_local_model, load_files, search_chunks, search_documents
+
+
+def before(question, manager):
+    docs = search_documents(question, k=5, manager=manager)
+    context = [f"Source: {d.metadata.get('source', 'NA')}\nContent: {d.page_content}" for d in docs]
+    return f"Context for answering the question:\n{context}\nQuestion/user input:\n{question}"
+
+
+def after(question, manager, budget):
+    context = pack_context(search_chunks(question, k=CONTEXT_CHUNKS, manager=manager), token_budget=budget)
+    return f"Context for answering the question:\n{context}\nQuestion/user input:\n{question}"
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--llm", action="store_true", help="Also time the LLM call for each prompt")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    work = tempfile.mkdtemp(prefix="context-bench-")
+    docs, index = os.path.join(work, "docs"), os.path.join(work, "index")
+    os.makedirs(docs)
+    try:
+        targets = write_corpus(docs, args.docs, rng)
+        manager = IndexManager(docs, index, SentenceTransformerEmbeddings(args.model), load_files)
+        manager.sync()
+        # Let the background save finish before the work directory is removed
+        manager.wait_saved()
+        sample = rng.sample(targets, min(args.queries, len(targets)))
+        questions = [f"What does clause {c} say about {' '.join(rng.sample(TOPICS[t].split(), 2))}?"
+                     for _, t, c, _ in sample]
+        llm = get_local_model() if args.llm else None
+
+        print(f"{'prompt':<8} {'tokens p50':>11} {'tokens max':>11} {'build ms':>9} {'llm p50 ms':>11}")
+        for name, build in (("before", lambda q: before(q, manager)),
+                            ("after", lambda q: after(q, manager, args.budget))):
+            tokens, build_ms, llm_ms = [], [], []
+            for question in questions:
+                start = time.perf_counter()
+                prompt = build(question)
+                build_ms.append((time.perf_counter() - start) * 1000)
+                tokens.append(estimate_tokens(prompt))
+                if llm is not None:
+                    start = time.perf_counter()
+                    llm.invoke([HumanMessage(content=prompt)])
+                    llm_ms.append((time.perf_counter() - start) * 1000)
+            llm_p50 = f"{statistics.median(llm_ms):.0f}" if llm_ms else "-"
+            print(f"{name:<8} {statistics.median(tokens):>11.0f} {max(tokens):>11} "
+                  f"{statistics.median(build_ms):>9.2f} {llm_p50:>11}")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+History tokens per turn over a long chat, with and without ConversationMemory.
+
+Simulates --turns question/answer turns of random length and, at every
+turn, builds the history prompt_ai would send:
+
+- full:    messages[:-1], the whole session so far
+- bounded: ConversationMemory.history(messages[:-1])
+
+Reports history tokens and build time at a few checkpoints. The default
+summarizer joins the first words of each folded message and sleeps
+--summary-ms to stand in for the LLM call; --llm uses the Groq model
+(GROQ_API_KEY) instead.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/conversation_memory_bench.py --turns 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from context_packer import estimate_tokens
+from conversation_memory import (
+    MEMORY_RECENT_TURNS, MEMORY_SUMMARY_TOKENS, MEMORY_TOKEN_BUDGET, ConversationMemory, llm_summarizer
+)
+
+WORDS = "account balance fee transfer policy clause statement card loan rate limit notice refund".split()
+
+
+def fake_summarizer(delay):
+    def summarize(summary, messages):
+        time.sleep(delay)
+        return " ".join([summary] + [" ".join(m.content.split()[:12]) for m in messages]).strip()
+    return summarize
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def history_tokens(messages):
+    return sum(estimate_tokens(m.content) for m in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--recent", type=int, default=MEMORY_RECENT_TURNS)
+    parser.add_argument("--budget", type=int, default=MEMORY_TOKEN_BUDGET)
+    parser.add_argument("--summary-tokens", type=int, default=MEMORY_SUMMARY_TOKENS)
+    parser.add_argument("--summary-ms", type=float, default=500)
+    parser.add_argument("--llm", action="store_true", help="Summarize with the Groq model")
+    args = parser.parse_args()
+
+    if args.llm:
+        from rag_utils import get_local_model
+        summarize = llm_summarizer(get_local_model(), args.summary_tokens)
+    else:
+        summarize = fake_summarizer(args.summary_ms / 1000)
+    memory = ConversationMemory(summarize, recent_turns=args.recent, token_budget=args.budget,
+                                summary_tokens=args.summary_tokens)
+
+    rng = random.Random(0)
+    messages = [SystemMessage(content="You are a personal assistant who answers questions based on the context.")]
+    checkpoints = {1, 10, 25, 50, 100, 150, 200, args.turns}
+    print(f"{'turn':>5} {'full tokens':>12} {'bounded tokens':>15} {'full ms':>8} {'bounded ms':>11} {'cached':>7}")
+    for turn in range(1, args.turns + 1):
+        messages.append(HumanMessage(content=sentence(rng, 8, 60)))
+        start = time.perf_counter()
+        full = messages[:-1]
+        full_tokens = history_tokens(full)
+        full_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        bounded = memory.history(messages[:-1])
+        bounded_ms = (time.perf_counter() - start) * 1000
+        if turn in checkpoints:
+            print(f"{turn:>5} {full_tokens:>12} {history_tokens(bounded):>15} {full_ms:>8.3f} {bounded_ms:>11.3f} "
+                  f"{len(memory._tokens):>7}")
+        messages.append(AIMessage(content=sentence(rng, 40, 400)))
+    memory.wait()
+    print(f"\nsummary: {estimate_tokens(memory.summary)} tokens (limit {args.summary_tokens})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Rebuild time after adding one file, with and without the embedding cache.
+
+Writes --docs synthetic .txt documents, builds the FAISS store once (which
+fills the cache), adds one more document and rebuilds the store the way
+get_retriever does after an upload:
+
+- uncached: every chunk goes through the embedding model again
+- cached:   CachedEmbeddings, only the new file's chunks are embedded
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/embedding_cache_bench.py --docs 500
+    python benchmarks/embedding_cache_bench.py --docs 500 --fake-ms 20   # no model download
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings
+from rag_utils import EMBEDDING_MODEL, load_documents
+
+WORDS = ("account loan interest policy rate payment customer deposit clause term fee "
+         "balance transfer credit limit notice period agreement schedule review").split()
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic vectors that cost ``ms`` per chunk, standing in for the model."""
+
+    def __init__(self, ms, dim=1024):
+        self.ms = ms
+        self.dim = dim
+
+    def _vector(self, text):
+        time.sleep(self.ms / 1000)
+        return np.random.default_rng(abs(hash(text)) % 2**32).standard_normal(self.dim).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def write_doc(directory, i, rng, words):
+    with open(os.path.join(directory, f"doc{i:05d}.txt"), "w") as f:
+        paragraphs = ("\n\n".join(" ".join(rng.choice(WORDS) for _ in range(120)) for _ in range(words // 120)))
+        f.write(f"Document {i}\n\n{paragraphs}")
+
+
+def rebuild(directory, embeddings):
+    start = time.perf_counter()
+    FAISS.from_documents(load_documents(directory), embeddings)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--words", type=int, default=600, help="Words per document")
+    parser.add_argument("--fake-ms", type=float, help="Use a fake model costing this many ms per chunk")
+    args = parser.parse_args()
+
+    if args.fake_ms is not None:
+        model_name, model = "fake", FakeEmbeddings(args.fake_ms)
+    else:
+        from embedding_stage import SentenceTransformerEmbeddings
+        model_name, model = EMBEDDING_MODEL, SentenceTransformerEmbeddings(EMBEDDING_MODEL)
+
+    work = tempfile.mkdtemp(prefix="embedding-cache-bench-")
+    docs, cache_dir = os.path.join(work, "docs"), os.path.join(work, "cache")
+    os.makedirs(docs)
+    try:
+        rng = random.Random(0)
+        for i in range(args.docs):
+            write_doc(docs, i, rng, args.words)
+        cached = CachedEmbeddings(model, model_name, cache_dir=cache_dir)
+        cold = rebuild(docs, cached)
+        chunks = cached.misses
+        write_doc(docs, args.docs, rng, args.words)
+
+        uncached_s = rebuild(docs, model)
+        cached.hits = cached.misses = 0
+        cached_s = rebuild(docs, cached)
+
+        print(f"{args.docs} documents, {chunks} chunks; cold build with empty cache {cold:.2f} s")
+        print(f"{'rebuild after +1 file':<24} {'seconds':>8} {'embedded':>9}")
+        print(f"{'uncached':<24} {uncached_s:>8.2f} {chunks + cached.misses:>9}")
+        print(f"{'cached':<24} {cached_s:>8.2f} {cached.misses:>9}")
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(cache_dir) for f in files)
+        print(f"cache size: {size / 2**20:.1f} MB for {len(cached.cache)} vectors")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
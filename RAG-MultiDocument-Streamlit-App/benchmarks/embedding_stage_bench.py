@@ -0,0 +1,95 @@
+"""
+Embedding throughput (chunks/s) of embedding_stage.SentenceTransformerEmbeddings.
+
+Embeds --chunks synthetic chunks with lengths spread like CharacterTextSplitter
+output (mostly near the 1000-character limit, with a tail of short ones) for
+every combination of batch size, intra-op threads and length bucketing.
+A second table shows the overlap gain: parsing/splitting time hidden
+behind the encoder when IndexManager runs it on the BackgroundWorker.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/embedding_stage_bench.py --chunks 2000 --batch-sizes 8 32 64 --threads 1 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_stage import BackgroundWorker, SentenceTransformerEmbeddings
+from rag_utils import EMBEDDING_MODEL
+
+WORDS = ("account loan interest policy rate payment customer deposit clause term fee "
+         "balance transfer credit limit notice period agreement schedule review").split()
+
+
+def make_chunks(count, seed=0):
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        chars = rng.randint(60, 400) if rng.random() < 0.3 else rng.randint(800, 1000)
+        text = ""
+        while len(text) < chars:
+            text += rng.choice(WORDS) + " "
+        chunks.append(text[:chars])
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--split-ms", type=float, default=2.0,
+                        help="Simulated parse/split cost per chunk for the overlap test")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    stage = SentenceTransformerEmbeddings(args.model)
+    stage.embed_documents(chunks[:16])
+
+    print(f"{args.model}, {len(chunks)} chunks")
+    print(f"{'batch':>6} {'threads':>8} {'bucketed':>9} {'chunks/s':>9}")
+    best = None
+    for threads in args.threads:
+        import torch
+        torch.set_num_threads(threads)
+        for batch_size in args.batch_sizes:
+            for bucket in (False, True):
+                stage.batch_size, stage.bucket_by_length = batch_size, bucket
+                start = time.perf_counter()
+                stage.embed_documents(chunks)
+                rate = len(chunks) / (time.perf_counter() - start)
+                print(f"{batch_size:>6} {threads:>8} {str(bucket):>9} {rate:>9.1f}")
+                if best is None or rate > best[0]:
+                    best = (rate, batch_size, threads, bucket)
+
+    rate, stage.batch_size, threads, stage.bucket_by_length = best
+    torch.set_num_threads(threads)
+    batches = [chunks[i:i + 256] for i in range(0, len(chunks), 256)]
+
+    def produce(submit):
+        start = time.perf_counter()
+        for batch in batches:
+            time.sleep(len(batch) * args.split_ms / 1000)
+            submit(batch)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    produce(stage.embed_documents)
+    inline_s = time.perf_counter() - start
+    start = time.perf_counter()
+    with BackgroundWorker(stage.embed_documents) as worker:
+        produce(worker.submit)
+    overlapped_s = time.perf_counter() - start
+    print(f"\nbest setting: batch {stage.batch_size}, {threads} threads, bucketed={stage.bucket_by_length}")
+    print(f"{'split + embed':<16} {'seconds':>8} {'chunks/s':>9}")
+    print(f"{'inline':<16} {inline_s:>8.2f} {len(chunks) / inline_s:>9.1f}")
+    print(f"{'background':<16} {overlapped_s:>8.2f} {len(chunks) / overlapped_s:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
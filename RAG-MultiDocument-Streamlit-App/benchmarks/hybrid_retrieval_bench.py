@@ -0,0 +1,107 @@
+"""
+Latency and hit rate of dense, sparse (BM25) and hybrid retrieval.
+
+Writes --docs synthetic policy documents. Each has a topic paragraph, a
+clause number (e.g. 12.4.7) and a product code (e.g. PRD-48213) that
+appear in no other document. Two query sets are run through
+rag_utils.search_documents in every mode:
+
+- exact:    "What does clause 12.4.7 say?" / "Which fees apply to PRD-48213?"
+- semantic: a question built from the document's topic words
+
+A query hits when its document is among the top --k results.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/hybrid_retrieval_bench.py --docs 500 --queries 200
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_stage import SentenceTransformerEmbeddings
+from index_manager import IndexManager
+from rag_utils import EMBEDDING_MODEL, load_files, search_documents
+
+TOPICS = {
+    "overdraft": "overdraft protection fees negative balance checking account coverage",
+    "mortgage": "mortgage home loan interest rate fixed variable repayment term",
+    "fraud": "fraud unauthorized transaction card stolen dispute chargeback",
+    "savings": "savings account interest compounding withdrawal limit deposit",
+    "wire": "wire transfer international swift fee cutoff time beneficiary",
+    "credit": "credit card limit statement minimum payment annual fee",
+    "closure": "account closure dormant inactive balance transfer notice",
+    "kyc": "identity verification documents know your customer onboarding",
+}
+FILLER = "the bank may review update amend apply terms conditions customers notice schedule".split()
+
+
+def write_corpus(directory, docs, rng):
+    targets = []
+    for i in range(docs):
+        topic = rng.choice(list(TOPICS))
+        clause = f"{rng.randint(1, 40)}.{rng.randint(1, 20)}.{i}"
+        code = f"PRD-{10000 + i}"
+        words = TOPICS[topic].split()
+        body = " ".join(rng.choice(FILLER + words) for _ in range(150))
+        with open(os.path.join(directory, f"policy{i:05d}.txt"), "w") as f:
+            f.write(f"{topic.title()} policy.\n\nClause {clause}: {body}\n\nProduct {code} is covered by this policy.")
+        targets.append((f"policy{i:05d}.txt", topic, clause, code))
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    work = tempfile.mkdtemp(prefix="hybrid-bench-")
+    docs, index = os.path.join(work, "docs"), os.path.join(work, "index")
+    os.makedirs(docs)
+    try:
+        targets = write_corpus(docs, args.docs, rng)
+        manager = IndexManager(docs, index, SentenceTransformerEmbeddings(args.model), load_files)
+        manager.sync()
+        # Let the background save finish before the work directory is removed
+        manager.wait_saved()
+
+        sample = rng.sample(targets, min(args.queries, len(targets)))
+        query_sets = {
+            "exact": [(f"What does clause {c} say?" if j % 2 else f"Which fees apply to {p}?", name)
+                      for j, (name, _, c, p) in enumerate(sample)],
+            "semantic": [(f"What is the policy on {' '.join(rng.sample(TOPICS[t].split(), 3))}?", t)
+                         for _, t, _, _ in sample],
+        }
+        print(f"{'mode':<8} {'queries':<9} {'hit@' + str(args.k):>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode in ("dense", "sparse", "hybrid"):
+            for set_name, queries in query_sets.items():
+                hits, latencies = 0, []
+                for question, expected in queries:
+                    start = time.perf_counter()
+                    results = search_documents(question, k=args.k, mode=mode, manager=manager)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    sources = [os.path.basename(d.metadata.get("source", "")) for d in results]
+                    if set_name == "exact":
+                        hits += expected in sources
+                    else:
+                        # Any document of the asked-about topic counts
+                        hits += any(d.page_content.lower().startswith(expected) for d in results)
+                latencies.sort()
+                print(f"{mode:<8} {set_name:<9} {hits / len(queries):>7.2f} "
+                      f"{statistics.median(latencies):>8.2f} {latencies[int(0.99 * (len(latencies) - 1))]:>8.2f}")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
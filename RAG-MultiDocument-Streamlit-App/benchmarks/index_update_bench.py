@@ -0,0 +1,78 @@
+"""
+Upload-to-queryable latency: full FAISS rebuild vs. IndexManager.sync.
+
+For each corpus size, indexes --sizes documents, then adds one document
+and measures how long it takes until it can be queried:
+
+- rebuild: load_documents + FAISS.from_documents over the whole directory
+- sync:    IndexManager.sync, which loads and embeds only the new file;
+           the index is then written to disk in the background ("save s")
+
+The embedding cache is not used, so the rebuild pays for every chunk.
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/index_update_bench.py --sizes 100 500 2000 --fake-ms 5
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.vectorstores import FAISS
+
+from embedding_cache_bench import FakeEmbeddings, write_doc
+from index_manager import IndexManager
+from rag_utils import EMBEDDING_MODEL, load_documents, load_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--words", type=int, default=600, help="Words per document")
+    parser.add_argument("--fake-ms", type=float, help="Use a fake model costing this many ms per chunk")
+    args = parser.parse_args()
+
+    if args.fake_ms is not None:
+        model = FakeEmbeddings(args.fake_ms)
+    else:
+        from embedding_stage import SentenceTransformerEmbeddings
+        model = SentenceTransformerEmbeddings(EMBEDDING_MODEL)
+
+    print(f"{'documents':>10} {'rebuild s':>10} {'sync s':>8} {'save s':>7} {'restart s':>10}")
+    for size in args.sizes:
+        work = tempfile.mkdtemp(prefix="index-update-bench-")
+        docs, index = os.path.join(work, "docs"), os.path.join(work, "index")
+        os.makedirs(docs)
+        try:
+            rng = random.Random(size)
+            for i in range(size):
+                write_doc(docs, i, rng, args.words)
+            manager = IndexManager(docs, index, model, load_files)
+            manager.sync()
+            manager.wait_saved()
+            write_doc(docs, size, rng, args.words)
+
+            start = time.perf_counter()
+            FAISS.from_documents(load_documents(docs), model)
+            rebuild_s = time.perf_counter() - start
+            sync_s = manager.sync()["seconds"]
+            start = time.perf_counter()
+            manager.wait_saved()
+            save_s = time.perf_counter() - start
+
+            # A restarted process loads the persisted index instead of re-embedding
+            start = time.perf_counter()
+            IndexManager(docs, index, model, load_files).sync()
+            restart_s = time.perf_counter() - start
+            print(f"{size:>10} {rebuild_s:>10.2f} {sync_s:>8.2f} {save_s:>7.2f} {restart_s:>10.2f}")
+        finally:
+            shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
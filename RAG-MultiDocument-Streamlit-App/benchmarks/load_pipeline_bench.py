@@ -0,0 +1,136 @@
+"""
+Wall-clock and peak RSS of document loading on a directory of mixed files.
+
+Writes --files documents (half .txt, half multi-page .pdf) and loads them
+in a fresh process per variant:
+
+- sequential: the previous load_documents; parse every file one after
+              another into full lists, then split everything at once
+- pipeline:   document_pipeline.iter_file_chunks in a process pool,
+              consumed in --batch sized batches and then dropped, as
+              IndexManager.sync does while it embeds
+
+Peak RSS is reported for the loading process and for the largest worker.
+Linux/macOS only (uses the resource module).
+
+Usage (from RAG-MultiDocument-Streamlit-App):
+    python benchmarks/load_pipeline_bench.py --files 1000 --workers 1 4 8
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("account loan interest policy rate payment customer deposit clause term fee "
+         "balance transfer credit limit notice period agreement schedule review").split()
+
+
+def write_pdf(path, pages):
+    """Minimal PDF with one Helvetica text block per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        text = "".join(f"({line}) Tj T* " for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_corpus(directory, files, seed=0):
+    rng = random.Random(seed)
+    line = lambda: " ".join(rng.choice(WORDS) for _ in range(12))
+    for i in range(files):
+        if i % 2:
+            write_pdf(os.path.join(directory, f"doc{i:05d}.pdf"),
+                      [[line() for _ in range(50)] for _ in range(rng.randint(2, 8))])
+        else:
+            with open(os.path.join(directory, f"doc{i:05d}.txt"), "w") as f:
+                f.write("\n\n".join(line() for _ in range(rng.randint(50, 400))))
+
+
+def run_sequential(directory):
+    from langchain_community.document_loaders import PyPDFLoader, TextLoader
+    from rag_utils import text_splitter
+    documents = []
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        loader = PyPDFLoader(path) if filename.endswith(".pdf") else TextLoader(path, encoding="utf-8")
+        documents.extend(loader.load())
+    return len(text_splitter.split_documents(documents))
+
+
+def run_pipeline(directory, workers, batch):
+    from document_pipeline import batched, iter_file_chunks
+    from rag_utils import text_splitter
+    paths = [os.path.join(directory, f) for f in os.listdir(directory)]
+    chunks = (c for _, file_chunks in iter_file_chunks(paths, text_splitter, workers=workers)
+              if not isinstance(file_chunks, Exception) for c in file_chunks)
+    return sum(len(b) for b in batched(chunks, batch))
+
+
+def peak_mb(who):
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss * scale / 2**20
+
+
+def worker(variant, directory, workers, batch):
+    start = time.perf_counter()
+    chunks = run_sequential(directory) if variant == "sequential" else run_pipeline(directory, workers, batch)
+    return {"seconds": time.perf_counter() - start, "chunks": chunks,
+            "peak_mb": peak_mb(resource.RUSAGE_SELF), "worker_peak_mb": peak_mb(resource.RUSAGE_CHILDREN)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        variant, directory, workers, batch = args.worker
+        print(json.dumps(worker(variant, directory, int(workers), int(batch))))
+        return
+
+    directory = tempfile.mkdtemp(prefix="load-pipeline-bench-")
+    try:
+        write_corpus(directory, args.files)
+        print(f"{args.files} files, {sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 2**20:.1f} MB")
+        print(f"{'variant':<14} {'seconds':>8} {'chunks':>8} {'peak MB':>8} {'worker MB':>10}")
+        runs = [("sequential", 1)] + [("pipeline", w) for w in args.workers]
+        for variant, workers in runs:
+            out = subprocess.run([sys.executable, __file__, "--worker", variant, directory, str(workers), str(args.batch)],
+                                 check=True, capture_output=True, text=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            name = variant if variant == "sequential" else f"pipeline x{workers}"
+            print(f"{name:<14} {r['seconds']:>8.2f} {r['chunks']:>8} {r['peak_mb']:>8.0f} {r['worker_peak_mb']:>10.0f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
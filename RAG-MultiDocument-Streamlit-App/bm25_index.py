@@ -0,0 +1,175 @@
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+
+import numpy as np
+
+BM25_K1 = float(os.getenv('BM25_K1', '1.2'))
+BM25_B = float(os.getenv('BM25_B', '0.75'))
+# Rank constant of reciprocal rank fusion
+RRF_K = int(os.getenv('RRF_K', '60'))
+
+# Keeps clause numbers, codes and versions ('4.2.1', 'ab-1234', 'v2_0') as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-_/][a-z0-9]+)*")
+PART_SPLIT = re.compile(r"[.\-_/]")
+
+
+def tokenize(text):
+    """
+    Lower-cased tokens; compound tokens also yield their parts, so a chunk
+    mentioning 'AB-1234' matches queries for 'AB-1234' as well as '1234'.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = PART_SPLIT.split(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Incremental BM25 index with array-backed postings.
+
+    Each term has two typed arrays: document numbers (uint32) and term
+    frequencies (uint16). Documents get consecutive numbers; deleting one
+    only marks it dead, and the postings are compacted once a quarter of
+    the documents are dead. Search scores a query's live postings with
+    numpy; dead ones count neither in the scores nor in document frequency.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._terms = {}
+        self._postings = []
+        self._lengths = array('I')
+        self._alive = bytearray()
+        self._ids = []
+        self._numbers = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def add(self, doc_ids, texts):
+        """Index documents; an id that is already indexed is replaced."""
+        with self._lock:
+            self.delete([doc_id for doc_id in doc_ids if doc_id in self._numbers])
+            for doc_id, text in zip(doc_ids, texts):
+                number = len(self._ids)
+                counts = {}
+                for token in tokenize(text):
+                    counts[token] = counts.get(token, 0) + 1
+                for token, count in counts.items():
+                    term = self._terms.get(token)
+                    if term is None:
+                        term = self._terms[token] = len(self._postings)
+                        self._postings.append((array('I'), array('H')))
+                    docs, freqs = self._postings[term]
+                    docs.append(number)
+                    freqs.append(min(count, 65535))
+                length = sum(counts.values())
+                self._ids.append(doc_id)
+                self._numbers[doc_id] = number
+                self._lengths.append(length)
+                self._alive.append(1)
+                self._total_length += length
+
+    def delete(self, doc_ids):
+        with self._lock:
+            for doc_id in doc_ids:
+                number = self._numbers.pop(doc_id, None)
+                if number is not None:
+                    self._alive[number] = 0
+                    self._total_length -= self._lengths[number]
+            if len(self._ids) - len(self._numbers) > max(64, len(self._ids) // 4):
+                self._compact()
+
+    def _compact(self):
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        terms, postings = {}, []
+        for token, term in self._terms.items():
+            docs, freqs = self._postings[term]
+            docs = np.frombuffer(docs, dtype=np.uint32)
+            keep = alive[docs]
+            if keep.any():
+                terms[token] = len(postings)
+                postings.append((array('I', renumber[docs[keep]].astype(np.uint32).tobytes()),
+                                 array('H', np.frombuffer(freqs, dtype=np.uint16)[keep].tobytes())))
+        self._terms, self._postings = terms, postings
+        self._ids = [doc_id for doc_id, live in zip(self._ids, self._alive) if live]
+        self._lengths = array('I', (n for n, live in zip(self._lengths, self._alive) if live))
+        self._alive = bytearray(b'\x01' * len(self._ids))
+        self._numbers = {doc_id: number for number, doc_id in enumerate(self._ids)}
+
+    def search(self, query, k=5):
+        """
+        Top ``k`` documents for a query.
+
+        Returns:
+            list: (doc_id, score) pairs, best first
+        """
+        with self._lock:
+            alive_count = len(self._numbers)
+            if not alive_count:
+                return []
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / alive_count))
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            for token in set(tokenize(query)):
+                term = self._terms.get(token)
+                if term is None:
+                    continue
+                docs, freqs = self._postings[term]
+                docs = np.frombuffer(docs, dtype=np.uint32)
+                tf = np.frombuffer(freqs, dtype=np.uint16)
+                # Dead postings stay in the arrays until compaction; leave them out of df and the scores
+                live = alive[docs]
+                docs, tf = docs[live], tf[live].astype(np.float32)
+                if not len(docs):
+                    continue
+                idf = math.log(1 + (alive_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+            hits = np.flatnonzero(scores)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k)[:k]]
+            hits = hits[np.argsort(-scores[hits])]
+            return [(self._ids[i], float(scores[i])) for i in hits]
+
+    def save(self, path):
+        with self._lock, open(path, 'wb') as f:
+            pickle.dump((self.k1, self.b, self._terms, self._postings, self._lengths, self._alive, self._ids,
+                         self._total_length), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        # Our own save output, not untrusted input
+        with open(path, 'rb') as f:
+            k1, b, terms, postings, lengths, alive, ids, total_length = pickle.load(f)
+        index = cls(k1, b)
+        index._terms, index._postings, index._lengths, index._alive = terms, postings, lengths, alive
+        index._ids, index._total_length = ids, total_length
+        index._numbers = {doc_id: n for n, doc_id in enumerate(ids) if alive[n]}
+        return index
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Merge ranked id lists: each id scores sum(1 / (k + rank)) over the lists it is in.
+
+    Returns:
+        list: Ids, best first
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
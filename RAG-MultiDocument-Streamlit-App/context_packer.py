@@ -0,0 +1,136 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.documents import Document
+
+# Upper bound on prompt tokens spent on retrieved context
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))
+# Vector-only matches below this cosine similarity are left out
+CONTEXT_MIN_SCORE = float(os.getenv('CONTEXT_MIN_SCORE', '0.5'))
+# Word 5-gram Jaccard similarity above which a chunk counts as a near-duplicate
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv('CONTEXT_DUPLICATE_THRESHOLD', '0.8'))
+# Longest text overlap looked for when joining neighbouring chunks (the splitter uses 100)
+MAX_OVERLAP_CHARS = 300
+# Shorter matches ('.', ' the') are coincidence rather than repeated text, and are not dropped
+MIN_OVERLAP_CHARS = 20
+# A block is only cut to fit when at least this many tokens are left
+MIN_PARTIAL_TOKENS = 50
+
+CHUNK_ID = re.compile(r"^(.*)#(\d+)$")
+WORD = re.compile(r"\w+")
+
+
+@dataclass
+class RetrievedChunk:
+    """One retrieval hit: ``dense`` is its cosine similarity, ``sparse`` its BM25 score (None if not found)."""
+    id: str
+    document: Document
+    dense: Optional[float] = None
+    sparse: Optional[float] = None
+
+
+def estimate_tokens(text):
+    """
+    Rough token count (about 4 characters per token for English text).
+
+    The Groq-hosted model has no local tokenizer; pass another
+    ``count_tokens`` to pack_context for exact counts.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def _shingles(text, size=5):
+    words = WORD.findall(text.lower())
+    return {hash(tuple(words[i:i + size])) for i in range(max(1, len(words) - size + 1))}
+
+
+def _join(first, second):
+    """
+    Concatenate two chunks, dropping the text the second one repeats from
+    the first; chunks that overlap by less than MIN_OVERLAP_CHARS are
+    joined with a newline instead.
+    """
+    for length in range(min(MAX_OVERLAP_CHARS, len(first), len(second)), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:length]):
+            return first + second[length:]
+    return f"{first}\n{second}"
+
+
+def _source_tag(document):
+    tag = os.path.basename(document.metadata.get('source', 'NA'))
+    if 'page' in document.metadata:
+        tag += f" p.{document.metadata['page'] + 1}"
+    return tag
+
+
+def merge_neighbours(chunks):
+    """
+    Merge hits that are consecutive chunks of the same file into one block.
+
+    Blocks keep the rank of their best chunk.
+
+    Returns:
+        list: (source tag, text) per block, best first
+    """
+    runs = {}
+    for rank, chunk in enumerate(chunks):
+        match = CHUNK_ID.match(chunk.id)
+        file, position = (match.group(1), int(match.group(2))) if match else (chunk.id, 0)
+        runs.setdefault(file, []).append((position, rank, chunk))
+    blocks = []
+    for file, members in runs.items():
+        members.sort(key=lambda m: m[0])
+        block = None
+        for position, rank, chunk in members:
+            if block is not None and position == block['last'] + 1:
+                block['text'] = _join(block['text'], chunk.document.page_content)
+                block['rank'] = min(block['rank'], rank)
+                block['last'] = position
+                continue
+            block = {'tag': _source_tag(chunk.document), 'text': chunk.document.page_content,
+                     'rank': rank, 'last': position}
+            blocks.append(block)
+    blocks.sort(key=lambda b: b['rank'])
+    return [(b['tag'], b['text']) for b in blocks]
+
+
+def pack_context(chunks, token_budget=CONTEXT_TOKEN_BUDGET, min_score=CONTEXT_MIN_SCORE,
+                 duplicate_threshold=CONTEXT_DUPLICATE_THRESHOLD, count_tokens=estimate_tokens):
+    """
+    Turn ranked retrieval hits into a compact, source-tagged context string.
+
+    Hits found only by the vector search with a similarity below
+    ``min_score`` are dropped; keyword (BM25) hits are kept. Consecutive
+    chunks of a file are merged without their overlap, near-duplicate
+    blocks are skipped, and blocks are added best first until
+    ``token_budget`` is used up (the last one cut at a word boundary).
+
+    Args:
+        chunks (list): RetrievedChunk hits, best first
+
+    Returns:
+        str: Blocks formatted as "[n] source\\ntext", separated by blank lines
+    """
+    kept = [c for c in chunks if c.sparse is not None or c.dense is None or c.dense >= min_score]
+    parts, seen, used = [], [], 0
+    for tag, text in merge_neighbours(kept):
+        shingles = _shingles(text)
+        if any(len(shingles & other) / len(shingles | other) >= duplicate_threshold for other in seen):
+            continue
+        header = f"[{len(parts) + 1}] {tag}\n"
+        cost = count_tokens(header + text)
+        if used + cost > token_budget:
+            remaining = token_budget - used - count_tokens(header)
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            text = text[:len(text) * remaining // count_tokens(text)].rsplit(' ', 1)[0] + " ..."
+            cost = count_tokens(header + text)
+        parts.append(header + text)
+        seen.append(shingles)
+        used += cost
+        if used >= token_budget:
+            break
+    return "\n\n".join(parts)
@@ -0,0 +1,198 @@
+import os
+import threading
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from context_packer import estimate_tokens
+
+# Most recent question/answer turns sent to the model word for word
+MEMORY_RECENT_TURNS = int(os.getenv('MEMORY_RECENT_TURNS', '6'))
+# Upper bound on prompt tokens spent on conversation history, summary included
+MEMORY_TOKEN_BUDGET = int(os.getenv('MEMORY_TOKEN_BUDGET', '2000'))
+# Length the running summary of older turns is kept to
+MEMORY_SUMMARY_TOKENS = int(os.getenv('MEMORY_SUMMARY_TOKENS', '300'))
+# Rough per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = """Update the summary of a conversation between a user and a document assistant.
+Keep facts, names, numbers and open questions the user may refer back to; drop pleasantries.
+Answer with the updated summary only, in at most {max_words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}"""
+
+
+def llm_summarizer(llm, max_tokens=MEMORY_SUMMARY_TOKENS):
+    """
+    Summarize function for ConversationMemory backed by a chat model.
+
+    Returns:
+        callable: (summary, messages) -> updated summary
+    """
+    def summarize(summary, messages):
+        turns = "\n".join(f"{m.type}: {m.content}" for m in messages)
+        prompt = SUMMARY_PROMPT.format(max_words=max_tokens * 3 // 4, summary=summary or "(none)", turns=turns)
+        return llm.invoke([HumanMessage(content=prompt)]).content.strip()
+    return summarize
+
+
+class ConversationMemory:
+    """
+    Bounded chat history for one conversation.
+
+    ``history`` returns the leading system messages, a running summary of
+    older turns and the last ``recent_turns`` turns verbatim, dropping the
+    oldest of those if needed so the whole stays within ``token_budget``.
+    Turns that leave the verbatim window are folded into the summary on a
+    background thread; until that finishes the previous summary is used.
+
+    Token counts are cached per message object, so each message is counted
+    once however many turns it stays in the window.
+    """
+
+    def __init__(self, summarize, recent_turns=MEMORY_RECENT_TURNS, token_budget=MEMORY_TOKEN_BUDGET,
+                 summary_tokens=MEMORY_SUMMARY_TOKENS, count_tokens=estimate_tokens, background=True):
+        """
+        Args:
+            summarize (callable): (summary, messages) -> updated summary, see llm_summarizer
+            recent_turns (int): Turns kept verbatim
+            token_budget (int): Most tokens the returned history may take
+            summary_tokens (int): Tokens the summary is cut to if the summarizer runs long
+            count_tokens (callable): text -> token count
+            background (bool): Refresh the summary on a thread instead of inline
+        """
+        self.summarize = summarize
+        self.recent_turns = recent_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.count_tokens = count_tokens
+        self.background = background
+        self.summary = ""
+        self._summary_cost = 0
+        # Messages before this index of the history are in, or queued for, the summary
+        self._cut = 0
+        self._pending = []
+        # id(message) -> (message, tokens); holding the message keeps its id from being reused
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def tokens(self, message):
+        """Token count of a message, counted once and then served from the cache."""
+        entry = self._tokens.get(id(message))
+        if entry is None or entry[0] is not message:
+            content = message.content if isinstance(message.content, str) else str(message.content)
+            entry = self._tokens[id(message)] = (message, self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS)
+        return entry[1]
+
+    def history(self, messages):
+        """
+        Bounded replacement for ``messages``, the conversation so far.
+
+        ``messages`` is expected to grow by appending between calls, as
+        st.session_state.messages does; a shorter list starts over.
+
+        Args:
+            messages (list): Full history: system messages first, then the turns
+
+        Returns:
+            list: Messages to send ahead of the new question
+        """
+        if len(messages) < self._cut:
+            self.wait()
+            self.summary, self._summary_cost, self._cut, self._pending, self._tokens = "", 0, 0, [], {}
+        system = 0
+        while system < len(messages) and isinstance(messages[system], SystemMessage):
+            system += 1
+        # System messages are always sent, never summarized
+        self._cut = max(self._cut, system)
+        # Each turn starts at a user message
+        starts = [i for i in range(system, len(messages)) if isinstance(messages[i], HumanMessage)]
+        cut = self._cut
+        if not self.recent_turns:
+            cut = len(messages)
+        elif len(starts) > self.recent_turns:
+            cut = max(cut, starts[-self.recent_turns])
+
+        with self._lock:
+            summary, summary_cost = self.summary, self._summary_cost
+        head = self._with_summary(messages[:system], summary)
+        total = sum(self.tokens(m) for m in messages[:system]) + summary_cost
+        total += sum(self.tokens(m) for m in messages[cut:])
+        # Over budget: drop whole turns, oldest first
+        for start in (s for s in starts if s > cut):
+            if total <= self.token_budget:
+                break
+            total -= sum(self.tokens(m) for m in messages[cut:start])
+            cut = start
+        if total > self.token_budget:
+            cut = len(messages)
+
+        self._fold(messages, cut)
+        return head + messages[cut:]
+
+    @staticmethod
+    def _note(summary):
+        return f"Summary of the earlier conversation:\n{summary}"
+
+    def _with_summary(self, system, summary):
+        if not summary:
+            return list(system)
+        note = self._note(summary)
+        if system:
+            return list(system[:-1]) + [SystemMessage(content=f"{system[-1].content}\n\n{note}")]
+        return [SystemMessage(content=note)]
+
+    def _fold(self, messages, cut):
+        """Queue the messages between the previous cut and ``cut`` for the summary."""
+        if cut <= self._cut:
+            return
+        with self._lock:
+            folded = messages[self._cut:cut]
+            self._pending.extend(folded)
+            self._cut = cut
+            # Folded messages are never counted again
+            for message in folded:
+                self._tokens.pop(id(message), None)
+            if self._worker is not None:
+                # The running refresh picks the new messages up before it exits
+                return
+            if self.background:
+                self._worker = threading.Thread(target=self._refresh, name='memory-summarizer', daemon=True)
+                self._worker.start()
+        if not self.background:
+            self._refresh()
+
+    def _refresh(self):
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                summary = self.summary
+                if not pending:
+                    self._worker = None
+                    return
+            try:
+                summary = self.summarize(summary, pending)
+            except Exception as e:
+                # Keep the old summary and retry these messages with the next fold
+                print(f"Error summarizing conversation: {e}")
+                with self._lock:
+                    self._pending = pending + self._pending
+                    self._worker = None
+                return
+            tokens = self.count_tokens(summary)
+            if tokens > self.summary_tokens:
+                summary = summary[:len(summary) * self.summary_tokens // tokens].rsplit(' ', 1)[0] + " ..."
+            # Priced as its own message, which also covers appending it to the system prompt
+            cost = self.count_tokens(self._note(summary)) + MESSAGE_OVERHEAD_TOKENS
+            with self._lock:
+                self.summary, self._summary_cost = summary, cost
+
+    def wait(self):
+        """Block until any background summary refresh has finished."""
+        worker = self._worker
+        if worker is not None:
+            worker.join()
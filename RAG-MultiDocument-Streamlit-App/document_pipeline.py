@@ -0,0 +1,126 @@
+import os
+import signal
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+
+# Parser processes
+LOAD_WORKERS = int(os.getenv('LOAD_WORKERS', str(min(8, os.cpu_count() or 1))))
+# Seconds one file may take to parse before it is skipped
+LOAD_TIMEOUT = float(os.getenv('LOAD_TIMEOUT', '60'))
+# Files parsed or waiting to be consumed at once, per worker; bounds memory
+LOAD_PREFETCH = int(os.getenv('LOAD_PREFETCH', '2'))
+# Parse in the calling process, with no timeout; for debugging a parser only
+LOAD_IN_PROCESS = os.getenv('LOAD_IN_PROCESS', 'false').lower() == 'true'
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout()
+
+
+def parse_file(path, timeout=LOAD_TIMEOUT):
+    """
+    Parse one PDF or txt file into page Documents.
+
+    Runs in a worker process, where SIGALRM interrupts a parse that takes
+    longer than ``timeout`` (on platforms without SIGALRM there is no limit).
+
+    Raises:
+        ParseTimeout: If parsing took longer than ``timeout`` seconds
+    """
+    alarm = timeout and hasattr(signal, 'SIGALRM')
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if path.lower().endswith('.pdf'):
+            return PyPDFLoader(path).load()
+        if path.lower().endswith('.txt'):
+            return TextLoader(path, encoding='utf-8').load()
+        return []
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def iter_pages(paths, workers=LOAD_WORKERS, timeout=LOAD_TIMEOUT, prefetch=LOAD_PREFETCH,
+               in_process=LOAD_IN_PROCESS):
+    """
+    Parse files in a process pool and yield them in completion order.
+
+    At most ``workers * prefetch`` files are in flight, so memory does not
+    grow with the number of files. A single file also goes through the
+    pool, so a broken upload is cut off after ``timeout`` seconds rather
+    than hanging the app; ``in_process`` parses in this process instead,
+    with no timeout.
+
+    Yields:
+        tuple: (path, list of page Documents) or (path, exception) for a file that failed
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    if in_process:
+        # Signals only work on the main thread, so no timeout here
+        for path in paths:
+            try:
+                yield path, parse_file(path, 0)
+            except Exception as e:
+                yield path, e
+        return
+
+    workers = max(1, min(workers, len(paths)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        remaining = iter(paths)
+        pending = {}
+
+        def submit(count):
+            for path in remaining:
+                pending[pool.submit(parse_file, path, timeout)] = path
+                count -= 1
+                if not count:
+                    break
+
+        submit(workers * prefetch)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    yield path, future.result()
+                except Exception as e:
+                    yield path, e
+            submit(len(done))
+
+
+def iter_file_chunks(paths, text_splitter, **kwargs):
+    """
+    Parse files in parallel and split each page as it arrives.
+
+    Yields:
+        tuple: (path, list of chunk Documents) per file, or (path, exception)
+    """
+    for path, pages in iter_pages(paths, **kwargs):
+        if isinstance(pages, Exception):
+            yield path, pages
+            continue
+        chunks = []
+        for page in pages:
+            chunks.extend(text_splitter.split_documents([page]))
+        yield path, chunks
+
+
+def batched(items, size):
+    """Yield lists of up to ``size`` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', '/tmp/embedding_cache')
+# float16 halves the cache size; use float32 to store vectors exactly
+EMBEDDING_CACHE_DTYPE = os.getenv('EMBEDDING_CACHE_DTYPE', 'float16')
+
+KEY_BYTES = 16
+
+
+def cache_key(model_name, text):
+    """
+    Cache key of a chunk: 16-byte BLAKE2b digest of model name and chunk text.
+    """
+    return hashlib.blake2b(f"{model_name}\0{text}".encode('utf-8'), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk store of embeddings for one model.
+
+    Layout of the model's directory:
+        meta.json     model name, dimension and dtype
+        keys.bin      one 16-byte cache key per row
+        vectors.bin   rows of ``dim`` values, read through a memmap
+
+    Vectors are written before their keys, so after a crash any rows
+    without a key are simply cut off when the cache is reopened.
+    """
+
+    def __init__(self, directory, model_name, dtype=EMBEDDING_CACHE_DTYPE):
+        self.model_name = model_name
+        self.directory = os.path.join(directory, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.dtype = np.dtype(dtype)
+        self.dim = None
+        self._rows = {}
+        self._vectors = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._open()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        if not os.path.exists(self._path('meta.json')):
+            return
+        with open(self._path('meta.json')) as f:
+            meta = json.load(f)
+        self.dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        with open(self._path('keys.bin'), 'rb') as f:
+            keys = f.read()
+        row_bytes = self.dim * self.dtype.itemsize
+        rows = min(len(keys) // KEY_BYTES, os.path.getsize(self._path('vectors.bin')) // row_bytes)
+        # Drop a half-written tail left by an interrupted append
+        with open(self._path('keys.bin'), 'r+b') as f:
+            f.truncate(rows * KEY_BYTES)
+        with open(self._path('vectors.bin'), 'r+b') as f:
+            f.truncate(rows * row_bytes)
+        self._rows = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(rows)}
+        self._remap()
+
+    def _remap(self):
+        rows = len(self._rows)
+        self._vectors = np.memmap(self._path('vectors.bin'), dtype=self.dtype, mode='r',
+                                  shape=(rows, self.dim)) if rows else None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, keys):
+        """
+        Look up cached vectors.
+
+        Returns:
+            list: A float32 vector per key, or None where the key is not cached
+        """
+        with self._lock:
+            rows = [self._rows.get(key) for key in keys]
+            vectors = self._vectors
+        found = [i for i, row in enumerate(rows) if row is not None]
+        result = [None] * len(keys)
+        if found:
+            block = np.asarray(vectors[[rows[i] for i in found]], dtype=np.float32)
+            for i, vector in zip(found, block):
+                result[i] = vector
+        return result
+
+    def add_many(self, keys, vectors):
+        """Append vectors for keys that are not cached yet."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._path('meta.json'), 'w') as f:
+                    json.dump({'model': self.model_name, 'dim': self.dim, 'dtype': self.dtype.name}, f)
+            new = {}
+            for i, key in enumerate(keys):
+                if key not in self._rows and key not in new:
+                    new[key] = i
+            if not new:
+                return
+            with open(self._path('vectors.bin'), 'ab') as f:
+                f.write(vectors[list(new.values())].astype(self.dtype).tobytes())
+            with open(self._path('keys.bin'), 'ab') as f:
+                f.write(b''.join(new))
+            start = len(self._rows)
+            for offset, key in enumerate(new):
+                self._rows[key] = start + offset
+            self._remap()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends chunks missing from the cache to the model.
+
+    Queries are passed straight through; only documents are cached.
+    """
+
+    def __init__(self, embeddings, model_name, cache_dir=EMBEDDING_CACHE_DIR, dtype=EMBEDDING_CACHE_DTYPE):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = EmbeddingCache(cache_dir, model_name, dtype)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts):
+        keys = [cache_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], i)
+        if missing:
+            embedded = self.embeddings.embed_documents([texts[i] for i in missing.values()])
+            self.cache.add_many(list(missing), embedded)
+            fresh = dict(zip(missing, np.asarray(embedded, dtype=np.float32)))
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Chunks per forward pass of the encoder
+EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', '32'))
+# Intra-op threads for the encoder; 0 leaves the torch default
+EMBED_THREADS = int(os.getenv('EMBED_THREADS', '0'))
+EMBED_NORMALIZE = os.getenv('EMBED_NORMALIZE', 'true').lower() == 'true'
+# Sort chunks by length before batching, so each batch pads to a similar length
+EMBED_BUCKET_BY_LENGTH = os.getenv('EMBED_BUCKET_BY_LENGTH', 'true').lower() == 'true'
+# Batches queued for the embedding worker before the producer waits
+EMBED_QUEUE_SIZE = int(os.getenv('EMBED_QUEUE_SIZE', '4'))
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """
+    CPU embedding stage over a sentence-transformers model.
+
+    Unlike HuggingFaceEmbeddings with its defaults, batch size, intra-op
+    thread count, normalization and batching order are configurable.
+    With ``bucket_by_length`` the texts are sorted by length and cut into
+    batches in that order, so short chunks are not padded to the length
+    of a long one; results come back in input order.
+    """
+
+    def __init__(self, model_name, batch_size=EMBED_BATCH_SIZE, threads=EMBED_THREADS,
+                 normalize=EMBED_NORMALIZE, bucket_by_length=EMBED_BUCKET_BY_LENGTH, device='cpu'):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.bucket_by_length = bucket_by_length
+        self.model = SentenceTransformer(model_name, device=device)
+
+    @property
+    def cache_name(self):
+        """Name for the embedding cache; normalized and raw vectors must not share entries."""
+        return f"{self.model_name}:normalized" if self.normalize else self.model_name
+
+    def _encode(self, texts):
+        return self.model.encode(texts, batch_size=len(texts), normalize_embeddings=self.normalize,
+                                 convert_to_numpy=True, show_progress_bar=False)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        order = np.argsort([-len(t) for t in texts], kind='stable') if self.bucket_by_length else np.arange(len(texts))
+        vectors = np.empty((len(texts), self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            vectors[batch] = self._encode([texts[i] for i in batch])
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
+
+
+class BackgroundWorker:
+    """
+    Runs ``func(*args)`` for submitted items on one thread, in order.
+
+    The queue is bounded, so a producer that parses and splits faster than
+    the encoder keeps up is paused instead of buffering the corpus. Use as
+    a context manager; leaving it waits for the queue to drain and
+    re-raises the first error from the worker.
+    """
+
+    _DONE = object()
+
+    def __init__(self, func, max_pending=EMBED_QUEUE_SIZE, name='embedding-worker'):
+        self.func = func
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._queue.put(self._DONE)
+        self._thread.join()
+        if self._error is not None and exc is None:
+            raise self._error
+
+    def submit(self, *args):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(args)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if self._error is None:
+                try:
+                    self.func(*item)
+                except Exception as e:
+                    self._error = e
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from langchain_community.vectorstores import FAISS
+
+import ann_index
+from ann_index import INDEX_TYPE
+from bm25_index import BM25Index
+from embedding_stage import BackgroundWorker
+
+INDEX_DIRECTORY = os.getenv('INDEX_DIRECTORY', '/tmp/faiss_index')
+# Chunks handed to the vector store per add_documents call
+INDEX_BATCH_SIZE = int(os.getenv('INDEX_BATCH_SIZE', '256'))
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt')
+MANIFEST_FILE = 'manifest.json'
+BM25_FILE = 'bm25.pkl'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexManager:
+    """
+    Keeps a persistent FAISS store in step with a document directory.
+
+    The manifest records each indexed file's content hash and the ids of
+    its chunks. ``sync`` only loads and embeds files that are new or whose
+    hash changed, and deletes the chunks of changed or removed files, so
+    the cost of an upload depends on the uploaded file, not the corpus.
+
+    With an approximate ``index_type`` (see ann_index.py) the index is
+    retrained when the corpus has doubled since the last training, or when
+    it grows large enough for the requested type.
+
+    ``sparse`` is a BM25 index over the same chunks, kept in step in the
+    same pass, for exact-term matches the dense vectors miss.
+
+    The manager is shared by every session. Readers hold ``index_lock``
+    while they use ``store`` and ``sparse``; ``sync`` embeds and retrains
+    without it and only takes it for the moment it changes them. The index
+    is written to disk on a background thread after each sync, so new
+    chunks are searchable as soon as they are added, whatever the corpus
+    size; a crash before the write only means the next start re-indexes
+    those files.
+    """
+
+    def __init__(self, directory, index_directory, embedding_function, load_files, batch_size=INDEX_BATCH_SIZE,
+                 index_type=INDEX_TYPE):
+        """
+        Args:
+            directory (str): Document directory to mirror
+            index_directory (str): Where the FAISS store and manifest are saved
+            embedding_function: LangChain embeddings used for the store
+            load_files (callable): paths -> iterator of (path, chunk Documents or exception),
+                                   in any order
+            batch_size (int): Chunks embedded and added per add_documents call
+            index_type (str): 'flat', 'hnsw', 'ivfpq' or 'sq8'
+        """
+        self.directory = directory
+        self.index_directory = index_directory
+        self.embedding_function = embedding_function
+        self.load_files = load_files
+        self.batch_size = batch_size
+        self.index_type = index_type
+        self.store = None
+        self.sparse = BM25Index()
+        # filename -> {"sha256": ..., "ids": [...]}
+        self.files = {}
+        # Vectors in the index when it was last trained
+        self.trained_on = 0
+        self.last_sync = {}
+        # Held by sync (and the saver), so there is only ever one writer
+        self._lock = threading.Lock()
+        # Held while store and sparse are read or changed
+        self.index_lock = threading.RLock()
+        self._saver = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        manifest_path = os.path.join(self.index_directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.files = manifest['files']
+        self.trained_on = manifest.get('trained_on', 0)
+        if os.path.exists(os.path.join(self.index_directory, 'index.faiss')):
+            # Our own save_local output, not untrusted input
+            self.store = FAISS.load_local(
+                self.index_directory, self.embedding_function, allow_dangerous_deserialization=True
+            )
+        if os.path.exists(os.path.join(self.index_directory, BM25_FILE)):
+            self.sparse = BM25Index.load(os.path.join(self.index_directory, BM25_FILE))
+        elif self.store is not None:
+            # Index saved before the sparse side existed
+            ids = list(self.store.index_to_docstore_id.values())
+            self.sparse.add(ids, [self.store.docstore.search(i).page_content for i in ids])
+
+    def _save(self):
+        # Write next to the live copy and swap directories, so a crash never leaves half an index
+        staging = self.index_directory + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        if self.store is not None:
+            self.store.save_local(staging)
+        self.sparse.save(os.path.join(staging, BM25_FILE))
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump({'files': self.files, 'trained_on': self.trained_on}, f)
+        previous = self.index_directory + '.old'
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(self.index_directory):
+            os.rename(self.index_directory, previous)
+        os.rename(staging, self.index_directory)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    def _save_in_background(self):
+        """Save once the running sync releases ``_lock``; the caller holds it."""
+        self._dirty = True
+        if self._saver is None:
+            self._saver = threading.Thread(target=self._background_save, name='index-saver', daemon=True)
+            self._saver.start()
+
+    def _background_save(self):
+        while True:
+            with self._lock:
+                if not self._dirty:
+                    self._saver = None
+                    return
+                self._dirty = False
+                try:
+                    self._save()
+                except Exception as e:
+                    # The copy on disk stays at the previous sync; its files are re-indexed on the next start
+                    print(f"Error saving index: {e}")
+
+    def wait_saved(self):
+        """Block until the index on disk matches the last sync."""
+        saver = self._saver
+        if saver is not None:
+            saver.join()
+
+    def _add(self, docs, ids, completed, added):
+        """
+        Add one batch, then record the files whose last chunk it holds.
+
+        A file is only put in the manifest once all its chunks are in the
+        index; ``added`` collects the ids added in this sync for rollback.
+        """
+        if docs:
+            texts = [doc.page_content for doc in docs]
+            # Embedded before taking the lock, so searches only wait for the add itself
+            vectors = self.embedding_function.embed_documents(texts)
+            with self.index_lock:
+                if self.store is None:
+                    self.store = FAISS.from_embeddings(list(zip(texts, vectors)), self.embedding_function,
+                                                       metadatas=[doc.metadata for doc in docs], ids=ids)
+                else:
+                    self.store.add_embeddings(list(zip(texts, vectors)), metadatas=[doc.metadata for doc in docs],
+                                              ids=ids)
+                self.sparse.add(ids, texts)
+            added.extend(ids)
+        for filename, entry in completed:
+            self.files[filename] = entry
+
+    def _delete(self, ids):
+        """Delete ids from both indexes, skipping any the vector store does not hold."""
+        with self.index_lock:
+            if self.store is not None:
+                present = set(self.store.index_to_docstore_id.values())
+                ids_in_store = [i for i in ids if i in present]
+                if ids_in_store:
+                    ann_index.delete(self.store, ids_in_store)
+            self.sparse.delete(ids)
+
+    def _maybe_retrain(self):
+        if self.store is None or not self.store.index.ntotal:
+            return False
+        ntotal = self.store.index.ntotal
+        wanted = ann_index.effective_type(self.index_type, ntotal)
+        current = ann_index.index_type_of(self.store.index)
+        if wanted == current and (wanted == 'flat' or ntotal < 2 * self.trained_on):
+            return False
+        # Trained off to the side; searches keep the old index until the swap
+        index, _ = ann_index.build_index(wanted, ann_index.stored_vectors(self.store))
+        with self.index_lock:
+            self.store.index = index
+        self.trained_on = ntotal
+        return True
+
+    def scan(self):
+        """filename -> sha256 of every supported file in the directory."""
+        os.makedirs(self.directory, exist_ok=True)
+        return {
+            filename: file_sha256(os.path.join(self.directory, filename))
+            for filename in sorted(os.listdir(self.directory))
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS)
+        }
+
+    def sync(self):
+        """
+        Index new and changed files and drop removed ones.
+
+        Returns:
+            dict: Files added, updated and removed, chunks added and seconds taken
+        """
+        start = time.perf_counter()
+        with self._lock:
+            current = self.scan()
+            stale = [f for f in self.files if current.get(f) != self.files[f]['sha256']]
+            fresh = [f for f, sha in current.items() if self.files.get(f, {}).get('sha256') != sha]
+
+            stale_ids = [i for f in stale for i in self.files[f]['ids']]
+            if stale_ids:
+                self._delete(stale_ids)
+            for filename in stale:
+                del self.files[filename]
+
+            chunks = 0
+            batch_docs, batch_ids = [], []
+            # (filename, manifest entry, chunk count at its end) for files not yet fully submitted
+            waiting = []
+            submitted = 0
+            added = []
+            paths = [os.path.join(self.directory, f) for f in fresh]
+            try:
+                # The encoder runs on the worker thread while files keep parsing and splitting here
+                with BackgroundWorker(self._add) as embedder:
+                    def submit(size):
+                        nonlocal submitted, waiting
+                        submitted += size
+                        completed = [(f, entry) for f, entry, end in waiting if end <= submitted]
+                        waiting = [w for w in waiting if w[2] > submitted]
+                        embedder.submit(batch_docs[:size], batch_ids[:size], completed, added)
+                        del batch_docs[:size], batch_ids[:size]
+
+                    for path, docs in self.load_files(paths):
+                        filename = os.path.basename(path)
+                        if isinstance(docs, Exception):
+                            print(f"Error loading {filename}: {docs}")
+                            continue
+                        ids = [f"{filename}#{i}" for i in range(len(docs))]
+                        batch_docs.extend(docs)
+                        batch_ids.extend(ids)
+                        chunks += len(docs)
+                        waiting.append((filename, {'sha256': current[filename], 'ids': ids}, submitted + len(batch_docs)))
+                        while len(batch_docs) >= self.batch_size:
+                            submit(self.batch_size)
+                    if batch_docs or waiting:
+                        submit(len(batch_docs))
+            except Exception:
+                # Drop the chunks of files that did not make it into the manifest, so the
+                # manifest and the index agree and the next sync can retry those files
+                recorded = {i for entry in self.files.values() for i in entry['ids']}
+                orphans = [i for i in added if i not in recorded]
+                if orphans:
+                    self._delete(orphans)
+                self._save_in_background()
+                raise
+
+            retrained = self._maybe_retrain()
+            if stale or fresh or retrained:
+                self._save_in_background()
+            self.last_sync = {
+                'added': len([f for f in fresh if f not in stale]),
+                'updated': len([f for f in fresh if f in stale]),
+                'removed': len([f for f in stale if f not in current]),
+                'chunks_added': chunks,
+                'index_type': ann_index.index_type_of(self.store.index) if self.store is not None else None,
+                'retrained': retrained,
+                'seconds': round(time.perf_counter() - start, 3),
+            }
+            return self.last_sync
@@ -8,14 +8,17 @@ from langchain_text_splitters import CharacterTextSplitter
 from langchain_groq import ChatGroq
 import streamlit as st
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import (
-    PyPDFLoader,  # Alternative PDF loader
-    TextLoader
-)
+import numpy as np
 
 #from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
-from langchain.embeddings import HuggingFaceEmbeddings
+#from langchain.embeddings import HuggingFaceEmbeddings
+
+from document_pipeline import iter_file_chunks
+from bm25_index import reciprocal_rank_fusion
+from context_packer import RetrievedChunk, pack_context
+from embedding_cache import CachedEmbeddings
+from embedding_stage import SentenceTransformerEmbeddings
+from index_manager import INDEX_DIRECTORY, IndexManager
 
 #load_dotenv()
 
@@ -23,6 +26,13 @@ from langchain.embeddings import HuggingFaceEmbeddings
 #MODEL = os.getenv('LLM_MODEL', 'meta-llama/Meta-Llama-3.1-405B-Instruct')
 MODEL = os.getenv('LLM_MODEL', 'meta-llama/Llama-3.1-8B')
 RAG_DIRECTORY = os.getenv('DIRECTORY', '/tmp/uploads')
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'BAAI/bge-large-en-v1.5')
+# 'hybrid' (BM25 + vectors, fused by rank), 'dense' or 'sparse'
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid')
+# Candidates taken from each side before fusion
+RETRIEVAL_FETCH_K = int(os.getenv('RETRIEVAL_FETCH_K', '20'))
+# Chunks retrieved for the context packer, which then trims them to its token budget
+CONTEXT_CHUNKS = int(os.getenv('CONTEXT_CHUNKS', '10'))
 
 # from langchain_community.document_loaders import PyPDFLoader
 # loader = PyPDFLoader("attention.pdf")
@@ -47,6 +57,19 @@ def get_local_model():
 
     return llm
 
+# Split the documents into chunks
+text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+
+def load_files(paths):
+    """
+    Parse files in a process pool and split each page as it arrives.
+
+    Yields:
+        tuple: (path, list of chunk Documents) per file in completion order,
+               or (path, exception) for a file that failed or timed out
+    """
+    return iter_file_chunks(paths, text_splitter)
+
 def load_documents(directory):
     """
     Load and split documents from the specified directory.
@@ -54,72 +77,106 @@ def load_documents(directory):
     """
     # Ensure directory exists
     os.makedirs(directory, exist_ok=True)
-    
-    # Custom loader to handle different file types
-    def pdf_loader(path):
-        return PyPDFLoader(path).load()
-    
-    def txt_loader(path):
-        return TextLoader(path, encoding='utf-8').load()
-    
-    # Load PDF and TXT files with their respective loaders
-    pdf_docs = []
-    txt_docs = []
-    
-    for filename in os.listdir(directory):
-        filepath = os.path.join(directory, filename)
-        
-        if filename.lower().endswith('.pdf'):
-            try:
-                pdf_docs.extend(pdf_loader(filepath))
-            except Exception as e:
-                print(f"Error loading PDF {filename}: {e}")
-        
-        elif filename.lower().endswith('.txt'):
-            try:
-                txt_docs.extend(txt_loader(filepath))
-            except Exception as e:
-                print(f"Error loading TXT {filename}: {e}")
-    
-    # Combine all documents
-    documents = pdf_docs + txt_docs
 
-    # Split the documents into chunks
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    docs = text_splitter.split_documents(documents)
+    paths = [os.path.join(directory, filename) for filename in os.listdir(directory)]
+    docs = []
+    for path, chunks in load_files(paths):
+        if isinstance(chunks, Exception):
+            print(f"Error loading {os.path.basename(path)}: {chunks}")
+        else:
+            docs.extend(chunks)
 
     return docs
 
+_embedding_function = None
+
+def get_embedding_function():
+    """
+    Get the document embedding model, wrapped in the on-disk embedding cache.
+
+    Batch size, threads, normalization and length bucketing come from the
+    EMBED_* environment variables (see embedding_stage.py). Kept outside
+    st.cache_resource, so clearing the cache after an upload does not
+    reload the model or forget the cached vectors.
+    """
+    global _embedding_function
+    if _embedding_function is None:
+        #embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        embeddings = SentenceTransformerEmbeddings(EMBEDDING_MODEL)
+        _embedding_function = CachedEmbeddings(embeddings, embeddings.cache_name)
+    return _embedding_function
+
 @st.cache_resource
-def get_retriever():
+def get_index_manager():
     """
-    Create a FAISS vector store with document embeddings.
-    
+    Get the index manager for RAG_DIRECTORY, loading the persisted index if any.
+
     Returns:
-        FAISS Retriever: Initialized FAISS vector store
+        IndexManager: Manager whose ``store`` mirrors the document directory
     """
-    # Get the documents split into chunks
-    docs = load_documents(RAG_DIRECTORY)
-
-    # Create the open-source embedding function
     #embedding_function = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
     #embedding_function = HuggingFaceBgeEmbeddings(model_name="BAAI/bge-large-en-v1.5")
-    # embedding_function = HuggingFaceEmbeddings(
-    #         model_name="BAAI/bge-large-en-v1.5",
-    #         model_kwargs={'device': 'cpu'},
-    #         encode_kwargs={'normalize_embeddings': True}
-    #     )
-    embedding_function = HuggingFaceEmbeddings(model_name="BAAI/bge-large-en-v1.5")
-    #retriever=vectordb.as_retriever()
-    #retriever
-
-    # Load documents into Chroma
-    #return Chroma.from_documents(docs, embedding_function)
-
-    # Create the FAISS vector store
-    #return FAISS.from_documents(docs,embedding_function)
-    faiss_store = FAISS.from_documents(docs, embedding_function)
-    return faiss_store
+    # Only chunks not embedded before reach the model
+    manager = IndexManager(RAG_DIRECTORY, INDEX_DIRECTORY, get_embedding_function(), load_files)
+    manager.sync()
+    return manager
+
+def get_retriever():
+    """
+    Get the FAISS vector store with document embeddings.
+
+    Returns:
+        FAISS Retriever: The current FAISS vector store, or None before any document is indexed
+    """
+    return get_index_manager().store
+
+def dense_search(db, vector, k):
+    """
+    The ``k`` chunks nearest to a question embedding.
+
+    Returns:
+        list: (id, cosine similarity) pairs; the index holds squared L2
+              distances d of normalized vectors, so similarity = 1 - d / 2
+    """
+    distances, positions = db.index.search(np.asarray([vector], dtype=np.float32), k)
+    return [(db.index_to_docstore_id[p], 1 - float(d) / 2) for d, p in zip(distances[0], positions[0]) if p != -1]
+
+def search_chunks(question, k=5, mode=None, manager=None):
+    """
+    Find the chunks that best match a question.
+
+    Args:
+        question (str): The question to search documents for
+        k (int): Number of chunks to return
+        mode (str): 'hybrid', 'dense' or 'sparse', default RETRIEVAL_MODE
+        manager (IndexManager): Index to search, default get_index_manager()
+
+    Returns:
+        list: RetrievedChunk hits with their dense and sparse scores, best first
+    """
+    mode = mode or RETRIEVAL_MODE
+    manager = manager or get_index_manager()
+    if manager.store is None:
+        return []
+    fetch_k = k if mode != 'hybrid' else max(k, RETRIEVAL_FETCH_K)
+    # Embedded outside the lock; a sync in progress only holds it while it changes the indexes
+    vector = manager.embedding_function.embed_query(question) if mode in ('dense', 'hybrid') else None
+    with manager.index_lock:
+        db = manager.store
+        dense = dict(dense_search(db, vector, fetch_k)) if vector is not None else {}
+        sparse = dict(manager.sparse.search(question, fetch_k)) if mode in ('sparse', 'hybrid') else {}
+        ids = reciprocal_rank_fusion([list(dense), list(sparse)])[:k]
+        return [RetrievedChunk(doc_id, db.docstore.search(doc_id), dense.get(doc_id), sparse.get(doc_id))
+                for doc_id in ids]
+
+def search_documents(question, k=5, mode=None, manager=None):
+    """
+    Find the chunks that best match a question (see search_chunks).
+
+    Returns:
+        list: Matching chunk Documents, best first
+    """
+    return [chunk.document for chunk in search_chunks(question, k, mode, manager)]
 
 def query_documents(question):
     """
@@ -131,25 +188,29 @@ def query_documents(question):
     Returns:
         list: Formatted list of matching document sources and contents
     """
-    db = get_retriever()
-    similar_docs = db.similarity_search(question, k=5)
+    #similar_docs = db.similarity_search(question, k=5)
+    similar_docs = search_documents(question, k=5)
     docs_formatted = list(map(lambda doc: f"Source: {doc.metadata.get('source', 'NA')}\nContent: {doc.page_content}", similar_docs))
 
     return docs_formatted
 
-def prompt_ai(messages):
+def prompt_ai(messages, memory=None):
     """
     Generate AI response based on context retrieved from documents.
     
     Args:
         messages (list): Conversation history messages
+        memory (ConversationMemory): Bounds the history sent with the question;
+                                     without it the whole history is sent
     
     Returns:
         AIMessage: AI's response message
     """
     # Fetch the relevant documents for the query
     user_prompt = messages[-1].content
-    retrieved_context = query_documents(user_prompt)
+    #retrieved_context = query_documents(user_prompt)
+    # Merged, de-duplicated and source-tagged chunks within CONTEXT_TOKEN_BUDGET
+    retrieved_context = pack_context(search_chunks(user_prompt, k=CONTEXT_CHUNKS))
     formatted_prompt = f"Context for answering the question:\n{retrieved_context}\nQuestion/user input:\n{user_prompt}"    
 
     # Initialize the LLM
@@ -158,6 +219,8 @@ def prompt_ai(messages):
     
     # Generate AI response
     #ai_response = doc_chatbot.invoke(messages[:-1] + [HumanMessage(content=formatted_prompt)])
-    ai_response = llm.invoke(messages[:-1] + [HumanMessage(content=formatted_prompt)])
+    #ai_response = llm.invoke(messages[:-1] + [HumanMessage(content=formatted_prompt)])
+    history = memory.history(messages[:-1]) if memory is not None else messages[:-1]
+    ai_response = llm.invoke(history + [HumanMessage(content=formatted_prompt)])
 
     return ai_response
@@ -5,10 +5,12 @@ import json
 import shutil
 from langchain_core.messages import SystemMessage, AIMessage, HumanMessage
 
+from conversation_memory import ConversationMemory, llm_summarizer
 
 from rag_utils import (
     load_documents, 
     get_retriever, 
+    get_index_manager,
     query_documents, 
     get_local_model, 
     prompt_ai,
@@ -22,8 +24,16 @@ def initialize_session_state():
             SystemMessage(content=f"You are a personal assistant who answers questions based on the context provided if the provided context can answer the question. You only provide the answer to the question/user input and nothing else. The current date is: {datetime.now().date()}")
         ]
     
+    if "memory" not in st.session_state:
+        # Last turns verbatim plus a background summary of the rest, within MEMORY_TOKEN_BUDGET
+        st.session_state.memory = ConversationMemory(llm_summarizer(get_local_model()))
+
     if "rag_directory" not in st.session_state:
-        st.session_state.rag_directory = "uploads"
+        # The directory the index manager mirrors
+        st.session_state.rag_directory = RAG_DIRECTORY
+
+    if "uploader_key" not in st.session_state:
+        st.session_state.uploader_key = 0
 
 def file_uploader():
     """
@@ -34,7 +44,8 @@ def file_uploader():
     uploaded_files = st.sidebar.file_uploader(
         "Upload Documents", 
         type=['pdf', 'txt'], 
-        accept_multiple_files=True
+        accept_multiple_files=True,
+        key=f"uploader-{st.session_state.uploader_key}"
     )
     
     if uploaded_files:
@@ -49,10 +60,15 @@ def file_uploader():
         
         st.sidebar.success(f"Uploaded {len(uploaded_files)} files successfully!")
         
-        # Reinitialize Chroma instance with new documents
-        st.cache_resource.clear()
+        # Index only the new or changed files
+        #st.cache_resource.clear()
         #get_chroma_instance()
-        get_retriever()
+        stats = get_index_manager().sync()
+        if stats['added'] or stats['updated'] or stats['removed']:
+            st.sidebar.caption(
+                f"Indexed {stats['chunks_added']} new chunks from {stats['added'] + stats['updated']} files "
+                f"in {stats['seconds']:.2f}s"
+            )
         #st.experimental_rerun()
         #st.rerun()
 
@@ -94,18 +110,31 @@ def cleanup_directory(directory):
     except Exception as e:
         st.error(f"Error during cleanup: {e}")
 
+def clear_documents():
+    """
+    Sidebar action that deletes the uploaded documents and drops them from the index.
+    """
+    if st.sidebar.button("Clear documents"):
+        cleanup_directory(st.session_state.rag_directory)
+        # The directory is now empty, so the sync removes every indexed file
+        get_index_manager().sync()
+        # A fresh uploader widget, so the cleared files are not saved again on the next run
+        st.session_state.uploader_key += 1
+        st.rerun()
+
 def main():
     st.set_page_config(page_title="Local Document RAG Chatbot", page_icon="📄")
     st.title("💬 Document RAG Chatbot")
 
-    # Cleanup directory when app starts
-    cleanup_directory(RAG_DIRECTORY)
+    # Uploaded documents and the index persist across restarts; "Clear documents" removes both
+    #cleanup_directory(RAG_DIRECTORY)
     
     # Initialize session state
     initialize_session_state()
     
     # File uploader sidebar
     file_uploader()
+    clear_documents()
     
     # Display chat history
     display_chat_history()
@@ -119,7 +148,7 @@ def main():
         # Get AI response
         with st.chat_message("assistant"):
             try:
-                ai_response = prompt_ai(st.session_state.messages)
+                ai_response = prompt_ai(st.session_state.messages, st.session_state.memory)
                 st.markdown(ai_response.content)
             except Exception as e:
                 st.error(f"An error occurred: {e}")